@@ -4,6 +4,7 @@ import re
 from urllib.request import urlopen
 
 from logger import logger
+from options import OptionsProvider
 
 
 @logger.bind
@@ -31,14 +32,17 @@ def handler(event, _):
     return response
 
 
-def slack_oauth_scopes(term):
+def get_slack_oauth_scopes():
     url = "https://api.slack.com/scopes"
-    with urlopen(url) as res:
+    with urlopen(url, timeout=5) as res:
         html = res.read().decode()
-    scopes = re.findall(r"&quot;name&quot;:&quot;(.*?)&quot;", html)
-    options = [
-        {"value": x, "text": {"type": "plain_text", "text": x}}
-        for x in scopes
-        if x.startswith(term)
-    ]
+    scopes = sorted(set(re.findall(r"&quot;name&quot;:&quot;(.*?)&quot;", html)))
+    options = [{"value": x, "text": {"type": "plain_text", "text": x}} for x in scopes]
     return options
+
+
+scopes = OptionsProvider(get_slack_oauth_scopes)
+
+
+def slack_oauth_scopes(term):
+    return scopes.search(term)
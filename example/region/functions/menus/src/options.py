@@ -0,0 +1,135 @@
+"""
+Options Provider
+"""
+import os
+import threading
+from bisect import bisect_left
+from time import monotonic
+
+from logger import logger
+
+OPTIONS_LIMIT = 100
+OPTIONS_TTL = float(os.getenv("OPTIONS_TTL") or "3600")
+OPTIONS_STALE_TTL = float(os.getenv("OPTIONS_STALE_TTL") or "86400")
+OPTIONS_RETRY_INTERVAL = float(os.getenv("OPTIONS_RETRY_INTERVAL") or "60")
+
+
+class OptionIndex:
+    """
+    Prefix & substring index of menu options
+
+    Option labels are lowercased & every suffix of every label is kept in a
+    sorted array, so both prefix and substring lookups are a ``bisect`` to
+    the first match followed by a scan of at most ``limit`` matches, however
+    many options there are.
+
+    :param list options: Slack option objects
+    """
+
+    def __init__(self, options):
+        self.options = list(options)
+        labels = [x["text"]["text"].lower() for x in self.options]
+        self.prefixes = sorted((label, i) for i, label in enumerate(labels))
+        self.suffixes = sorted(
+            (label[j:], i)
+            for i, label in enumerate(labels)
+            for j in range(1, len(label))
+        )
+
+    def __len__(self):
+        return len(self.options)
+
+    def search(self, term, limit=OPTIONS_LIMIT):
+        """
+        Get options starting with ``term``, then options containing it
+
+        :param str term: Case-insensitive search term
+        :param int limit: Maximum number of options returned
+        """
+        term = (term or "").lower()
+        if not term:
+            return [self.options[i] for _, i in self.prefixes[:limit]]
+        found = {}
+        for keys in (self.prefixes, self.suffixes):
+            for j in range(bisect_left(keys, (term,)), len(keys)):
+                key, i = keys[j]
+                if len(found) >= limit or not key.startswith(term):
+                    break
+                found.setdefault(i, self.options[i])
+        return list(found.values())
+
+
+class OptionsProvider:
+    """
+    Warm-container cache of indexed menu options for ``block_suggestion``
+
+    Options are loaded on first use & kept for ``ttl`` seconds. After that
+    the cached options are still served for up to ``stale_ttl`` more seconds
+    while a background thread reloads them; past that (or on a cold start)
+    they are reloaded before answering. If a reload fails, the stale options
+    are kept & the next reload waits ``retry_interval`` seconds.
+
+    :Example:
+
+    >>> provider = OptionsProvider(lambda: [{"text": {...}, "value": "..."}])
+    >>> provider.search("chat")
+
+    :param function load: Function returning Slack option objects
+    :param float ttl: Seconds before options are refreshed
+    :param float stale_ttl: Seconds stale options may be served while refreshing
+    :param float retry_interval: Seconds before retrying a failed reload
+    """
+
+    def __init__(self, load, ttl=None, stale_ttl=None, retry_interval=None):
+        self.load = load
+        self.ttl = OPTIONS_TTL if ttl is None else ttl
+        self.stale_ttl = OPTIONS_STALE_TTL if stale_ttl is None else stale_ttl
+        self.retry_interval = (
+            OPTIONS_RETRY_INTERVAL if retry_interval is None else retry_interval
+        )
+        self.index = None
+        self.expires = 0
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def refresh(self):
+        """
+        Reload & re-index options
+        """
+        try:
+            index = OptionIndex(self.load())
+        except Exception as err:
+            if self.index is None:
+                raise
+            logger.error("REFRESH FAILED %s", err)
+            # Serve stale options a little longer instead of reloading on
+            # every request while the source is unreachable
+            self.expires = max(self.expires, monotonic() + self.retry_interval)
+        else:
+            logger.info("REFRESHED %d options", len(index))
+            self.index = index
+            self.expires = monotonic() + self.ttl
+        finally:
+            self.refreshing = False
+
+    def get_index(self):
+        """
+        Get cached index, reloading or revalidating it if expired
+        """
+        age = monotonic() - self.expires
+        if self.index is None or age > self.stale_ttl:
+            with self.lock:
+                if self.index is None or monotonic() - self.expires > self.stale_ttl:
+                    self.refresh()
+        elif age > 0:
+            with self.lock:
+                if not self.refreshing:
+                    self.refreshing = True
+                    threading.Thread(target=self.refresh, daemon=True).start()
+        return self.index
+
+    def search(self, term, limit=OPTIONS_LIMIT):
+        """
+        Get up to ``limit`` options matching ``term``
+        """
+        return self.get_index().search(term, limit)
@@ -0,0 +1,204 @@
+"""
+Cold-start benchmark for the receiver, responder & slack-api functions
+
+Each run imports a function's ``index`` module in a fresh interpreter with
+``-X importtime`` and invokes its handler once, against a local stand-in for
+SecretsManager, EventBridge & the Slack API. Reported per function:
+
+- ``import`` — time to import ``index``
+- ``init`` — import plus the first invocation
+- ``rss`` — peak resident set size (KB)
+- ``modules`` — per-module cumulative import time (from ``-X importtime``)
+
+Results are written as JSON so runs can be compared between commits.
+
+:Example:
+
+    python bench/coldstart.py --runs 20 --output coldstart.json
+    python bench/coldstart.py --compare coldstart.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SECRET = {"SLACK_API_TOKEN": "xoxb-bench", "SLACK_SIGNING_SECRET": "bench"}
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import index
+imported = time.perf_counter()
+index.handler(json.loads(sys.argv[1]), None)
+invoked = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"import": imported - start, "init": invoked - start, "rss": rss}))
+"""
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """
+    Local stand-in for SecretsManager, EventBridge & the Slack Web API
+    """
+
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])) or "{}")
+        target = self.headers.get("x-amz-target") or ""
+        if target.endswith("GetSecretValue"):
+            data = {"Name": body.get("SecretId"), "SecretString": json.dumps(SECRET)}
+        elif target.endswith("PutEvents"):
+            entries = [{"EventId": str(i)} for i, _ in enumerate(body["Entries"])]
+            data = {"FailedEntryCount": 0, "Entries": entries}
+        else:
+            data = {"ok": True}
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_):
+        ...
+
+
+def get_events(endpoint):
+    """
+    Get first-invocation event for each function
+    """
+    return {
+        "receiver": {"routeKey": "ANY /install", "headers": {}},
+        "responder": {},
+        "slack-api": {"url": f"{endpoint}/api/auth.test", "data": "{}"},
+    }
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output into cumulative seconds by module
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+
+def sample(name, event, endpoint, python):
+    env = dict(
+        os.environ,
+        AWS_ACCESS_KEY_ID="AKIAXXXXXXXXXXXX",
+        AWS_SECRET_ACCESS_KEY="xxxxxxxxxxxxxxxxxxxxxxxxxxxx",
+        AWS_DEFAULT_REGION="us-east-1",
+        AWS_ENDPOINT_URL=endpoint,
+        EVENT_BUS_NAME="slackbot",
+        SECRET_ID="slackbot",
+        PYTHONPATH=os.path.join(FUNCTIONS, name, "src"),
+    )
+    cmd = [python, "-X", "importtime", "-c", CHILD, json.dumps(event)]
+    res = subprocess.run(cmd, env=env, capture_output=True, check=True, text=True)
+    result = json.loads(res.stdout.splitlines()[-1])
+    result["modules"] = parse_importtime(res.stderr)
+    return result
+
+
+def summarize(samples, top):
+    modules = {}
+    for result in samples:
+        for module, seconds in result["modules"].items():
+            modules.setdefault(module, []).append(seconds)
+    medians = {k: statistics.median(v) for k, v in modules.items()}
+    slowest = sorted(medians.items(), key=lambda x: x[1], reverse=True)[:top]
+    return {
+        "runs": len(samples),
+        "import": {
+            "median": statistics.median(x["import"] for x in samples),
+            "max": max(x["import"] for x in samples),
+        },
+        "init": {
+            "median": statistics.median(x["init"] for x in samples),
+            "max": max(x["init"] for x in samples),
+        },
+        "rss": {
+            "median": statistics.median(x["rss"] for x in samples),
+            "max": max(x["rss"] for x in samples),
+        },
+        "modules": dict(slowest),
+    }
+
+
+def get_commit():
+    try:
+        cmd = ["git", "rev-parse", "--short", "HEAD"]
+        return subprocess.check_output(cmd, cwd=FUNCTIONS, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, baseline=None):
+    row = "{:<10} {:>12} {:>12} {:>10} {:>10}"
+    print(row.format("function", "import (ms)", "init (ms)", "rss (KB)", "Δ init"))
+    for name, result in results["functions"].items():
+        delta = "-"
+        if baseline and name in baseline["functions"]:
+            before = baseline["functions"][name]["init"]["median"]
+            delta = "%+.1f%%" % ((result["init"]["median"] / before - 1) * 100)
+        print(
+            row.format(
+                name,
+                "%.1f" % (result["import"]["median"] * 1000),
+                "%.1f" % (result["init"]["median"] * 1000),
+                "%d" % result["rss"]["median"],
+                delta,
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("-o", "--output", help="Write JSON results to file")
+    parser.add_argument("-c", "--compare", help="Compare to JSON results file")
+    parser.add_argument("-f", "--function", action="append", help="Function name")
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--top", type=int, default=20, help="Modules to report")
+    args = parser.parse_args()
+
+    # Start stand-in
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+
+    # Sample functions
+    events = get_events(endpoint)
+    names = args.function or list(events)
+    results = {"commit": get_commit(), "python": args.python, "functions": {}}
+    for name in names:
+        samples = [
+            sample(name, events[name], endpoint, args.python) for _ in range(args.runs)
+        ]
+        results["functions"][name] = summarize(samples, args.top)
+    server.shutdown()
+
+    # Report
+    baseline = None
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+    report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(results, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark per-request dispatch overhead of ``Api.handle``
+
+Routes call a no-op handler through a three-stage middleware chain and
+return a pre-built response. Requests are dispatched by API Gateway
+``routeKey`` and by method & path (as in server mode), and compared with a
+model of the previous dispatcher, which looked up the literal ``routeKey``,
+wrapped each handler in a closure, called each stage from the handler &
+built every response from scratch.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.bench_dispatch
+"""
+import json
+import logging
+from timeit import timeit
+
+from app import trace
+from app.api import Api
+from app.events import Slash
+from app.logger import logger
+from app.metrics import metrics
+
+
+def noop(event):
+    return None
+
+
+def passthrough(call_next):
+    def passthrough(event):
+        return call_next(event)
+
+    return passthrough
+
+
+class BeforeApi:
+    def __init__(self):
+        self.routes = {}
+
+    def handle(self, event):
+        route_key = event["routeKey"]
+        route = self.routes.get(route_key)
+        with trace.span(route_key, trace.SPAN_KIND_SERVER) as span:
+            span.set(**{"http.route": route_key})
+            metrics.count("Requests", Route=route_key)
+            if route is None:
+                raise ValueError
+            response = route(event)
+            span.set(**{"http.response.status_code": int(response["statusCode"])})
+            return response
+
+    def post(self, path):
+        def inner(handler):
+            def wrapper(request):
+                return handler(request)
+
+            self.routes[f"POST {path}"] = wrapper
+            return wrapper
+
+        return inner
+
+    @staticmethod
+    def respond(code, body=None, **headers):
+        body = json.dumps(body) if body else ""
+        logger.info("RESPONSE [%d] %s", code, body or "-")
+        headers.setdefault("content-type", "application/json; charset=utf-8")
+        return {"statusCode": str(code), "body": body, "headers": headers}
+
+
+def get_event(path, route_key=None, **params):
+    event = {"rawPath": path, "requestContext": {"http": {"method": "POST"}}}
+    if route_key:
+        event["routeKey"] = route_key
+    if params:
+        event["pathParameters"] = params
+    return event
+
+
+def main(number=100000):
+    logger.logger.setLevel(logging.WARNING)
+    api = Api()
+    before = BeforeApi()
+    for i in range(10):
+        api.post(f"/route-{i}")(lambda event: api.respond(200))
+        before.post(f"/route-{i}")(lambda event: before.respond(200))
+    middleware = [passthrough, passthrough, passthrough]
+
+    @api.post("/slash/{cmd}", Slash, middleware)
+    def post_slash(event):
+        return api.respond(200)
+
+    @before.post("/slash/{cmd}")
+    def before_slash(request):
+        event = Slash(request)
+        noop(event)
+        noop(event)
+        noop(event)
+        return before.respond(200)
+
+    scenarios = [
+        ("static routeKey", api, get_event("/route-9", "POST /route-9")),
+        ("static routeKey (before)", before, get_event("/route-9", "POST /route-9")),
+        ("static path", api, get_event("/route-9")),
+        (
+            "param routeKey",
+            api,
+            get_event("/slash/fizz", "POST /slash/{cmd}", cmd="fizz"),
+        ),
+        (
+            "param routeKey (before)",
+            before,
+            get_event("/slash/fizz", "POST /slash/{cmd}", cmd="fizz"),
+        ),
+        ("param path", api, get_event("/slash/fizz")),
+    ]
+    row = "{:<26} {:>10}"
+    print(row.format("dispatch", "ns/req"))
+    for label, subject, event in scenarios:
+        elapsed = timeit(lambda: subject.handle(dict(event)), number=number)
+        print(row.format(label, "%.0f" % (elapsed * 1e9 / number)))
+
+
+if __name__ == "__main__":
+    main()
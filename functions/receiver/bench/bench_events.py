@@ -0,0 +1,100 @@
+"""
+Benchmark event parsing per request for each fixture in ``test/events/``
+
+Compares the memoized event model against the same classes with caching
+disabled, which is how every accessor behaved before parsing was memoized.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.bench_events
+"""
+
+import base64
+import json
+import os
+from functools import cached_property
+from timeit import timeit
+from unittest import mock
+from urllib.parse import urlencode
+
+from app import events
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "test", "events")
+ROUTES = {
+    "block_actions": events.Callback,
+    "block_suggestion": events.BlockSuggestion,
+    "event_callback": events.EventCallback,
+    "slash_command": events.Slash,
+    "url_verification": events.EventCallback,
+    "view_closed": events.Callback,
+    "view_submission": events.Callback,
+}
+
+
+def uncached(cls):
+    """
+    Subclass ``cls`` replacing each cached property with a plain property
+    """
+    attrs = {}
+    for klass in cls.__mro__:
+        for name, attr in vars(klass).items():
+            if isinstance(attr, cached_property) and name not in attrs:
+                attrs[name] = property(attr.func)
+    return type(f"Uncached{cls.__name__}", (cls,), attrs)
+
+
+def get_request(name):
+    with open(os.path.join(FIXTURES, f"{name}.json")) as stream:
+        data = json.load(stream)
+    if ROUTES[name] is events.Slash:
+        body = urlencode(data)
+    elif ROUTES[name] is events.EventCallback:
+        body = json.dumps(data)
+    else:
+        body = urlencode({"payload": json.dumps(data)})
+    return {"body": base64.b64encode(body.encode()).decode(), "isBase64Encoded": True}
+
+
+def handle(cls, request):
+    """
+    Mimic the event accesses made by a route handler
+    """
+    event = cls(request)
+    event.get_body()  # verify
+    event.get_detail()  # route handler
+    list(event.get_entries("slackbot"))  # publish
+    event.detail_json if event.get_detail() else ""  # resolve
+
+
+def count_parses(cls, request):
+    with mock.patch("base64.b64decode", wraps=base64.b64decode) as b64decode:
+        with mock.patch("json.loads", wraps=json.loads) as loads:
+            handle(cls, request)
+    return b64decode.call_count + loads.call_count
+
+
+def main(number=10000):
+    row = "{:<18} {:>8} {:>8} {:>12} {:>12}"
+    print(row.format("fixture", "parses", "before", "us/req", "before"))
+    for name, cls in sorted(ROUTES.items()):
+        request = get_request(name)
+        before = uncached(cls)
+        print(
+            row.format(
+                name,
+                count_parses(cls, request),
+                count_parses(before, request),
+                "%.2f"
+                % (timeit(lambda: handle(cls, request), number=number) * 1e6 / number),
+                "%.2f"
+                % (
+                    timeit(lambda: handle(before, request), number=number)
+                    * 1e6
+                    / number
+                ),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark import & init time of the receiver with built-in vs boto3 clients
+
+Each sample runs in a fresh interpreter. ``import`` is the time to import
+``index``; ``init`` adds creating the EventBridge & SecretsManager clients and
+signing one responder request, ie. everything a cold start does before the
+first network call.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.bench_imports
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import index
+imported = time.perf_counter()
+from app import clients
+index.bot.event_bus.client
+clients.get_client("secretsmanager")
+index.bot.sigv4signer.get_headers(
+    method="POST", url="https://example.com/-/menus", headers={}, data="{}", params=""
+)
+ready = time.perf_counter()
+boto3 = any(x.startswith("boto") for x in sys.modules)
+print(json.dumps({"import": imported - start, "init": ready - start, "boto3": boto3}))
+"""
+ENV = {
+    "AWS_ACCESS_KEY_ID": "AKIAXXXXXXXXXXXX",
+    "AWS_SECRET_ACCESS_KEY": "xxxxxxxxxxxxxxxxxxxxxxxxxxxx",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "EVENT_BUS_NAME": "slackbot",
+    "SECRET_ID": "slackbot",
+    "PYTHONPATH": SRC,
+}
+
+
+def sample(mode):
+    env = dict(os.environ, AWS_CLIENT=mode, **ENV)
+    cmd = [sys.executable, "-c", CHILD]
+    res = subprocess.run(cmd, env=env, capture_output=True, check=True, text=True)
+    return json.loads(res.stdout.splitlines()[-1])
+
+
+def main(runs=20):
+    row = "{:<6} {:>12} {:>12} {:>7}"
+    print(row.format("mode", "import (ms)", "init (ms)", "boto3"))
+    for mode in ("lite", "boto3"):
+        samples = [sample(mode) for _ in range(runs)]
+        print(
+            row.format(
+                mode,
+                "%.1f" % (statistics.median(x["import"] for x in samples) * 1000),
+                "%.1f" % (statistics.median(x["init"] for x in samples) * 1000),
+                str(samples[0]["boto3"]),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
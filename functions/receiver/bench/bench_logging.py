@@ -0,0 +1,83 @@
+"""
+Benchmark Lambda handler latency with queued logging on & off
+
+Each invocation logs the ``EVENT`` & ``RETURN`` records of a fixture request
+plus a few lines around a simulated downstream call. Records are written to a
+pipe drained by a child process, like the Lambda runtime's stdout. Latency
+includes the flush performed before the handler returns.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.bench_logging --io 5 --lines 10
+"""
+import argparse
+import subprocess
+from time import perf_counter, sleep
+
+from app.logger import LambdaLoggerAdapter
+from bench.bench_events import get_request
+from bench.bench_routes import percentile
+
+
+def get_handler(name, stream, queued, lines, io):
+    logger = LambdaLoggerAdapter.getLogger(name, stream=stream, queued=queued)
+    logger.propagate = False
+    adapter = LambdaLoggerAdapter(logger, sample_rates={}, max_length=0)
+
+    @adapter.bind
+    def handler(event, context=None):
+        for i in range(lines):
+            adapter.info("STEP %d %s", i, adapter.json(event))
+        if io:
+            sleep(io / 1000)
+        return {"statusCode": 200, "body": "ok"}
+
+    return handler
+
+
+def run(handler, request, number):
+    latencies = []
+    for _ in range(number):
+        start = perf_counter()
+        handler(request)
+        latencies.append((perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=10, help="log lines per call")
+    parser.add_argument("--io", type=float, default=0, help="simulated I/O (ms)")
+    parser.add_argument("--fixture", default="block_actions")
+    opts = parser.parse_args()
+
+    drain = subprocess.Popen(
+        ["cat"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+    )
+    request = get_request(opts.fixture)
+    row = "{:<8} {:>10} {:>10} {:>10}"
+    print(row.format("mode", "p50 ms", "p95 ms", "p99 ms"))
+    try:
+        for mode, queued in [("sync", False), ("queued", True)]:
+            handler = get_handler(
+                f"bench-{mode}", drain.stdin, queued, opts.lines, opts.io
+            )
+            run(handler, request, opts.number // 10)
+            latencies = run(handler, request, opts.number)
+            print(
+                row.format(
+                    mode,
+                    *("%.3f" % percentile(latencies, pct) for pct in (50, 95, 99)),
+                )
+            )
+    finally:
+        drain.stdin.close()
+        drain.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Benchmark end-to-end latency of ``index.handler`` for every route
+
+Requests are validly signed and built from the fixtures in ``test/events/``.
+EventBridge, the responder API & Slack's OAuth endpoint are local stand-ins
+with configurable latency. Reports p50/p95/p99 latency & throughput per route
+and exits non-zero if p95 regresses past ``--threshold`` against
+``--baseline``.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.bench_routes --output routes.json
+    PYTHONPATH=src python -m bench.bench_routes --baseline routes.json --threshold 0.2
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+from itertools import count
+from time import perf_counter, time
+from unittest import mock
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from bench import standin
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "test", "events")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, f"{name}.json")) as stream:
+        return json.load(stream)
+
+
+def get_body(route_key, name, event_id=None):
+    """
+    Encode fixture the way Slack sends it to route
+    """
+    data = read_fixture(name)
+    if route_key == "POST /events":
+        if event_id and "event_id" in data:
+            data["event_id"] = event_id
+        return json.dumps(data)
+    if route_key == "POST /slash/{cmd}":
+        return urlencode(data)
+    return urlencode({"payload": json.dumps(data)})
+
+
+def get_event(signer, route_key, body=None, query=None, path=None):
+    """
+    Get signed API Gateway event
+    """
+    method, route_path = route_key.split(" ")
+    headers = {"host": "slack.example.com"}
+    if body is not None:
+        ts = str(int(time()))
+        headers["x-slack-request-timestamp"] = ts
+        headers["x-slack-signature"] = signer.sign(body, ts)
+    return {
+        "routeKey": route_key,
+        "rawPath": path or route_path,
+        "rawQueryString": urlencode(query or {}),
+        "queryStringParameters": query,
+        "headers": headers,
+        "body": base64.b64encode((body or "").encode()).decode(),
+        "isBase64Encoded": True,
+        "requestContext": {
+            "domainName": "slack.example.com",
+            "http": {"method": method},
+        },
+    }
+
+
+def get_scenarios(api, bot):
+    """
+    Get ``(label, event factory)`` for every route in ``Api.routes``
+    """
+    fixtures = {
+        "POST /callbacks": ["block_actions", "view_closed", "view_submission"],
+        "POST /events": ["event_callback", "url_verification"],
+        "POST /menus": ["block_suggestion"],
+        "POST /slash/{cmd}": ["slash_command"],
+    }
+    paths = {"POST /slash/{cmd}": "/slash/my-command"}
+    for route_key in sorted(api.routes):
+        if route_key == "ANY /oauth":
+            yield route_key, lambda: get_event(
+                bot.signer,
+                route_key,
+                query={"code": "CODE", "state": bot.oauth.generate_state()},
+            )
+        elif route_key in fixtures:
+            for name in fixtures[route_key]:
+                body = get_body(route_key, name)
+                path = paths.get(route_key)
+                if name == "event_callback":
+                    # Unique event IDs so deliveries are not deduplicated
+                    ids = (f"Ev{i:08d}" for i in count())
+                    yield f"{route_key} {name}", (
+                        lambda r=route_key, n=name: get_event(
+                            bot.signer, r, get_body(r, n, next(ids))
+                        )
+                    )
+                    continue
+                yield f"{route_key} {name}", (
+                    lambda r=route_key, b=body, p=path: get_event(
+                        bot.signer, r, b, path=p
+                    )
+                )
+        else:
+            yield route_key, lambda r=route_key: get_event(bot.signer, r)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(handler, factory, requests, warmup):
+    for _ in range(warmup):
+        handler(factory())
+    latencies = []
+    start = perf_counter()
+    for _ in range(requests):
+        event = factory()
+        t0 = perf_counter()
+        response = handler(event)
+        latencies.append(perf_counter() - t0)
+        if int(response["statusCode"]) >= 400:
+            raise RuntimeError(f"{event['routeKey']} [{response['statusCode']}]")
+    elapsed = perf_counter() - start
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--events-latency", type=float, default=0.0)
+    parser.add_argument("--responder-latency", type=float, default=0.0)
+    parser.add_argument("--slack-latency", type=float, default=0.0)
+    parser.add_argument("-o", "--output", help="Write JSON results to file")
+    parser.add_argument("-b", "--baseline", help="Compare to JSON results file")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Point receiver at stand-ins
+    server, endpoint = standin.start(
+        events=args.events_latency,
+        responder=args.responder_latency,
+        slack=args.slack_latency,
+    )
+    os.environ.update(
+        AWS_ACCESS_KEY_ID="AKIAXXXXXXXXXXXX",
+        AWS_SECRET_ACCESS_KEY="xxxxxxxxxxxxxxxxxxxxxxxxxxxx",
+        AWS_DEFAULT_REGION="us-east-1",
+        AWS_ENDPOINT_URL=endpoint,
+        EVENT_BUS_NAME="slackbot",
+        SECRET_ID="slackbot",
+    )
+    import index
+
+    index.bot.pool = standin.LocalPool(endpoint)
+    oauth_url = f"{endpoint}/api/oauth.v2.access"
+    local_urlopen = lambda req: urlopen(Request(oauth_url, req.data, req.headers))
+    index.logger.logger.disabled = True
+
+    # Run scenarios
+    results = {}
+    with mock.patch("app.slackbot.urlopen", local_urlopen):
+        for label, factory in get_scenarios(index.api, index.bot):
+            results[label] = run(index.handler, factory, args.requests, args.warmup)
+    server.shutdown()
+
+    # Report & check regressions
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+    failed = []
+    row = "{:<34} {:>9} {:>9} {:>9} {:>10} {:>8}"
+    print(row.format("route", "p50 (ms)", "p95 (ms)", "p99 (ms)", "req/s", "Δ p95"))
+    for label, result in results.items():
+        delta = "-"
+        if label in baseline:
+            change = result["p95"] / baseline[label]["p95"] - 1
+            delta = "%+.1f%%" % (change * 100)
+            if change > args.threshold:
+                failed.append(label)
+        print(
+            row.format(
+                label,
+                "%.2f" % (result["p50"] * 1000),
+                "%.2f" % (result["p95"] * 1000),
+                "%.2f" % (result["p99"] * 1000),
+                "%.0f" % result["throughput"],
+                delta,
+            )
+        )
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(results, stream, indent=2)
+    if failed:
+        print(f"p95 regressed more than {args.threshold:.0%}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark ``Signer.verify`` throughput across request body sizes
+
+Compares the pre-keyed signer (with one and two active secrets) against a
+model of the previous implementation, which re-keyed the HMAC per request,
+signed a ``str`` body, and built the debug string-to-sign eagerly.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.bench_signer
+"""
+import hmac
+import os
+from hashlib import sha256
+from time import time
+from timeit import timeit
+
+os.environ.setdefault("EVENT_BUS_NAME", "slackbot")
+os.environ.setdefault("SECRET_ID", "slackbot")
+
+from app.logger import logger  # noqa: E402
+from app.slackbot import Signer  # noqa: E402
+
+SIZES = [256, 4096, 65536]
+
+
+class BeforeSigner(Signer):
+    def sign(self, body, ts=None):
+        ts = ts or str(int(time()))
+        data = f"{self.version}:{ts}:{body}".encode()
+        logger.debug("STRING TO SIGN %s", data.decode())
+        secret = self.secret.encode()
+        hex = hmac.new(secret, data, sha256).hexdigest()
+        signature = f"{self.version}={hex}"
+        return signature
+
+    def verify(self, signature, ts, body):
+        delta = int(time()) - int(ts)
+        if delta > 5 * 60 or delta < 0:
+            raise ValueError("Request timestamp invalid")
+        expected = self.sign(body, ts)
+        logger.debug("GIVEN SIGNATURE    %s", signature)
+        logger.debug("EXPECTED SIGNATURE %s", expected)
+        if signature != expected:
+            raise ValueError("Invalid signature")
+        return True
+
+
+def main(number=20000):
+    signer = Signer(secret="SECRET!", version="v0")
+    rotating = Signer(secret="NEW!,SECRET!", version="v0")
+    before = BeforeSigner(secret="SECRET!", version="v0")
+    row = "{:>8} {:>14} {:>14} {:>14}"
+    print(row.format("bytes", "verify/s", "rotating/s", "before/s"))
+    for size in SIZES:
+        body = b"x" * size
+        ts = str(int(time()))
+        signature = signer.sign(body, ts)
+        signers = [(signer, body), (rotating, body), (before, body.decode())]
+        print(
+            row.format(
+                size,
+                *(
+                    "%.0f"
+                    % (
+                        number
+                        / timeit(lambda: x.verify(signature, ts, data), number=number)
+                    )
+                    for x, data in signers
+                ),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
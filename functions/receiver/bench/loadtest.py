@@ -0,0 +1,378 @@
+"""
+Load-test the receiver with signed synthetic Slack traffic
+
+Requests are built from the fixtures in ``test/events/`` & validly signed,
+mixing bursts of ``event_callback`` deliveries, ``block_actions`` carrying
+many actions, ``block_suggestion`` typing storms & slash commands. Each
+target rate is driven open-loop (requests are sent on schedule whether or
+not earlier ones have finished, so queueing counts towards latency) against
+the in-process ``index.handler`` (with local stand-ins for AWS, the responder
+API & Slack) or against a running HTTP endpoint, eg. ``server.py``.
+
+Reports latency percentiles, error rates & achieved throughput per rate and
+traffic kind. In-process runs also report p95 per stage (timing span) and
+the first rate at which each stage saturates, ie. its p95 exceeds
+``--saturation`` times its p95 at the lowest rate.
+
+:Example:
+
+    PYTHONPATH=src python -m bench.loadtest --rates 50,100,200,400
+    PYTHONPATH=src python -m bench.loadtest --mix typing --url http://localhost:8000
+"""
+import argparse
+import json
+import os
+import random
+import threading
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from itertools import count
+from secrets import token_hex
+from time import perf_counter, sleep, time
+from unittest import mock
+from urllib.parse import urlencode, urlsplit
+from urllib.request import Request as URLRequest, urlopen
+
+os.environ.setdefault("EVENT_BUS_NAME", "slackbot")
+os.environ.setdefault("SECRET_ID", "slackbot")
+
+from app import trace  # noqa: E402
+from app.slackbot import Signer  # noqa: E402
+from bench import standin  # noqa: E402
+from bench.bench_routes import percentile, read_fixture  # noqa: E402
+
+MIXES = {
+    "announcement": {
+        "event_callback": 6,
+        "block_actions": 2,
+        "block_suggestion": 3,
+        "slash_command": 1,
+    },
+    "events": {"event_callback": 1},
+    "actions": {"block_actions": 1},
+    "typing": {"block_suggestion": 1},
+    "slash": {"slash_command": 1},
+}
+EVENT_TYPES = ["message", "message", "message", "reaction_added", "app_mention"]
+WORDS = ["announcement", "all-hands", "engineering", "general", "help-desk"]
+
+Request = namedtuple("Request", "kind method path headers body")
+Result = namedtuple("Result", "kind latency status")
+
+
+class Traffic:
+    """
+    Endless stream of signed synthetic Slack requests
+
+    :param Signer signer: Signer used to sign each request
+    :param dict mix: Relative weight of each traffic kind
+    :param int actions: Number of actions in each ``block_actions`` payload
+    :param int seed: Random seed
+    """
+
+    def __init__(self, signer, mix, actions=20, seed=None):
+        self.signer = signer
+        self.kinds = list(mix)
+        self.weights = list(mix.values())
+        self.actions = actions
+        self.random = random.Random(seed)
+        self.event_ids = (f"Ev{token_hex(4)}{i:08d}" for i in count())
+        self.storm = iter(())
+        self.fixtures = {kind: read_fixture(kind) for kind in MIXES["announcement"]}
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.lock:
+            (kind,) = self.random.choices(self.kinds, self.weights)
+            path, body, content_type = getattr(self, f"get_{kind}")()
+        ts = str(int(time()))
+        headers = {
+            "content-type": content_type,
+            "x-slack-request-timestamp": ts,
+            "x-slack-signature": self.signer.sign(body, ts),
+        }
+        return Request(kind, "POST", path, headers, body)
+
+    def get_event_callback(self):
+        data = dict(self.fixtures["event_callback"])
+        data["event"] = dict(data["event"], type=self.random.choice(EVENT_TYPES))
+        data["event_id"] = next(self.event_ids)
+        return "/events", json.dumps(data).encode(), "application/json"
+
+    def get_block_actions(self):
+        data = dict(self.fixtures["block_actions"])
+        (action,) = data["actions"]
+        data["actions"] = [
+            dict(action, action_id=f"action_{i}", block_id=f"block_{i}")
+            for i in range(self.actions)
+        ]
+        return ("/callbacks", *get_form({"payload": json.dumps(data)}))
+
+    def get_block_suggestion(self):
+        # Each user types a word one keystroke at a time
+        value = next(self.storm, None)
+        if value is None:
+            word = self.random.choice(WORDS)
+            self.user = f"U{self.random.randrange(10**8):08d}"
+            self.storm = (word[:i] for i in range(1, len(word) + 1))
+            value = next(self.storm)
+        data = dict(self.fixtures["block_suggestion"], value=value)
+        data["user"] = dict(data["user"], id=self.user)
+        return ("/menus", *get_form({"payload": json.dumps(data)}))
+
+    def get_slash_command(self):
+        data = dict(self.fixtures["slash_command"])
+        data["text"] = self.random.choice(WORDS)
+        return (f"/slash{data['command']}", *get_form(data))
+
+
+def get_form(data):
+    return urlencode(data).encode(), "application/x-www-form-urlencoded"
+
+
+class InProcess:
+    """
+    Send requests to ``index.handler`` in this process
+    """
+
+    def __init__(self, server):
+        self.server = server
+
+    def __call__(self, request):
+        event = self.server.get_event(
+            request.method, request.path, "", request.headers.items(), request.body
+        )
+        status, *_ = self.server.call(event)
+        return status
+
+
+class Remote:
+    """
+    Send requests to an HTTP endpoint over a keep-alive connection per thread
+    """
+
+    def __init__(self, url, timeout=10):
+        self.url = urlsplit(url)
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def __call__(self, request):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = HTTPConnection(self.url.netloc, timeout=self.timeout)
+            self.local.conn = conn
+        try:
+            conn.request(
+                request.method,
+                f"{self.url.path.rstrip('/')}{request.path}",
+                request.body,
+                request.headers,
+            )
+            res = conn.getresponse()
+            res.read()
+            return res.status
+        except OSError:
+            conn.close()
+            self.local.conn = None
+            return 0
+
+
+class StageTracer(trace.Tracer):
+    """
+    Tracer that collects span durations by name instead of exporting them
+    """
+
+    def __init__(self):
+        super().__init__(export="collect")
+        self.stages = defaultdict(list)
+
+    def export(self, spans):
+        for span in spans:
+            self.stages[span.name].append((span.end - span.start) / 1e9)
+
+    def reset(self):
+        stages, self.stages = self.stages, defaultdict(list)
+        return stages
+
+
+def run(send, traffic, rate, duration, concurrency):
+    """
+    Send requests open-loop at ``rate`` per second for ``duration`` seconds
+
+    Latency is measured from each request's scheduled send time.
+    """
+    results = []
+
+    def call(request, scheduled):
+        try:
+            status = send(request)
+        except Exception:
+            status = 0
+        results.append(Result(request.kind, perf_counter() - scheduled, status))
+
+    total = max(int(rate * duration), 1)
+    with ThreadPoolExecutor(concurrency) as executor:
+        start = perf_counter()
+        for i in range(total):
+            request = next(traffic)
+            scheduled = start + i / rate
+            delay = scheduled - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            executor.submit(call, request, scheduled)
+    elapsed = perf_counter() - start
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    latencies = [x.latency for x in results]
+    errors = [x for x in results if not 200 <= x.status < 400]
+    return {
+        "requests": len(results),
+        "errors": len(errors) / len(results),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(results) / elapsed,
+    }
+
+
+def report(rate, results, elapsed):
+    by_kind = defaultdict(list)
+    for result in results:
+        by_kind[result.kind].append(result)
+    summary = {kind: summarize(x, elapsed) for kind, x in sorted(by_kind.items())}
+    summary["total"] = summarize(results, elapsed)
+    row = "{:<18} {:>8} {:>8} {:>9} {:>9} {:>9} {:>9}"
+    print(f"\ntarget {rate:g} req/s")
+    print(
+        row.format(
+            "kind", "requests", "errors", "p50 (ms)", "p95 (ms)", "p99 (ms)", "req/s"
+        )
+    )
+    for kind, result in summary.items():
+        print(
+            row.format(
+                kind,
+                result["requests"],
+                "%.1f%%" % (result["errors"] * 100),
+                "%.2f" % (result["p50"] * 1000),
+                "%.2f" % (result["p95"] * 1000),
+                "%.2f" % (result["p99"] * 1000),
+                "%.0f" % result["throughput"],
+            )
+        )
+    return summary
+
+
+def report_stages(rates, stages, factor):
+    """
+    Print p95 per stage & rate, and the first rate each stage saturates at
+    """
+    names = sorted({name for by_name in stages for name in by_name})
+    row = "{:<26}" + " {:>9}" * len(rates) + " {:>11}"
+    print("\nstage p95 (ms) by target req/s")
+    print(row.format("stage", *("%g" % x for x in rates), "saturates"))
+    saturation = {}
+    for name in names:
+        p95s = [
+            percentile(by_name[name], 95) if by_name.get(name) else None
+            for by_name in stages
+        ]
+        base = next((x for x in p95s if x is not None), None)
+        saturation[name] = next(
+            (
+                rate
+                for rate, p95 in zip(rates, p95s)
+                if p95 is not None and p95 > base * factor
+            ),
+            None,
+        )
+        cells = ["-" if x is None else "%.2f" % (x * 1000) for x in p95s]
+        print(
+            row.format(
+                name, *cells, "%g" % saturation[name] if saturation[name] else "-"
+            )
+        )
+    return saturation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="announcement")
+    parser.add_argument("-r", "--rates", default="25,50,100,200")
+    parser.add_argument("-d", "--duration", type=float, default=5.0)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--actions", type=int, default=20)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--saturation", type=float, default=2.0)
+    parser.add_argument("-u", "--url", help="Drive HTTP endpoint instead")
+    parser.add_argument("--secret", default=standin.SECRET["SLACK_SIGNING_SECRET"])
+    parser.add_argument("--events-latency", type=float, default=0.0)
+    parser.add_argument("--responder-latency", type=float, default=0.0)
+    parser.add_argument("--slack-latency", type=float, default=0.0)
+    parser.add_argument("-o", "--output", help="Write JSON results to file")
+    args = parser.parse_args()
+    rates = [float(x) for x in args.rates.split(",")]
+    signer = Signer(secret=args.secret, version="v0")
+    traffic = Traffic(signer, MIXES[args.mix], args.actions, args.seed)
+
+    # Point receiver at stand-ins, or at remote endpoint
+    tracer = None
+    if args.url:
+        send = Remote(args.url)
+        patch = mock.patch.dict(os.environ)
+    else:
+        _, endpoint = standin.start(
+            events=args.events_latency,
+            responder=args.responder_latency,
+            slack=args.slack_latency,
+        )
+        os.environ.update(
+            AWS_ACCESS_KEY_ID="AKIAXXXXXXXXXXXX",
+            AWS_SECRET_ACCESS_KEY="xxxxxxxxxxxxxxxxxxxxxxxxxxxx",
+            AWS_DEFAULT_REGION="us-east-1",
+            AWS_ENDPOINT_URL=endpoint,
+        )
+        import server
+
+        server.index.bot.pool = standin.LocalPool(endpoint)
+        server.index.logger.logger.disabled = True
+        oauth_url = f"{endpoint}/api/oauth.v2.access"
+        local_urlopen = lambda r: urlopen(URLRequest(oauth_url, r.data, r.headers))
+        patch = mock.patch("app.slackbot.urlopen", local_urlopen)
+        tracer = trace.tracer = StageTracer()
+        send = InProcess(server)
+
+    # Step through target rates
+    results = {"mix": args.mix, "rates": {}}
+    stages = []
+    with patch:
+        for rate in rates:
+            runs, elapsed = run(send, traffic, rate, args.duration, args.concurrency)
+            results["rates"][f"{rate:g}"] = report(rate, runs, elapsed)
+            if tracer is not None:
+                stages.append(tracer.reset())
+    saturated = next(
+        (
+            rate
+            for rate, result in zip(rates, results["rates"].values())
+            if result["total"]["throughput"] < rate * 0.9
+        ),
+        None,
+    )
+    results["throughput_saturation"] = saturated
+    print(f"\nthroughput saturates at: {f'{saturated:g} req/s' if saturated else '-'}")
+    if stages:
+        results["saturation"] = report_stages(rates, stages, args.saturation)
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(results, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
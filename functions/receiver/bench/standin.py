@@ -0,0 +1,78 @@
+"""
+Local stand-ins for AWS, the responder API & Slack, with injected latency
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import sleep
+from urllib.parse import urlsplit, urlunsplit
+
+from app.pool import ConnectionPool
+
+SECRET = {
+    "SLACK_OAUTH_CLIENT_ID": "CLIENT_ID",
+    "SLACK_OAUTH_CLIENT_SECRET": "CLIENT_SECRET",
+    "SLACK_SIGNING_SECRET": "SECRET!",
+}
+
+
+class StandIn(BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+    latency = {"events": 0.0, "responder": 0.0, "slack": 0.0}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("content-length") or 0))
+        target = self.headers.get("x-amz-target") or ""
+        if target.endswith("GetSecretValue"):
+            data = {"SecretString": json.dumps(SECRET)}
+        elif target.endswith("PutEvents"):
+            sleep(self.latency["events"])
+            entries = json.loads(body)["Entries"]
+            data = {
+                "FailedEntryCount": 0,
+                "Entries": [{"EventId": str(i)} for i, _ in enumerate(entries)],
+            }
+        elif self.path.startswith("/api/"):
+            sleep(self.latency["slack"])
+            data = {"ok": True, "app_id": "A1", "team": {"id": "T1"}}
+        else:
+            sleep(self.latency["responder"])
+            data = {"options": []}
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_):
+        ...
+
+
+class LocalPool(ConnectionPool):
+    """
+    Connection pool that sends every request to the stand-in over HTTP
+    """
+
+    def __init__(self, endpoint, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = urlsplit(endpoint)
+
+    def request(self, method, url, body=None, headers=None):
+        parts = urlsplit(url)._replace(
+            scheme=self.endpoint.scheme, netloc=self.endpoint.netloc
+        )
+        return super().request(method, urlunsplit(parts), body, headers)
+
+
+def start(events=0.0, responder=0.0, slack=0.0):
+    """
+    Start stand-in server in background & return ``(server, endpoint)``
+    """
+    handler = type("StandIn", (StandIn,), {})
+    handler.latency = {"events": events, "responder": responder, "slack": slack}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
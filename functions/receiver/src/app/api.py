@@ -2,61 +2,174 @@
 API Generator
 """
 import json
+import re
 
+from . import trace
 from .errors import Forbidden
+from .events import ProxyEvent
 from .logger import logger
+from .metrics import metrics
+
+
+class Route:
+    """
+    Route compiled once at registration
+
+    Middleware are applied in order, outermost first. Each takes the next
+    handler in the chain & returns a handler, eg.
+
+    >>> def verified(call_next):
+    ...     def verified(event):
+    ...         bot.verify(event)
+    ...         return call_next(event)
+    ...     return verified
+
+    :param str method: HTTP method or ``ANY``
+    :param str path: Route path, with parameters like ``/slash/{cmd}``
+    :param function handler: Handler called with the wrapped request
+    :param type event: ``ProxyEvent`` class used to wrap the request
+    :param list middleware: Middleware applied to the handler
+    """
+
+    def __init__(self, method, path, handler, event=None, middleware=None):
+        self.method = method
+        self.path = path
+        self.key = f"{method} {path}"
+        self.event = event or ProxyEvent
+        self.pattern = None
+        if "{" in path:
+            regex = re.sub(r"\\{(\w+)\\\+\\}", r"(?P<\1>.+)", re.escape(path))
+            regex = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", regex)
+            self.pattern = re.compile(regex)
+        for wrap in reversed(middleware or []):
+            handler = wrap(handler)
+        self.handler = handler
+
+    def __call__(self, request):
+        if self.pattern is not None and not request.get("pathParameters"):
+            match = self.pattern.fullmatch(request.get("rawPath") or "")
+            if match:
+                request["pathParameters"] = match.groupdict()
+        return self.handler(self.event(request))
+
+    def match(self, path):
+        """
+        Match request path against route path
+        """
+        if self.pattern is None:
+            return path == self.path
+        return self.pattern.fullmatch(path) is not None
 
 
 class Api:
     def __init__(self):
         self.routes = {}
+        self.patterns = []
 
     def handle(self, event):
         # Extract route method
-        route_key = event["routeKey"]
+        route_key = event.get("routeKey")
         route = self.routes.get(route_key)
-
-        # Raise 403 FORBIDDEN if bad route
         if route is None:
-            raise Forbidden
+            route = self.match(event)
+            if route is not None:
+                event["routeKey"] = route.key
 
-        # Execute request
-        return route(event)
+        name = route.key if route else str(route_key)
+        with trace.span(name, trace.SPAN_KIND_SERVER) as span:
+            # Raise 403 FORBIDDEN if bad route
+            if route is None:
+                raise Forbidden
+            metrics.count("Requests", Route=route.key)
 
-    def route(self, path, method):
-        def inner(handler):
-            def wrapper(request):
-                return handler(request)
+            # Execute request
+            response = route(event)
+            if span:
+                span.set(
+                    **{
+                        "http.route": route.key,
+                        "http.response.status_code": int(response["statusCode"]),
+                    }
+                )
+            return response
+
+    def match(self, event):
+        """
+        Match request without a ``routeKey`` by method & path
+        """
+        method = event["requestContext"]["http"]["method"]
+        path = event["rawPath"]
+        route = self.routes.get(f"{method} {path}") or self.routes.get(f"ANY {path}")
+        if route is not None:
+            return route
+        for route in self.patterns:
+            if route.method in (method, "ANY") and route.match(path):
+                return route
+        return None
 
-            self.routes[f"{method} {path}"] = wrapper
-            return wrapper
+    def route(self, path, method, event=None, middleware=None):
+        def inner(handler):
+            route = Route(method, path, handler, event, middleware)
+            self.routes[route.key] = route
+            if route.pattern is not None:
+                self.patterns.append(route)
+            return handler
 
         return inner
 
-    def any(self, path):
-        return self.route(path, "ANY")
+    def any(self, path, event=None, middleware=None):
+        return self.route(path, "ANY", event, middleware)
 
-    def post(self, path):
-        return self.route(path, "POST")
+    def post(self, path, event=None, middleware=None):
+        return self.route(path, "POST", event, middleware)
 
-    @classmethod
-    def reject(cls, code):
-        return cls.respond(code, {"ok": False})
+    @staticmethod
+    def reject(code):
+        """
+        Send ``{"ok": false}`` error response (built once per status code)
+        """
+        response = REJECTIONS.get(code)
+        if response is None:
+            response = REJECTIONS[code] = get_response(code, {"ok": False})
+        log_response(code, response["body"])
+        return dict(response, headers=dict(response["headers"]))
 
     @staticmethod
     def respond(code, body=None, **headers):
         """
         Send response instead of passing through to API Gateway
 
+        Bodiless responses without extra headers are built once per status code.
+
         :param int code: HTTP status code
         :param str desc: HTTP status text
         :param str body: HTTP response body
         """
-        body = json.dumps(body) if body else ""
-        if int(code) < 400:
-            logger.info("RESPONSE [%d] %s", code, body or "-")
+        if body or headers:
+            response = get_response(code, body, headers)
         else:
-            logger.error("RESPONSE [%d] %s", code, body or "-")
-        headers.setdefault("content-type", "application/json; charset=utf-8")
-        response = {"statusCode": str(code), "body": body, "headers": headers}
+            response = RESPONSES.get(code)
+            if response is None:
+                response = RESPONSES[code] = get_response(code)
+            response = dict(response, headers=dict(response["headers"]))
+        log_response(code, response["body"])
         return response
+
+
+REJECTIONS = {}
+RESPONSES = {}
+
+
+def get_response(code, body=None, headers=None):
+    body = json.dumps(body) if body else ""
+    headers = headers or {}
+    headers.setdefault("content-type", "application/json; charset=utf-8")
+    response = {"statusCode": str(code), "body": body, "headers": headers}
+    return response
+
+
+def log_response(code, body):
+    if int(code) < 400:
+        logger.info("RESPONSE [%d] %s", code, body or "-")
+    else:
+        logger.error("RESPONSE [%d] %s", code, body or "-")
@@ -1,28 +1,300 @@
 import json
-from urllib.parse import parse_qsl
-
-import boto3
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from hashlib import md5
+from time import monotonic, sleep
 
+from . import deadline, trace
+from .clients import get_client, get_client_errors
 from .env import EVENT_BUS_NAME
 from .logger import logger
 
+MAX_ENTRIES = 10
+MAX_BYTES = 256 * 1024
+RETRYABLE_ERRORS = {
+    "InternalException",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "ThrottlingException",
+}
 
-class EventBus:
-    def __init__(self, name=None, session=None):
-        self.name = name or EVENT_BUS_NAME
-        self.session = session or boto3.Session()
-        self.client = self.session.client("events")
+
+def get_entry_size(entry):
+    """
+    Get size of PutEvents entry as calculated by EventBridge
+
+    See https://docs.aws.amazon.com/eventbridge/latest/userguide/eb-putevent-size.html
+    """
+    size = 14 if entry.get("Time") else 0
+    for key in ("Source", "DetailType", "Detail"):
+        size += len((entry.get(key) or "").encode())
+    for resource in entry.get("Resources") or []:
+        size += len(resource.encode())
+    return size
+
+
+def get_message_size(entry):
+    """
+    Get size of entry serialized as an SQS message or Kinesis record
+    """
+    return len(json.dumps(entry).encode())
+
+
+def iter_batches(
+    entries,
+    max_entries=MAX_ENTRIES,
+    max_bytes=MAX_BYTES,
+    max_entry_bytes=None,
+    get_size=get_entry_size,
+):
+    """
+    Pack ``(index, entry)`` pairs into batches that are valid for PutEvents
+
+    Entries that cannot fit in any batch are yielded alone with ``None`` size
+    """
+    batch = []
+    batch_size = 0
+    for index, entry in entries:
+        size = get_size(entry)
+        if size > (max_entry_bytes or max_bytes):
+            yield [(index, entry)], None
+            continue
+        if len(batch) == max_entries or batch_size + size > max_bytes:
+            yield batch, batch_size
+            batch = []
+            batch_size = 0
+        batch.append((index, entry))
+        batch_size += size
+    if batch:
+        yield batch, batch_size
+
+
+class BatchPublisher:
+    """
+    Base class for batching publishers
+
+    Entries are packed into batches of at most ``max_entries`` entries &
+    ``max_bytes`` bytes that are sent concurrently. Failed entries are re-sent
+    with jittered exponential backoff until they succeed, ``max_attempts`` is
+    reached, or the invocation deadline would be exceeded.
+
+    Subclasses implement ``put()`` to send one batch.
+    """
+
+    max_entries = MAX_ENTRIES
+    max_bytes = MAX_BYTES
+    max_entry_bytes = None
+    retryable_errors = RETRYABLE_ERRORS
+
+    def __init__(
+        self,
+        max_attempts=5,
+        max_workers=4,
+        backoff_base=0.05,
+        backoff_cap=1.0,
+    ):
+        self.max_attempts = max_attempts
+        self.max_workers = max_workers
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.executor = None
 
     def publish(self, *entries):
-        params = {"Entries": list(entries)}
-        logger.info("events:PutEvents %s", json.dumps(params))
-        return self.client.put_events(**params)
+        """
+        Publish entries
+
+        :returns dict: PutEvents-style report with one result per entry
+        """
+        with trace.span(self.action, trace.SPAN_KIND_CLIENT) as span:
+            results = [None] * len(entries)
+            pending = list(enumerate(entries))
+            attempt = 0
+            while pending:
+                attempt += 1
+                batches = list(self.iter_batches(pending))
+                pending = []
+                for batch, result in self.send_batches(batches):
+                    for (index, entry), item in zip(batch, result):
+                        results[index] = dict(item, Attempts=attempt)
+                        if item.get("ErrorCode") in self.retryable_errors:
+                            pending.append((index, entry))
+                if not pending or attempt >= self.max_attempts:
+                    break
+                backoff = random.uniform(
+                    0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+                )
+                if monotonic() + backoff >= deadline.get():
+                    break
+                sleep(backoff)
+
+            # Log & return report
+            failed = [x for x in results if "ErrorCode" in x]
+            for result in failed:
+                logger.error(
+                    "%s FAILED %s", self.action, logger.json(result, full=True)
+                )
+            report = {"FailedEntryCount": len(failed), "Entries": results}
+            span.set(
+                **{
+                    "publish.sink": getattr(self, "name", None),
+                    "publish.entries": len(entries),
+                    "publish.failed": len(failed),
+                    "publish.attempts": attempt,
+                }
+            )
+            return report
+
+    def iter_batches(self, entries):
+        return iter_batches(
+            entries,
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+            max_entry_bytes=self.max_entry_bytes,
+            get_size=self.get_size,
+        )
+
+    def send_batches(self, batches):
+        if len(batches) == 1:
+            return [(batches[0][0], self.send_batch(*batches[0]))]
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.max_workers)
+        futures = [self.executor.submit(self.send_batch, *x) for x in batches]
+        return [(batch, f.result()) for (batch, _), f in zip(batches, futures)]
+
+    def send_batch(self, batch, size):
+        # Reject entries that are too large to ever be sent
+        if size is None:
+            limit = self.max_entry_bytes or self.max_bytes
+            error = {
+                "ErrorCode": "ValidationException",
+                "ErrorMessage": f"Entry size exceeds {limit} bytes",
+            }
+            return [error for _ in batch]
+
+        # Send batch
+        try:
+            return self.put([entry for _, entry in batch])
+        except get_client_errors() as err:
+            error = {
+                "ErrorCode": err.response["Error"]["Code"],
+                "ErrorMessage": err.response["Error"].get("Message"),
+            }
+            return [error for _ in batch]
+
+    def get_size(self, entry):
+        return get_message_size(entry)
+
+    def put(self, entries):
+        raise NotImplementedError
+
+
+class EventBus(BatchPublisher):
+    action = "events:PutEvents"
+
+    def __init__(self, name=None, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name or EVENT_BUS_NAME
+        self.session = session
+
+    @cached_property
+    def client(self):
+        return get_client("events", self.session)
+
+    def get_size(self, entry):
+        return get_entry_size(entry)
+
+    def put(self, entries):
+        # Entries may be routed here from another bus
+        params = {"Entries": [dict(x, EventBusName=self.name) for x in entries]}
+        if logger.sample("PUBLISH"):
+            logger.info("%s %s", self.action, logger.json(params))
+        result = self.client.put_events(**params)
+        return result["Entries"]
+
+
+class Queue(BatchPublisher):
+    """
+    Publish entries as JSON messages to an SQS queue
+    """
+
+    action = "sqs:SendMessageBatch"
+    retryable_errors = RETRYABLE_ERRORS | {"RequestThrottled"}
+
+    def __init__(self, url, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.name = url
+        self.url = url
+        self.session = session
+
+    @cached_property
+    def client(self):
+        return get_client("sqs", self.session)
+
+    def put(self, entries):
+        params = {
+            "QueueUrl": self.url,
+            "Entries": [
+                {"Id": str(i), "MessageBody": json.dumps(entry)}
+                for i, entry in enumerate(entries)
+            ],
+        }
+        if logger.sample("PUBLISH"):
+            logger.info("%s %s", self.action, logger.json(params))
+        result = self.client.send_message_batch(**params)
+        results = [None] * len(entries)
+        for item in result.get("Successful") or []:
+            results[int(item["Id"])] = {"MessageId": item["MessageId"]}
+        for item in result.get("Failed") or []:
+            code = item["Code"] if not item.get("SenderFault") else "SenderFault"
+            results[int(item["Id"])] = {
+                "ErrorCode": code,
+                "ErrorMessage": item.get("Message"),
+            }
+        return results
+
+
+class Stream(BatchPublisher):
+    """
+    Publish entries as JSON records to a Kinesis data stream
+    """
+
+    action = "kinesis:PutRecords"
+    max_entries = 500
+    max_bytes = 5 * 1024 * 1024
+    max_entry_bytes = 1024 * 1024
+    retryable_errors = RETRYABLE_ERRORS | {"ProvisionedThroughputExceededException"}
+
+    def __init__(self, name, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.session = session
+
+    @cached_property
+    def client(self):
+        return get_client("kinesis", self.session)
+
+    def get_size(self, entry):
+        # Record data plus 32-character partition key
+        return get_message_size(entry) + 32
+
+    def put(self, entries):
+        records = []
+        for entry in entries:
+            data = json.dumps(entry).encode()
+            key = md5(data).hexdigest()
+            records.append({"Data": data, "PartitionKey": key})
+        params = {"StreamName": self.name, "Records": records}
+        logger.info("%s %s", self.action, json.dumps({"StreamName": self.name}))
+        result = self.client.put_records(**params)
+        return result["Records"]
 
 
 class SigV4Signer:
     def __init__(self, session=None):
+        import boto3
+        from botocore.auth import SigV4Auth
+
         self.session = session or boto3.Session()
         self.sigv4auth = SigV4Auth(
             credentials=self.session.get_credentials(),
@@ -31,6 +303,8 @@ class SigV4Signer:
         )
 
     def get_headers(self, *args, **kwargs):
+        from botocore.awsrequest import AWSRequest
+
         # Prepare AWS request
         awsrequest = AWSRequest(*args, **kwargs)
         awsrequest.prepare()
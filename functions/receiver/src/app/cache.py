@@ -0,0 +1,99 @@
+"""
+Responder Response Cache
+"""
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+MENU_CACHE = json.loads(os.getenv("MENU_CACHE") or "{}")
+MENU_CACHE_MAXSIZE = int(os.getenv("MENU_CACHE_MAXSIZE") or "1000")
+MENU_CACHE_MAX_BYTES = int(os.getenv("MENU_CACHE_MAX_BYTES") or "65536")
+
+MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*\"?(\d+)", re.I)
+NO_STORE = re.compile(r"(?:^|,)\s*(?:no-store|no-cache|private)\b", re.I)
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of responder responses, keyed per ``action_id``
+
+    Caching is opt-in: ``ttls`` maps each cacheable ``action_id`` (or
+    ``"*"`` for any) to the seconds a response is kept. A ``Cache-Control``
+    header returned by the responder takes precedence: ``no-store``,
+    ``no-cache`` & ``private`` responses are never cached, and ``max-age``
+    (or ``s-maxage``) replaces the configured TTL.
+
+    :Example:
+
+    >>> ResponseCache({"*": 30, "slack_oauth_scopes": 3600})
+
+    :param dict ttls: Map of ``action_id`` to TTL in seconds
+    :param int maxsize: Maximum number of cached responses
+    :param int max_bytes: Maximum body size of a cached response
+    """
+
+    def __init__(self, ttls=None, maxsize=None, max_bytes=None):
+        self.ttls = MENU_CACHE if ttls is None else ttls
+        self.maxsize = maxsize or MENU_CACHE_MAXSIZE
+        self.max_bytes = max_bytes or MENU_CACHE_MAX_BYTES
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "size": 0}
+
+    def get_ttl(self, action_id):
+        """
+        Get configured TTL for ``action_id``, or ``None`` if not cacheable
+        """
+        ttl = self.ttls.get(action_id, self.ttls.get("*"))
+        return float(ttl) if ttl else None
+
+    def get(self, key):
+        """
+        Get cached response, or ``None`` if missing or expired
+        """
+        now = monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                self.stats["size"] = len(self.entries)
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        response = entry[1]
+        return dict(response, headers=dict(response["headers"]))
+
+    def put(self, key, response, ttl):
+        """
+        Cache successful response for ``ttl`` seconds, unless the responder's
+        ``Cache-Control`` header forbids it
+
+        :returns bool: ``True`` if the response was cached
+        """
+        if int(response["statusCode"]) != 200:
+            return False
+        if len(response["body"]) > self.max_bytes:
+            return False
+        headers = {k.lower(): v for k, v in response["headers"].items()}
+        control = headers.get("cache-control") or ""
+        if NO_STORE.search(control):
+            return False
+        max_age = MAX_AGE.search(control)
+        if max_age:
+            ttl = int(max_age.group(1))
+        if not ttl:
+            return False
+        response = dict(response, headers=dict(response["headers"]))
+        with self.lock:
+            self.entries[key] = (monotonic() + ttl, response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            self.stats["size"] = len(self.entries)
+        return True
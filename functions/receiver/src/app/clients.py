@@ -0,0 +1,170 @@
+"""
+AWS Clients
+
+The receiver only needs ``events:PutEvents``, ``secretsmanager:GetSecretValue``
+and SigV4 signing on its hot path, so by default it uses the small built-in
+clients below over pooled HTTPS connections. ``boto3`` is imported only when
+selected with ``AWS_CLIENT=boto3``, when an explicit session is given, for
+services without a built-in client, or when the environment has no
+credentials for the built-in clients (eg. in a container whose credentials
+come from the ECS/EKS credential provider).
+"""
+import json
+import os
+import sys
+
+from . import sigv4
+from .logger import logger
+from .pool import ConnectionPool
+
+AWS_CLIENT = os.getenv("AWS_CLIENT") or "lite"
+
+
+class ClientError(Exception):
+    """
+    AWS API error, shaped like ``botocore.exceptions.ClientError``
+    """
+
+    def __init__(self, code, message, status, operation):
+        super().__init__(f"An error occurred ({code}) when calling {operation}")
+        self.response = {
+            "Error": {"Code": code, "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        }
+        self.operation_name = operation
+
+
+class JSONClient:
+    """
+    Client for AWS JSON-protocol APIs
+    """
+
+    service_name = None
+    signing_name = None
+    target_prefix = None
+    json_version = "1.1"
+
+    def __init__(self, region_name=None, credentials=None, pool=None):
+        self.region_name = region_name or sigv4.get_region()
+        self.credentials = credentials
+        self.pool = pool or POOL
+        self.url = get_endpoint_url(self.service_name, self.region_name)
+
+    def call(self, operation, params):
+        body = json.dumps(params).encode()
+        headers = {
+            "content-type": f"application/x-amz-json-{self.json_version}",
+            "x-amz-target": f"{self.target_prefix}.{operation}",
+        }
+        credentials = self.credentials or sigv4.Credentials.from_env()
+        signed_headers = sigv4.sign(
+            "POST",
+            self.url,
+            headers,
+            body,
+            self.signing_name or self.service_name,
+            self.region_name,
+            credentials,
+        )
+        res = self.pool.request("POST", self.url, body, signed_headers)
+        try:
+            data = json.loads(res.body or b"{}")
+        except ValueError:
+            # eg. HTML error page from a proxy
+            data = None
+        if res.status >= 300 or not isinstance(data, dict):
+            if isinstance(data, dict):
+                code = (data.get("__type") or "UnknownError").rsplit("#", 1)[-1]
+                message = data.get("message") or data.get("Message")
+            else:
+                code = "UnknownError"
+                message = res.body.decode(errors="replace")
+            raise ClientError(code, message, res.status, operation)
+        return data
+
+
+class EventsClient(JSONClient):
+    service_name = "events"
+    target_prefix = "AWSEvents"
+
+    def put_events(self, **params):
+        return self.call("PutEvents", params)
+
+
+class SecretsManagerClient(JSONClient):
+    service_name = "secretsmanager"
+    target_prefix = "secretsmanager"
+
+    def get_secret_value(self, **params):
+        return self.call("GetSecretValue", params)
+
+
+def get_client_errors():
+    """
+    Get ``ClientError`` types the clients in use may raise
+
+    botocore's ``ClientError`` is only included once botocore has been
+    imported (ie. a ``boto3`` client is in use), so the built-in clients
+    never pay for importing it.
+
+    :Example:
+
+    >>> try:
+    ...     client.put_events(Entries=entries)
+    ... except get_client_errors() as err:
+    ...     code = err.response["Error"]["Code"]
+    """
+    exceptions = sys.modules.get("botocore.exceptions")
+    if exceptions is None:
+        return (ClientError,)
+    return (ClientError, exceptions.ClientError)
+
+
+CLIENTS = {
+    "events": EventsClient,
+    "secretsmanager": SecretsManagerClient,
+}
+
+POOL = ConnectionPool()
+
+
+def get_endpoint_url(service, region):
+    """
+    Get service endpoint, honoring ``AWS_ENDPOINT_URL[_<SERVICE>]`` like boto3
+    """
+    return (
+        os.getenv(f"AWS_ENDPOINT_URL_{service.upper()}")
+        or os.getenv("AWS_ENDPOINT_URL")
+        or f"https://{service}.{region}.amazonaws.com/"
+    )
+
+
+def use_boto3(session=None):
+    return (
+        session is not None
+        or AWS_CLIENT == "boto3"
+        or "AWS_ACCESS_KEY_ID" not in os.environ
+    )
+
+
+def get_client(service, session=None):
+    """
+    Get built-in client for service, or ``boto3`` client if necessary
+    """
+    if use_boto3(session) or service not in CLIENTS:
+        import boto3
+
+        logger.debug("boto3 %s", service)
+        return (session or boto3.Session()).client(service)
+    return CLIENTS[service]()
+
+
+def get_sigv4signer(session=None):
+    """
+    Get built-in SigV4 signer, or ``botocore`` signer if necessary
+    """
+    if use_boto3(session):
+        from .aws import SigV4Signer
+
+        return SigV4Signer(session)
+    return sigv4.SigV4Signer()
@@ -0,0 +1,42 @@
+"""
+Invocation Deadline
+"""
+from contextvars import ContextVar
+from time import monotonic
+
+DEFAULT_TIMEOUT = 3.0
+
+DEADLINE = ContextVar("deadline", default=None)
+
+
+def bind(context=None, timeout=None):
+    """
+    Set the deadline of the current invocation from the Lambda context
+
+    :param object context: Lambda context object
+    :param float timeout: Fallback timeout in seconds if context is missing
+    """
+    try:
+        remaining = context.get_remaining_time_in_millis() / 1000
+    except AttributeError:
+        remaining = timeout or DEFAULT_TIMEOUT
+    deadline = monotonic() + remaining
+    DEADLINE.set(deadline)
+    return deadline
+
+
+def get():
+    """
+    Get the deadline of the current invocation as a ``monotonic()`` value
+    """
+    deadline = DEADLINE.get()
+    if deadline is None:
+        deadline = monotonic() + DEFAULT_TIMEOUT
+    return deadline
+
+
+def remaining():
+    """
+    Get seconds remaining in the current invocation
+    """
+    return max(get() - monotonic(), 0.0)
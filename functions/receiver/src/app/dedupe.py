@@ -0,0 +1,180 @@
+"""
+Slack Retry Deduplication
+"""
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+from time import monotonic, time
+
+DEDUPE_MAXSIZE = int(os.getenv("DEDUPE_MAXSIZE") or "10000")
+DEDUPE_STORE = os.getenv("DEDUPE_STORE")
+DEDUPE_TTL = float(os.getenv("DEDUPE_TTL") or "900")
+
+
+class LRUCache:
+    """
+    In-memory set of recently seen keys, bounded by size & age
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize or DEDUPE_MAXSIZE
+        self.ttl = ttl or DEDUPE_TTL
+        self.keys = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, key):
+        """
+        Add key unless it was seen within ``ttl`` seconds
+
+        :returns bool: ``True`` if the key was added
+        """
+        now = monotonic()
+        with self.lock:
+            expires = self.keys.get(key)
+            if expires is not None and expires > now:
+                self.keys.move_to_end(key)
+                return False
+            self.keys[key] = now + self.ttl
+            self.keys.move_to_end(key)
+            while len(self.keys) > self.maxsize:
+                self.keys.popitem(last=False)
+            return True
+
+    def discard(self, key):
+        with self.lock:
+            self.keys.pop(key, None)
+
+
+class FileStore:
+    """
+    Shared set of keys backed by marker files in a directory (eg. on EFS)
+
+    Keys are claimed with an exclusive create, so only one writer wins.
+    """
+
+    def __init__(self, path, ttl=None):
+        self.path = path
+        self.ttl = ttl or DEDUPE_TTL
+        os.makedirs(path, exist_ok=True)
+
+    def get_path(self, key):
+        return os.path.join(self.path, sha256(key.encode()).hexdigest())
+
+    def add(self, key):
+        path = self.get_path(key)
+        now = time()
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            os.utime(path, (now, now))
+            return True
+        except FileExistsError:
+            try:
+                if os.stat(path).st_mtime + self.ttl > now:
+                    return False
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return self.add(key)
+
+    def discard(self, key):
+        try:
+            os.remove(self.get_path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteStore:
+    """
+    Shared set of keys backed by a SQLite table
+
+    Keys are claimed with a conditional upsert that only succeeds if the key
+    is new or expired.
+    """
+
+    def __init__(self, path, ttl=None):
+        self.path = path
+        self.ttl = ttl or DEDUPE_TTL
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=1, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS dedupe "
+                "(key TEXT PRIMARY KEY, expires REAL NOT NULL)"
+            )
+
+    def add(self, key):
+        now = time()
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "INSERT INTO dedupe (key, expires) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET expires = excluded.expires "
+                "WHERE dedupe.expires <= ?",
+                (key, now + self.ttl, now),
+            )
+            return cursor.rowcount == 1
+
+    def discard(self, key):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM dedupe WHERE key = ?", (key,))
+
+
+STORES = {
+    "file": FileStore,
+    "sqlite": SQLiteStore,
+}
+
+
+class Deduplicator:
+    """
+    Claim event IDs so each is published at most once
+
+    Keys are checked against the per-container LRU cache first and then, if
+    configured, claimed in a shared store so retries landing on another
+    container are also recognised.
+
+    :Example:
+
+    >>> Deduplicator.from_config("sqlite:/mnt/efs/dedupe.db")
+    """
+
+    def __init__(self, cache=None, store=None):
+        self.cache = cache or LRUCache()
+        self.store = store
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build deduplicator from ``<type>:<path>`` store config
+        """
+        store = None
+        if config:
+            kind, path = config.split(":", 1)
+            store = STORES[kind](path)
+        return cls(store=store)
+
+    def claim(self, key):
+        """
+        Claim key
+
+        :returns bool: ``False`` if the key was already claimed
+        """
+        if not self.cache.add(key):
+            return False
+        if self.store is None:
+            return True
+        try:
+            return self.store.add(key)
+        except Exception:
+            # Let the retry claim it (eg. if the store is locked)
+            self.cache.discard(key)
+            raise
+
+    def release(self, key):
+        """
+        Release claimed key (eg. if publishing failed) so a retry can claim it
+        """
+        self.cache.discard(key)
+        if self.store is not None:
+            self.store.discard(key)
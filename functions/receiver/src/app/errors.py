@@ -7,5 +7,9 @@ class Forbidden(Exception):
     ...
 
 
+class InvalidSignature(Forbidden):
+    ...
+
+
 class NotFound(Exception):
     ...
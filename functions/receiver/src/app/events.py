@@ -1,14 +1,20 @@
 """
 CloudFront Events
 """
+
 import base64
 import json
+from functools import cached_property
 from urllib.parse import parse_qsl
 
 
 class ProxyEvent:
     """
     Handler for a CloudFront request event
+
+    The request body is decoded at most once per event; every accessor below
+    reads from the cached values so that ``verify``, ``publish``, ``resolve``
+    and the route handlers can share a single event object.
     """
 
     def __init__(self, event):
@@ -17,14 +23,28 @@ class ProxyEvent:
     def __getitem__(self, key):
         return self.event[key]
 
+    @cached_property
+    def body_bytes(self):
+        """
+        Base64-decoded body bytes
+        """
+        data = self.event.get("body") or ""
+        if self.event.get("isBase64Encoded"):
+            return base64.b64decode(data)
+        return data.encode()
+
+    @cached_property
+    def body(self):
+        """
+        Decoded body text
+        """
+        return self.body_bytes.decode()
+
     def get_body(self):
         """
         Get Base64-decoded body from request
         """
-        data = self.event["body"]
-        if self.event["isBase64Encoded"]:
-            return base64.b64decode(data).decode()
-        return data
+        return self.body
 
     def get_header(self, header, default=None):
         """
@@ -34,6 +54,13 @@ class ProxyEvent:
         header = headers.get(header) or default
         return header
 
+    def get_path_parameters(self):
+        """
+        Get path parameters from request
+        """
+        params = self.event.get("pathParameters") or {}
+        return params
+
     def get_query(self):
         """
         Get query from request
@@ -43,6 +70,43 @@ class ProxyEvent:
 
 
 class SlackEvent(ProxyEvent):
+    report = None  # Publish report, once published
+
+    @cached_property
+    def form(self):
+        """
+        URL-encoded form fields of body
+        """
+        return dict(parse_qsl(self.body))
+
+    @cached_property
+    def detail(self):
+        """
+        EventBridge Detail field, parsed once
+        """
+        return self.parse_detail()
+
+    @cached_property
+    def detail_json(self):
+        """
+        EventBridge Detail field, serialized once
+        """
+        return json.dumps(self.detail)
+
+    def parse_detail(self):
+        """
+        Parse EventBridge Detail field from body
+        """
+        body = self.body
+        detail = json.loads(body) if body else None
+        return detail
+
+    def get_event_id(self):
+        """
+        Get Slack event ID, if any
+        """
+        return None
+
     def get_source(self):
         """
         Get EventBridge DetailType source
@@ -60,9 +124,7 @@ class SlackEvent(ProxyEvent):
         """
         Get EventBridge Detail field
         """
-        body = self.get_body()
-        detail = json.loads(body) if body else None
-        return detail
+        return self.detail
 
     def get_entries(self, event_bus_name):
         """
@@ -70,20 +132,18 @@ class SlackEvent(ProxyEvent):
         """
         source = self.get_source()
         detail_type = self.get_detail_type()
-        detail = self.get_detail()
         entry = {
             "EventBusName": event_bus_name,
             "Source": source,
             "DetailType": detail_type,
-            "Detail": json.dumps(detail),
+            "Detail": self.detail_json,
         }
         yield entry
 
 
 class Callback(SlackEvent):
-    def get_detail(self):
-        body = self.get_body()
-        detail = json.loads(dict(parse_qsl(body))["payload"])
+    def parse_detail(self):
+        detail = json.loads(self.form["payload"])
         return detail
 
     def get_entries(self, event_bus_name):
@@ -92,13 +152,12 @@ class Callback(SlackEvent):
         entry = {
             "EventBusName": event_bus_name,
             "Source": source,
-            "Detail": json.dumps(detail),
+            "Detail": self.detail_json,
         }
         if source == "block_actions":
             actions = detail.get("actions") or []
             for action in actions:
-                entry["DetailType"] = action.get("action_id")
-                yield entry
+                yield {**entry, "DetailType": action.get("action_id")}
         elif source == "block_suggestion":
             entry["DetailType"] = detail.get("action_id")
             yield entry
@@ -120,6 +179,13 @@ class EventCallback(SlackEvent):
     def get_source(self):
         return "event_callback"
 
+    def get_event_id(self):
+        """
+        Get Slack event ID (the same across retries of a delivery)
+        """
+        detail = self.get_detail()
+        return detail.get("event_id")
+
     def get_detail_type(self):
         detail = self.get_detail()
         event = detail.get("event") or {}
@@ -147,7 +213,5 @@ class Slash(SlackEvent):
         detail_type = detail.get("command")
         return detail_type
 
-    def get_detail(self):
-        body = self.get_body()
-        detail = dict(parse_qsl(body))
-        return detail
+    def parse_detail(self):
+        return self.form
@@ -0,0 +1,219 @@
+"""
+EventBridge Pattern Filters
+"""
+import ipaddress
+import json
+import os
+import re
+
+EVENT_FILTER = os.getenv("EVENT_FILTER")
+
+MISSING = object()
+
+
+class Entry:
+    """
+    EventBridge event view of a PutEvents entry
+
+    ``Detail`` is only parsed if a pattern looks inside it.
+    """
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.detail = MISSING
+
+    def get(self, key, default=None):
+        if key == "source":
+            return self.entry.get("Source", default)
+        elif key == "detail-type":
+            return self.entry.get("DetailType", default)
+        elif key == "resources":
+            return self.entry.get("Resources", default)
+        elif key == "detail":
+            if self.detail is MISSING:
+                self.detail = json.loads(self.entry.get("Detail") or "{}")
+            return self.detail
+        return default
+
+
+def get_literal(value):
+    # Keep True/1 & False/0 apart
+    return (type(value) is bool, value)
+
+
+def compile_operator(rule):
+    """
+    Compile content-filter operator (eg. ``{"prefix": "app_"}``) into a
+    predicate of a field value
+    """
+    ((op, arg),) = rule.items()
+    if op == "exists":
+        return lambda value: (value is not MISSING) is arg
+    elif op == "prefix" or op == "suffix":
+        ignore_case = isinstance(arg, dict)
+        text = arg["equals-ignore-case"].lower() if ignore_case else arg
+        check = str.startswith if op == "prefix" else str.endswith
+
+        def affix(value):
+            if not isinstance(value, str):
+                return False
+            return check(value.lower() if ignore_case else value, text)
+
+        return affix
+    elif op == "equals-ignore-case":
+        text = arg.lower()
+        return lambda value: isinstance(value, str) and value.lower() == text
+    elif op == "wildcard":
+        regex = re.compile(".*".join(re.escape(x) for x in arg.split("*")))
+        return lambda value: isinstance(value, str) and bool(regex.fullmatch(value))
+    elif op == "numeric":
+        checks = [(OPERATORS[arg[i]], arg[i + 1]) for i in range(0, len(arg), 2)]
+
+        def numeric(value):
+            if type(value) not in (int, float):
+                return False
+            return all(check(value, bound) for check, bound in checks)
+
+        return numeric
+    elif op == "cidr":
+        network = ipaddress.ip_network(arg, strict=False)
+
+        def cidr(value):
+            try:
+                return ipaddress.ip_address(value) in network
+            except ValueError:
+                return False
+
+        return cidr
+    elif op == "anything-but":
+        if isinstance(arg, dict):
+            match = compile_operator(arg)
+        else:
+            match = compile_values(arg if isinstance(arg, list) else [arg])
+        return lambda value: value is not MISSING and not match(value)
+    raise ValueError(f"Unsupported pattern operator: {op}")
+
+
+OPERATORS = {
+    "=": lambda x, y: x == y,
+    "<": lambda x, y: x < y,
+    "<=": lambda x, y: x <= y,
+    ">": lambda x, y: x > y,
+    ">=": lambda x, y: x >= y,
+}
+
+
+def compile_values(rules):
+    """
+    Compile list of allowed values & operators into a predicate of a field
+    value; literals are looked up in a set
+    """
+    literals = {get_literal(x) for x in rules if not isinstance(x, dict)}
+    operators = [compile_operator(x) for x in rules if isinstance(x, dict)]
+
+    def match(value):
+        try:
+            if get_literal(value) in literals:
+                return True
+        except TypeError:
+            pass
+        return any(operator(value) for operator in operators)
+
+    return match
+
+
+def compile_field(key, rule):
+    """
+    Compile rule for one field into a predicate of an event (or nested object)
+    """
+    if isinstance(rule, dict):
+        inner = compile_pattern(rule)
+
+        def nested(event):
+            value = event.get(key, MISSING)
+            values = value if isinstance(value, list) else [value]
+            return any(inner(x) for x in values if isinstance(x, dict))
+
+        return nested
+
+    match = compile_values(rule)
+
+    def field(event):
+        value = event.get(key, MISSING)
+        if isinstance(value, list):
+            return any(match(x) for x in value)
+        return match(value)
+
+    return field
+
+
+def compile_pattern(pattern):
+    """
+    Compile EventBridge event pattern into a predicate of an event
+
+    Supports exact values, ``prefix``, ``suffix``, ``anything-but``,
+    ``exists``, ``equals-ignore-case``, ``wildcard``, ``numeric``, ``cidr``
+    & ``$or``.
+    """
+    tests = []
+    for key, rule in pattern.items():
+        if key == "$or":
+            alternatives = [compile_pattern(x) for x in rule]
+            tests.append(lambda event, x=alternatives: any(y(event) for y in x))
+        else:
+            tests.append(compile_field(key, rule))
+    return lambda event: all(test(event) for test in tests)
+
+
+class EventFilter:
+    """
+    Drop entries before publishing using EventBridge event patterns
+
+    Entries are kept if they match any ``allow`` pattern (or there are none)
+    and no ``deny`` pattern. Patterns are compiled once.
+
+    :Example:
+
+    >>> EventFilter.from_config(
+    ...     {
+    ...         "allow": [{"source": ["event_callback"], "detail-type": ["message"]}],
+    ...         "deny": [{"detail": {"event": {"subtype": ["bot_message"]}}}],
+    ...     }
+    ... )
+    """
+
+    def __init__(self, allow=None, deny=None):
+        self.allow = [compile_pattern(x) for x in allow or []]
+        self.deny = [compile_pattern(x) for x in deny or []]
+
+    def __bool__(self):
+        return bool(self.allow or self.deny)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build filter from JSON ``{"allow": [...], "deny": [...]}`` config
+        """
+        if isinstance(config, str):
+            config = json.loads(config)
+        config = config or {}
+        return cls(config.get("allow"), config.get("deny"))
+
+    def match(self, entry):
+        """
+        Check whether entry should be published
+        """
+        event = Entry(entry)
+        if self.allow and not any(x(event) for x in self.allow):
+            return False
+        return not any(x(event) for x in self.deny)
+
+    def apply(self, entries):
+        """
+        Split entries into ``(kept, dropped)``
+        """
+        kept = []
+        dropped = []
+        for entry in entries:
+            (kept if self.match(entry) else dropped).append(entry)
+        return kept, dropped
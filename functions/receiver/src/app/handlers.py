@@ -0,0 +1,134 @@
+"""
+In-Process Event Handlers
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+
+from .filters import Entry, compile_pattern
+from .logger import logger
+from .metrics import metrics
+
+HANDLER_MAX_WORKERS = int(os.getenv("HANDLER_MAX_WORKERS") or "4")
+HANDLER_TIMEOUT = float(os.getenv("HANDLER_TIMEOUT") or "1")
+
+
+class HandlerRegistry:
+    """
+    Run Python handlers for latency-critical entries instead of publishing
+
+    Handlers are registered against EventBridge event patterns & called with
+    the same entries ``get_entries`` yields for publishing. Matching entries
+    are handled on a bounded worker pool while the other entries are
+    published; entries whose handler raises are published after all, so an
+    EventBridge target can still process them.
+
+    :Example:
+
+    >>> @bot.handlers.on({"source": ["event_callback"], "detail-type": ["app_mention"]})
+    ... def app_mention(entry):
+    ...     detail = json.loads(entry["Detail"])
+    ...     ...
+
+    :param int max_workers: Maximum handlers running at once
+    :param float timeout: Maximum seconds to wait for handlers
+    """
+
+    def __init__(self, max_workers=None, timeout=None):
+        self.max_workers = max_workers or HANDLER_MAX_WORKERS
+        self.timeout = timeout or HANDLER_TIMEOUT
+        self.handlers = []
+        self.executor = None
+
+    def __bool__(self):
+        return bool(self.handlers)
+
+    def register(self, pattern, handler):
+        """
+        Register handler for entries matching pattern (first match wins)
+        """
+        self.handlers.append((compile_pattern(pattern), handler))
+        return handler
+
+    def on(self, pattern):
+        """
+        Decorator form of ``register()``
+        """
+
+        def inner(handler):
+            return self.register(pattern, handler)
+
+        return inner
+
+    def get_handler(self, entry):
+        """
+        Get handler for entry, or ``None`` if it should be published
+        """
+        event = Entry(entry)
+        for match, handler in self.handlers:
+            if match(event):
+                return handler
+        return None
+
+    def dispatch(self, entries, publish, timeout=None):
+        """
+        Run handlers of matching entries & publish the rest
+
+        Handlers are given up to ``timeout`` seconds (eg. what remains of the
+        invocation), bounded by the registry's own ``timeout`` so the
+        response is not held up by slow handlers. Handlers still running are
+        left to finish in the background but reported as failed
+        (``HandlerTimeout``), since a frozen or recycled container may never
+        finish them.
+
+        :param list entries: Entries from ``get_entries``
+        :param function publish: Function publishing entries, eg. ``Router.publish``
+        :param float timeout: Seconds to wait for handlers
+        :returns dict: PutEvents-style report with one result per entry
+        """
+        # Start handlers before publishing the rest
+        pending = []
+        unhandled = []
+        for index, entry in enumerate(entries):
+            handler = self.get_handler(entry)
+            if handler is None:
+                unhandled.append((index, entry))
+                continue
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.max_workers)
+            future = self.executor.submit(copy_context().run, handler, entry)
+            pending.append((index, entry, handler.__name__, future))
+        report = publish(*[entry for _, entry in unhandled])
+        if not pending:
+            return report
+
+        # Collect handler results & publish entries whose handler failed
+        results = [None] * len(entries)
+        for (index, _), result in zip(unhandled, report["Entries"]):
+            results[index] = result
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        wait([future for *_, future in pending], timeout)
+        failed = []
+        for index, entry, name, future in pending:
+            if not future.done():
+                logger.error("HANDLER %s PENDING after %.3fs", name, timeout)
+                metrics.count("HandlerTimeouts", Handler=name)
+                results[index] = {
+                    "Handler": name,
+                    "ErrorCode": "HandlerTimeout",
+                    "ErrorMessage": f"Handler still running after {timeout:.3f}s",
+                }
+            elif future.exception() is not None:
+                logger.error("HANDLER %s %s", name, future.exception())
+                metrics.count("HandlerErrors", Handler=name)
+                failed.append((index, entry))
+            else:
+                metrics.count("EntriesHandled", Handler=name)
+                results[index] = {"Handler": name}
+        if failed:
+            fallback = publish(*[entry for _, entry in failed])
+            for (index, _), result in zip(failed, fallback["Entries"]):
+                results[index] = result
+        failed = len([x for x in results if "ErrorCode" in x])
+        report = {"FailedEntryCount": failed, "Entries": results}
+        return report
@@ -0,0 +1,109 @@
+"""
+CloudWatch Embedded Metric Format
+"""
+import json
+import os
+import sys
+import threading
+from time import time
+
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE")
+
+
+class Metrics:
+    """
+    Aggregate metrics over an invocation & emit them as EMF log lines
+
+    Counters are summed and other observations are kept as value lists (for
+    CloudWatch to compute statistics). ``flush()`` writes every metric that
+    can share dimension values into a single EMF document, so an invocation
+    normally produces one line.
+
+    :param str namespace: CloudWatch namespace, or ``None``/``""`` to disable
+    """
+
+    def __init__(self, namespace=None, stream=None):
+        self.namespace = METRICS_NAMESPACE if namespace is None else namespace
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def count(self, name, value=1, **dimensions):
+        """
+        Add to counter
+        """
+        if not self.namespace:
+            return
+        key = (name, "Count", tuple(dimensions.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def observe(self, name, value, unit="None", **dimensions):
+        """
+        Record value of histogram
+        """
+        if not self.namespace:
+            return
+        key = (name, unit, tuple(dimensions.items()))
+        with self.lock:
+            self.values.setdefault(key, []).append(value)
+
+    def flush(self, timestamp=None):
+        """
+        Write aggregated metrics & reset
+        """
+        with self.lock:
+            values, self.values = self.values, {}
+        if not values:
+            return
+        timestamp = timestamp or int(time() * 1000)
+        stream = self.stream or sys.stdout
+        lines = "".join(
+            f"{json.dumps(document)}\n"
+            for document in self.get_documents(values, timestamp)
+        )
+        stream.write(lines)
+        stream.flush()
+
+    def get_documents(self, values, timestamp):
+        """
+        Pack metrics into as few EMF documents as dimension values allow
+        """
+        groups = []
+        for (name, unit, dimensions), value in values.items():
+            dimensions = dict(dimensions)
+            for group in groups:
+                if name in group["values"]:
+                    continue
+                if all(
+                    group["dimensions"].get(k, v) == v for k, v in dimensions.items()
+                ):
+                    break
+            else:
+                group = {"dimensions": {}, "values": {}, "directives": {}}
+                groups.append(group)
+            group["dimensions"].update(dimensions)
+            group["values"][name] = value
+            keys = tuple(dimensions)
+            group["directives"].setdefault(keys, []).append(
+                {"Name": name, "Unit": unit}
+            )
+
+        for group in groups:
+            directives = [
+                {
+                    "Namespace": self.namespace,
+                    "Dimensions": [list(keys)],
+                    "Metrics": metrics,
+                }
+                for keys, metrics in group["directives"].items()
+            ]
+            document = {
+                "_aws": {"Timestamp": timestamp, "CloudWatchMetrics": directives},
+                **group["dimensions"],
+                **group["values"],
+            }
+            yield document
+
+
+metrics = Metrics()
@@ -0,0 +1,167 @@
+"""
+HTTP Connection Pool
+"""
+import gzip
+import os
+import select
+import ssl
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from http.client import BadStatusLine, HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+from .logger import logger
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT") or "1")
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT") or "2.5")
+MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE") or "10")
+
+IDEMPOTENT_METHODS = {"DELETE", "GET", "HEAD", "OPTIONS", "PUT"}
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict
+    body: bytes
+
+
+class ConnectionPool:
+    """
+    Persistent HTTP/1.1 keep-alive connections, pooled per host
+
+    Idle connections are checked before reuse; a reused connection that turns
+    out to have been closed by the server is replaced by a new one and the
+    request is sent again, but only if it failed before the request was sent
+    or the method is idempotent, so a POST the server may have processed is
+    never repeated. Redirects are not followed.
+
+    Counters are kept in ``stats``:
+
+    - ``connections`` — new connections (TCP/TLS handshakes)
+    - ``reused`` — requests sent over an already open connection
+    - ``stale`` — idle connections found closed by the server
+    """
+
+    def __init__(self, connect_timeout=None, read_timeout=None, maxsize=None):
+        self.connect_timeout = connect_timeout or CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or READ_TIMEOUT
+        self.maxsize = maxsize or MAXSIZE
+        self.idle = defaultdict(list)
+        self.lock = threading.Lock()
+        self.stats = Counter(connections=0, reused=0, stale=0)
+        self.ssl_context = ssl.create_default_context()
+
+    def request(self, method, url, body=None, headers=None):
+        """
+        Send HTTP request and read the response
+
+        :param str method: HTTP method
+        :param str url: HTTP URL
+        :param bytes body: HTTP request body
+        :param dict headers: HTTP request headers
+        :returns Response: HTTP response
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        while True:
+            conn, reused = self.acquire(key)
+            sent = False
+            try:
+                conn.request(method, path, body, headers or {})
+                sent = True
+                res = conn.getresponse()
+                data = res.read()
+            except (BadStatusLine, ConnectionError):
+                conn.close()
+                if reused and (not sent or method in IDEMPOTENT_METHODS):
+                    self.count("stale")
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            self.release(key, conn, res.will_close)
+            return self.decode(Response(res.status, dict(res.headers), data))
+
+    def acquire(self, key):
+        # Reuse idle connection if it is still open
+        while True:
+            with self.lock:
+                conn = self.idle[key].pop() if self.idle[key] else None
+            if conn is None:
+                break
+            if self.is_dropped(conn):
+                conn.close()
+                self.count("stale")
+                continue
+            self.count("reused")
+            return conn, True
+
+        # Open new connection
+        scheme, host, port = key
+        logger.debug("CONNECT %s://%s", scheme, host)
+        if scheme == "https":
+            conn = HTTPSConnection(
+                host, port, timeout=self.connect_timeout, context=self.ssl_context
+            )
+        else:
+            conn = HTTPConnection(host, port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        self.count("connections")
+        return conn, False
+
+    def release(self, key, conn, will_close=False):
+        with self.lock:
+            if not will_close and len(self.idle[key]) < self.maxsize:
+                self.idle[key].append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        """
+        Close all idle connections
+        """
+        with self.lock:
+            conns = [x for xs in self.idle.values() for x in xs]
+            self.idle.clear()
+        for conn in conns:
+            conn.close()
+
+    @staticmethod
+    def decode(response):
+        """
+        Decompress gzip-encoded response body
+        """
+        keys = {x.lower(): x for x in response.headers}
+        encoding = keys.get("content-encoding")
+        if encoding and response.headers[encoding].lower() == "gzip":
+            response.body = gzip.decompress(response.body)
+            del response.headers[encoding]
+            if "content-length" in keys:
+                response.headers[keys["content-length"]] = str(len(response.body))
+        return response
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def is_dropped(conn):
+        """
+        An idle keep-alive socket that is readable has been closed (or sent
+        unexpected data) by the server and cannot be reused
+        """
+        if conn.sock is None:
+            return True
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
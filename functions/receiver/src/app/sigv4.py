@@ -0,0 +1,131 @@
+"""
+AWS Signature Version 4
+
+Minimal SigV4 signing for the receiver's hot path, so ``boto3`` and
+``botocore`` need not be imported.
+
+See https://docs.aws.amazon.com/general/latest/gr/sigv4_signing.html
+"""
+import hashlib
+import hmac
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, quote, urlsplit
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_HEADERS = {"expect", "user-agent", "x-amzn-trace-id"}
+
+
+@dataclass
+class Credentials:
+    access_key: str
+    secret_key: str
+    token: str = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Get credentials from the Lambda environment
+        """
+        return cls(
+            os.environ["AWS_ACCESS_KEY_ID"],
+            os.environ["AWS_SECRET_ACCESS_KEY"],
+            os.getenv("AWS_SESSION_TOKEN"),
+        )
+
+
+def get_region():
+    return os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
+
+
+def sign(method, url, headers, body, service, region, credentials, now=None):
+    """
+    Sign request
+
+    :param str method: HTTP method
+    :param str url: HTTP URL
+    :param dict headers: HTTP headers
+    :param bytes body: HTTP body
+    :param str service: AWS signing name, eg. ``execute-api``
+    :param str region: AWS region
+    :param Credentials credentials: AWS credentials
+    :returns dict: Lowercased headers, including signing headers
+    """
+    now = now or datetime.now(timezone.utc)
+    amzdate = now.strftime("%Y%m%dT%H%M%SZ")
+    datestamp = now.strftime("%Y%m%d")
+    parts = urlsplit(url)
+
+    # Prepare headers
+    headers = {k.lower(): v for k, v in headers.items()}
+    headers.pop("authorization", None)
+    headers["x-amz-date"] = amzdate
+    if credentials.token:
+        headers["x-amz-security-token"] = credentials.token
+    signed = {k: v for k, v in headers.items() if k not in UNSIGNED_HEADERS}
+    signed.setdefault("host", re.sub(r":(443|80)$", "", parts.netloc))
+    signed_headers = ";".join(sorted(signed))
+
+    # Create canonical request
+    path = quote(parts.path or "/", safe="/~")
+    query = "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+        for k, v in sorted(parse_qsl(parts.query, keep_blank_values=True))
+    )
+    canonical_headers = "".join(
+        f"{k}:{re.sub(' +', ' ', str(v).strip())}\n" for k, v in sorted(signed.items())
+    )
+    payload_hash = hashlib.sha256(body or b"").hexdigest()
+    canonical_request = "\n".join(
+        [method, path, query, canonical_headers, signed_headers, payload_hash]
+    )
+
+    # Create string to sign
+    scope = f"{datestamp}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            ALGORITHM,
+            amzdate,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+
+    # Sign
+    key = f"AWS4{credentials.secret_key}".encode()
+    for data in (datestamp, region, service, "aws4_request"):
+        key = hmac.new(key, data.encode(), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    headers["authorization"] = (
+        f"{ALGORITHM} Credential={credentials.access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return headers
+
+
+class SigV4Signer:
+    """
+    Drop-in replacement for ``aws.SigV4Signer`` without botocore
+    """
+
+    def __init__(self, service_name="execute-api", region_name=None, credentials=None):
+        self.service_name = service_name
+        self.region_name = region_name or get_region()
+        self.credentials = credentials
+
+    def get_headers(self, method, url, headers=None, data=None, params=None):
+        if params:
+            url = f"{url}?{params}"
+        body = data.encode() if isinstance(data, str) else data
+        credentials = self.credentials or Credentials.from_env()
+        return sign(
+            method,
+            url,
+            headers or {},
+            body,
+            self.service_name,
+            self.region_name,
+            credentials,
+        )
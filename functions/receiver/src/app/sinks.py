@@ -0,0 +1,122 @@
+"""
+Event Sinks
+"""
+import json
+import threading
+
+from .aws import EventBus, Queue, Stream
+from .logger import logger
+from .metrics import metrics
+
+
+class FileSink:
+    """
+    Append entries to a local NDJSON file (for tests & local development)
+    """
+
+    def __init__(self, path):
+        self.name = path
+        self.path = path
+        self.lock = threading.Lock()
+
+    def publish(self, *entries):
+        lines = "".join(f"{json.dumps(entry)}\n" for entry in entries)
+        logger.info("file:Append %s %d", self.path, len(entries))
+        with self.lock:
+            with open(self.path, "a") as stream:
+                stream.write(lines)
+        report = {"FailedEntryCount": 0, "Entries": [{} for _ in entries]}
+        return report
+
+
+SINKS = {
+    "eventbridge": EventBus,
+    "file": FileSink,
+    "kinesis": Stream,
+    "sqs": Queue,
+}
+
+
+class Router:
+    """
+    Route entries to sinks by ``Source`` & ``DetailType``
+
+    Routes are checked in order and the first match wins; entries matching
+    no route go to the default sink.
+
+    :Example:
+
+    >>> Router.from_config(
+    ...     [
+    ...         {
+    ...             "type": "sqs",
+    ...             "target": "https://sqs.us-east-1.amazonaws.com/123456789012/messages",
+    ...             "source": ["event_callback"],
+    ...             "detail-type": ["message"],
+    ...         },
+    ...         {"type": "file", "target": "/tmp/events.ndjson"},
+    ...     ],
+    ...     default=EventBus(),
+    ... )
+    """
+
+    def __init__(self, default, routes=None):
+        self.default = default
+        self.routes = routes or []
+
+    @classmethod
+    def from_config(cls, config, default):
+        """
+        Build router from JSON config
+
+        Each route has a sink ``type`` (``eventbridge``, ``file``,
+        ``kinesis``, or ``sqs``), a ``target`` (bus name, file path, stream
+        name, or queue URL), and optional ``source`` & ``detail-type`` lists.
+        Omitted lists match anything.
+        """
+        if isinstance(config, str):
+            config = json.loads(config)
+        routes = []
+        for route in config or []:
+            sink = SINKS[route["type"]](route["target"])
+            sources = set(route.get("source") or []) or None
+            detail_types = set(route.get("detail-type") or []) or None
+            routes.append((sources, detail_types, sink))
+        return cls(default, routes)
+
+    def get_sink(self, entry):
+        """
+        Get sink for entry
+        """
+        for sources, detail_types, sink in self.routes:
+            if sources is not None and entry.get("Source") not in sources:
+                continue
+            if detail_types is not None and entry.get("DetailType") not in detail_types:
+                continue
+            return sink
+        return self.default
+
+    def publish(self, *entries):
+        """
+        Publish entries to their sinks
+
+        :returns dict: PutEvents-style report with one result per entry
+        """
+        # Group entries by sink
+        groups = {}
+        for index, entry in enumerate(entries):
+            sink = self.get_sink(entry)
+            groups.setdefault(id(sink), (sink, []))[1].append((index, entry))
+
+        # Publish each group & merge reports
+        results = [None] * len(entries)
+        for sink, group in groups.values():
+            report = sink.publish(*[entry for _, entry in group])
+            for (index, _), result in zip(group, report["Entries"]):
+                results[index] = dict(result, Sink=sink.name)
+            failed = report["FailedEntryCount"]
+            metrics.count("EntriesPublished", len(group) - failed, Sink=sink.name)
+            metrics.count("PublishFailures", failed, Sink=sink.name)
+        failed = len([x for x in results if "ErrorCode" in x])
+        report = {"FailedEntryCount": failed, "Entries": results}
+        return report
@@ -1,24 +1,74 @@
 import hmac
 import json
+import logging
 import os
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from functools import wraps
 from hashlib import sha256
-from urllib.error import HTTPError
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 from time import time
 
-from .aws import EventBus, SigV4Signer
-from .errors import Forbidden
+from . import deadline, env, trace
+from .api import Api
+from .aws import EventBus
+from .cache import ResponseCache
+from .clients import get_sigv4signer
+from .dedupe import DEDUPE_STORE, Deduplicator
+from .errors import Forbidden, InvalidSignature
+from .filters import EVENT_FILTER, EventFilter
+from .handlers import HandlerRegistry
 from .logger import logger
+from .metrics import metrics
+from .pool import ConnectionPool
+from .sinks import Router
+
+EVENT_SINKS = os.getenv("EVENT_SINKS")
+PUBLISH_CONCURRENTLY = os.getenv("PUBLISH_CONCURRENTLY", "false").lower() == "true"
+PUBLISH_TIMEOUT = float(os.getenv("PUBLISH_TIMEOUT") or "2")
+PUBLISH_MAX_WORKERS = int(os.getenv("PUBLISH_MAX_WORKERS") or "4")
+RESPONDER_DOMAIN_NAME = os.getenv("RESPONDER_DOMAIN_NAME")
 
 
 class Slackbot:
-    def __init__(self, event_bus=None, oauth=None, signer=None, sigv4signer=None):
+    def __init__(
+        self,
+        event_bus=None,
+        oauth=None,
+        signer=None,
+        sigv4signer=None,
+        pool=None,
+        concurrent=None,
+        publish_timeout=None,
+        publish_max_workers=None,
+        router=None,
+        dedupe=None,
+        cache=None,
+        event_filter=None,
+        handlers=None,
+        responder_domain=None,
+    ):
         self.event_bus = event_bus or EventBus()
+        self.router = router or Router.from_config(EVENT_SINKS, self.event_bus)
         self.oauth = oauth or OAuth()
         self.signer = signer or Signer()
-        self.sigv4signer = sigv4signer or SigV4Signer()
+        self.sigv4signer = sigv4signer or get_sigv4signer()
+        self.pool = pool or ConnectionPool()
+        self.concurrent = PUBLISH_CONCURRENTLY if concurrent is None else concurrent
+        self.publish_timeout = publish_timeout or PUBLISH_TIMEOUT
+        self.publish_max_workers = publish_max_workers or PUBLISH_MAX_WORKERS
+        self.executor = None
+        self.dedupe = dedupe or Deduplicator.from_config(DEDUPE_STORE)
+        self.cache = cache or ResponseCache()
+        self.event_filter = (
+            EventFilter.from_config(EVENT_FILTER)
+            if event_filter is None
+            else event_filter
+        )
+        self.handlers = HandlerRegistry() if handlers is None else handlers
+        self.responder_domain = responder_domain or RESPONDER_DOMAIN_NAME
 
     def install(self, event):
         query = event.get_query()
@@ -71,63 +121,286 @@ class Slackbot:
         # Publish event
         detail = json.dumps(result)
         entry = {"Source": "oauth", "DetailType": "install", "Detail": detail}
-        self.event_bus.publish(entry)
+        self.router.publish(entry)
 
         # Return final OAuth location
         location = self.oauth.complete(result)
         return location
 
     def publish(self, event):
-        entries = event.get_entries(self.event_bus.name)
-        return self.event_bus.publish(*entries)
+        with trace.span("Slackbot.publish") as span:
+            with trace.span("SlackEvent.parse"):
+                entries = list(event.get_entries(self.event_bus.name))
+            for entry in entries:
+                metrics.count(
+                    "Events",
+                    Route=event["routeKey"],
+                    Source=str(entry.get("Source")),
+                    DetailType=str(entry.get("DetailType")),
+                )
+            if span and entries:
+                span.set(
+                    **{
+                        "slack.source": entries[0].get("Source"),
+                        "slack.detail_type": entries[0].get("DetailType"),
+                        "slack.entries": len(entries),
+                    }
+                )
+            publish = self.get_publisher(event)
+            if self.handlers:
+                timeout = deadline.remaining()
+                report = self.handlers.dispatch(entries, publish, timeout)
+            else:
+                report = publish(*entries)
+            event.report = report
+            return event.report
+
+    def get_publisher(self, event):
+        """
+        Get function publishing entries of event, minus those ``event_filter``
+        drops
+
+        Filtering only saves publishing: entries are dispatched to in-process
+        handlers first. Dropped entries are reported as ``{"Dropped": True}``
+        so the report still has one result per entry.
+        """
+        if not self.event_filter:
+            return self.router.publish
+
+        def publish(*entries):
+            results = [None] * len(entries)
+            kept = []
+            for index, entry in enumerate(entries):
+                if self.event_filter.match(entry):
+                    kept.append((index, entry))
+                    continue
+                logger.info("DROPPED %s %s", entry["Source"], entry["DetailType"])
+                metrics.count(
+                    "EventsDropped",
+                    Route=event["routeKey"],
+                    Source=str(entry.get("Source")),
+                    DetailType=str(entry.get("DetailType")),
+                )
+                results[index] = {"Dropped": True}
+            report = self.router.publish(*[entry for _, entry in kept])
+            for (index, _), result in zip(kept, report["Entries"]):
+                results[index] = result
+            return {"FailedEntryCount": report["FailedEntryCount"], "Entries": results}
+
+        return publish
+
+    def verified(self, call_next):
+        """
+        Middleware: verify request signature
+        """
+
+        @wraps(call_next)
+        def verified(event):
+            self.verify(event)
+            return call_next(event)
+
+        return verified
+
+    def cached(self, call_next):
+        """
+        Middleware: answer repeated ``block_suggestion`` queries from cache
+
+        Responses are cached per team, ``action_id``, ``block_id`` & typed
+        value for the action IDs opted in to caching, so hot menus skip the
+        responder round trip. Hits & misses are counted per action ID.
+        """
+
+        @wraps(call_next)
+        def cached(event):
+            detail = event.get_detail()
+            action_id = detail.get("action_id")
+            ttl = self.cache.get_ttl(action_id)
+            if ttl is None:
+                return call_next(event)
+            team = (detail.get("team") or {}).get("id")
+            key = (team, action_id, detail.get("block_id"), detail.get("value"))
+            response = self.cache.get(key)
+            if response is not None:
+                logger.info("CACHE HIT %s %s", action_id, json.dumps(self.cache.stats))
+                metrics.count("ResponseCacheHits", ActionId=str(action_id))
+                return response
+            metrics.count("ResponseCacheMisses", ActionId=str(action_id))
+            response = call_next(event)
+            self.cache.put(key, response, ttl)
+            return response
+
+        return cached
+
+    def deduplicated(self, call_next):
+        """
+        Middleware: acknowledge deliveries whose event ID was already published
+
+        Slack retries deliveries it considers slow or failed; retries share
+        the event ID of the original delivery & are acknowledged with 200 OK
+        without calling the rest of the chain. If the chain raises or the
+        publish fails, the delivery is answered with 500 so Slack retries it,
+        and the ID is released so that retry is published.
+        """
+
+        @wraps(call_next)
+        def deduplicated(event):
+            event_id = event.get_event_id()
+            if event_id is None:
+                return call_next(event)
+            if not self.dedupe.claim(event_id):
+                retry = event.get_header("x-slack-retry-num", "0")
+                reason = event.get_header("x-slack-retry-reason", "-")
+                logger.info("DUPLICATE %s retry=%s reason=%s", event_id, retry, reason)
+                metrics.count("Duplicates", Route=event["routeKey"])
+                return Api.respond(200)
+            try:
+                response = call_next(event)
+            except Exception:
+                self.dedupe.release(event_id)
+                raise
+            if event.report is None:
+                self.dedupe.release(event_id)
+            elif event.report["FailedEntryCount"]:
+                # Fail the delivery so Slack retries it
+                self.dedupe.release(event_id)
+                logger.error("PUBLISH FAILED %s", event_id)
+                return Api.reject(500)
+            return response
+
+        return deduplicated
+
+    def published(self, call_next):
+        """
+        Middleware: publish event, then call the rest of the chain
+
+        In concurrent mode the event is published on a worker thread while
+        the rest of the chain (eg. the responder request) is in flight. The
+        response is returned once the publish is confirmed or
+        ``publish_timeout`` (bounded by the invocation deadline) has passed;
+        publish errors are logged.
+
+        Concurrent mode is at-most-once: a publish still pending when the
+        response is returned is left running on the executor, and Lambda may
+        freeze (or recycle) the environment before it completes, so the
+        event may arrive an invocation later or not at all. Timeouts are
+        counted as ``PublishTimeouts``. The executor has
+        ``publish_max_workers`` threads, so a pending publish (or, in server
+        mode, another request's publish) does not hold up the next one.
+        """
+
+        @wraps(call_next)
+        def published(event):
+            if not self.concurrent:
+                self.publish(event)
+                return call_next(event)
+
+            # Parse event before sharing it between threads
+            event.detail_json
+
+            # Publish in background & call next in foreground
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.publish_max_workers)
+            future = self.executor.submit(copy_context().run, self.publish, event)
+            try:
+                return call_next(event)
+            finally:
+                timeout = min(self.publish_timeout, deadline.remaining())
+                try:
+                    future.result(timeout)
+                except TimeoutError:
+                    logger.error("events:PutEvents PENDING after %.3fs", timeout)
+                    metrics.count("PublishTimeouts", Route=event["routeKey"])
+                except Exception as err:
+                    logger.error("events:PutEvents %s", err)
+
+        return published
 
     def resolve(self, event):
         # Get data
-        detail = event.get_detail()
-        data = json.dumps(detail) if detail else ""
+        data = event.detail_json if event.get_detail() else ""
 
-        domain = event["requestContext"]["domainName"]
+        # Responders are served by API Gateway under /-/... on the request's
+        # domain, unless configured otherwise (eg. in server mode)
         path = event["rawPath"]
         method = event["requestContext"]["http"]["method"]
+        if self.responder_domain:
+            domain = self.responder_domain
+            headers = {"host": domain}
+        else:
+            domain = event["requestContext"]["domainName"]
+            headers = {k: v for k, v in event["headers"].items() if k.lower() == "host"}
         url = f"https://{domain}/-{path}"
-        headers = {k: v for k, v in event["headers"].items() if k.lower() == "host"}
         params = event["rawQueryString"]
-        signed_headers = self.sigv4signer.get_headers(
-            method=method,
-            url=url,
-            headers=headers,
-            data=data,
-            params=params,
-        )
+        with trace.span("SigV4Signer.get_headers"):
+            signed_headers = self.sigv4signer.get_headers(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                params=params,
+            )
 
-        try:
-            req = Request(url, data.encode(), signed_headers)
-            res = urlopen(req)
-            ret = {
-                "statusCode": res.code,
-                "headers": dict(res.headers),
-                "body": res.read().decode(),
-            }
-            return ret
-        except HTTPError:
+        # Keep the content type responders received from urlopen
+        signed_headers = dict(signed_headers)
+        if not any(k.lower() == "content-type" for k in signed_headers):
+            signed_headers["content-type"] = "application/x-www-form-urlencoded"
+
+        # Send request over pooled keep-alive connection
+        with trace.span("Slackbot.resolve", trace.SPAN_KIND_CLIENT) as span:
+            body = data.encode()
+            res = self.pool.request(method, url, body, signed_headers)
+            span.set(
+                **{
+                    "http.request.method": method,
+                    "url.full": url,
+                    "http.request.body.size": len(body),
+                    "http.response.status_code": res.status,
+                    "http.response.body.size": len(res.body),
+                }
+            )
+        logger.info(
+            "%s %s [%d] %s", method, url, res.status, json.dumps(self.pool.stats)
+        )
+        route = event["routeKey"]
+        metrics.count("ResponderResponses", Route=route, StatusCode=str(res.status))
+        metrics.observe("ResponderBodySize", len(res.body), "Bytes", Route=route)
+        if res.status >= 400:
             raise Forbidden
+        ret = {
+            "statusCode": res.status,
+            "headers": res.headers,
+            "body": res.body.decode(),
+        }
+        return ret
 
     def verify(self, event):
         signature = event.get_header("x-slack-signature")
         ts = event.get_header("x-slack-request-timestamp")
-        body = event.get_body()
-        return self.signer.verify(signature, ts, body)
+        with trace.span("Slackbot.verify") as span:
+            body = event.body_bytes
+            span.set(**{"http.request.body.size": len(body)})
+            try:
+                try:
+                    return self.signer.verify(signature, ts, body)
+                except InvalidSignature:
+                    # Refetch secret once in case the signing secret was rotated
+                    if not env.secrets.refresh(min_age=env.SECRET_REFETCH_INTERVAL):
+                        raise
+                    return self.signer.verify(signature, ts, body)
+            except Forbidden:
+                metrics.count("SignatureRejections", Route=event["routeKey"])
+                raise
 
 
 @dataclass
 class OAuth:
-    client_id: str = os.getenv("SLACK_OAUTH_CLIENT_ID")
-    client_secret: str = os.getenv("SLACK_OAUTH_CLIENT_SECRET")
-    error_uri: str = os.getenv("SLACK_OAUTH_ERROR_URI")
-    redirect_uri: str = os.getenv("SLACK_OAUTH_REDIRECT_URI")
-    scope: str = os.getenv("SLACK_OAUTH_SCOPE")
-    success_uri: str = os.getenv("SLACK_OAUTH_SUCCESS_URI")
-    user_scope: str = os.getenv("SLACK_OAUTH_USER_SCOPE")
+    client_id: str = env.Secret("SLACK_OAUTH_CLIENT_ID")
+    client_secret: str = env.Secret("SLACK_OAUTH_CLIENT_SECRET")
+    error_uri: str = env.Secret("SLACK_OAUTH_ERROR_URI")
+    redirect_uri: str = env.Secret("SLACK_OAUTH_REDIRECT_URI")
+    scope: str = env.Secret("SLACK_OAUTH_SCOPE")
+    success_uri: str = env.Secret("SLACK_OAUTH_SUCCESS_URI")
+    user_scope: str = env.Secret("SLACK_OAUTH_USER_SCOPE")
 
     def complete(self, result):
         app_id = result.get("app_id")
@@ -174,17 +447,51 @@ class OAuth:
 
 @dataclass
 class Signer:
-    secret: str = os.getenv("SLACK_SIGNING_SECRET")
-    version: str = os.getenv("SLACK_SIGNING_VERSION") or "v0"
+    """
+    Sign & verify Slack requests
+
+    ``secret`` may hold several comma-separated signing secrets (or a list).
+    Requests signed with any of them are accepted, so a new secret can be
+    added before the old one is retired. New signatures use the first one.
+    """
+
+    secret: str = env.Secret("SLACK_SIGNING_SECRET")
+    version: str = env.Secret("SLACK_SIGNING_VERSION", "v0")
+    keys: tuple = field(default=None, init=False, repr=False, compare=False)
+
+    def get_hmacs(self):
+        """
+        Get HMACs keyed with each active secret
+
+        Keys are only recomputed when the secret changes; each request signs
+        with a copy of the keyed HMAC.
+        """
+        secret = self.secret
+        if self.keys is None or self.keys[0] != secret:
+            secrets = secret.split(",") if isinstance(secret, str) else secret
+            hmacs = [
+                hmac.new(x.strip().encode(), digestmod=sha256)
+                for x in secrets or []
+                if x and x.strip()
+            ]
+            self.keys = (secret, hmacs)
+        return self.keys[1]
+
+    @staticmethod
+    def get_signature(keyed, version, ts, body):
+        digest = keyed.copy()
+        digest.update(f"{version}:{ts}:".encode())
+        digest.update(body)
+        signature = f"{version}={digest.hexdigest()}"
+        return signature
 
     def sign(self, body, ts=None):
         ts = ts or str(int(time()))
-        data = f"{self.version}:{ts}:{body}".encode()
-        logger.debug("STRING TO SIGN %s", data.decode())
-        secret = self.secret.encode()
-        hex = hmac.new(secret, data, sha256).hexdigest()
-        signature = f"{self.version}={hex}"
-        return signature
+        if isinstance(body, str):
+            body = body.encode()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("STRING TO SIGN %s:%s:%s", self.version, ts, body.decode())
+        return self.get_signature(self.get_hmacs()[0], self.version, ts, body)
 
     def verify(self, signature, ts, body):
         """
@@ -205,11 +512,16 @@ class Signer:
         elif delta < 0:
             raise Forbidden("Request timestamp is in the future")
 
-        # Raise if signatures do not match
-        expected = self.sign(body, ts)
-        logger.debug("GIVEN SIGNATURE    %s", signature)
-        logger.debug("EXPECTED SIGNATURE %s", expected)
-        if signature != expected:
-            raise Forbidden("Invalid signature")
+        # Raise if signature matches none of the active secrets
+        if isinstance(body, str):
+            body = body.encode()
+        given = signature.encode()
+        version = self.version
+        for keyed in self.get_hmacs():
+            expected = self.get_signature(keyed, version, ts, body)
+            if hmac.compare_digest(given, expected.encode()):
+                return True
+            logger.debug("GIVEN SIGNATURE    %s", signature)
+            logger.debug("EXPECTED SIGNATURE %s", expected)
 
-        return True
+        raise InvalidSignature("Invalid signature")
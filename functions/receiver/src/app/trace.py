@@ -0,0 +1,203 @@
+"""
+Timing Spans
+"""
+import json
+import os
+import sys
+from contextvars import ContextVar
+from functools import wraps
+from secrets import token_hex
+from time import time_ns
+
+TRACE_EXPORT = os.getenv("TRACE_EXPORT")
+TRACE_SERVICE_NAME = os.getenv("AWS_LAMBDA_FUNCTION_NAME") or "slackbot"
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+CURRENT = ContextVar("span", default=None)
+
+
+class NoopSpan:
+    """
+    Span returned while tracing is off
+    """
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return None
+
+    def set(self, **attributes):
+        return self
+
+
+NOOP = NoopSpan()
+
+
+class Span:
+    """
+    Timed stage of an invocation
+
+    Spans started inside another span (including on threads running a copy of
+    its context) become its children. Finished spans are collected on the
+    root span & exported together when it ends.
+    """
+
+    def __init__(self, tracer, name, kind=SPAN_KIND_INTERNAL, **attributes):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.parent = CURRENT.get()
+        if self.parent is None:
+            self.trace_id = token_hex(16)
+            self.spans = []
+        else:
+            self.trace_id = self.parent.trace_id
+            self.spans = self.parent.spans
+        self.span_id = token_hex(8)
+        self.error = None
+        self.start = None
+        self.end = None
+        self.token = None
+
+    def __bool__(self):
+        return True
+
+    def __enter__(self):
+        self.start = time_ns()
+        self.token = CURRENT.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time_ns()
+        CURRENT.reset(self.token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.spans.append(self)
+        if self.parent is None:
+            self.tracer.export(self.spans)
+        return None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def to_dict(self):
+        """
+        Get OTLP/JSON representation of span
+        """
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": get_attributes(self.attributes),
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        if self.error is not None:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+class Tracer:
+    """
+    Start spans & export finished traces as OTLP/JSON lines
+
+    :param str export: ``"stdout"``, a file path, or ``None`` to turn tracing off
+    """
+
+    def __init__(self, export=None, service_name=None):
+        self.export_to = TRACE_EXPORT if export is None else export
+        self.service_name = service_name or TRACE_SERVICE_NAME
+
+    def span(self, name, kind=SPAN_KIND_INTERNAL, **attributes):
+        if not self.export_to:
+            return NOOP
+        return Span(self, name, kind, **attributes)
+
+    def export(self, spans):
+        data = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": get_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "slackbot"},
+                            "spans": [span.to_dict() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = f"{json.dumps(data)}\n"
+        if self.export_to == "stdout":
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        else:
+            with open(self.export_to, "a") as stream:
+                stream.write(line)
+
+
+def get_attributes(attributes):
+    """
+    Convert dict to OTLP/JSON attribute list
+    """
+    items = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        elif isinstance(value, bool):
+            value = {"boolValue": value}
+        elif isinstance(value, int):
+            value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            value = {"doubleValue": value}
+        else:
+            value = {"stringValue": str(value)}
+        items.append({"key": key, "value": value})
+    return items
+
+
+tracer = Tracer()
+
+
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """
+    Start a span of the current trace
+
+    :Example:
+
+    >>> with trace.span("Slackbot.resolve", trace.SPAN_KIND_CLIENT) as span:
+    ...     res = pool.request(...)
+    ...     span.set(**{"http.response.status_code": res.status})
+    """
+    return tracer.span(name, kind, **attributes)
+
+
+def timed(call_next):
+    """
+    Middleware: time the rest of the chain in a span named after its handler
+    """
+    name = getattr(call_next, "__name__", "handler")
+
+    @wraps(call_next)
+    def timed(event):
+        with tracer.span(name):
+            return call_next(event)
+
+    return timed
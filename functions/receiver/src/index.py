@@ -1,19 +1,20 @@
 """
 Lambda Entrypoint
 """
-from app import env
-
-env.export()  # Export SecretsManager JSON to environment
-
+from app import deadline, trace
 from app.api import Api
 from app.events import BlockSuggestion, Callback, EventCallback, OAuth, Slash
 from app.errors import Forbidden
 from app.logger import logger
+from app.metrics import metrics
 from app.slackbot import Slackbot
 
 api = Api()
 bot = Slackbot()
 
+# Verify origin, publish to EventBridge, then sign & pass through to API Gateway
+SYNCHRONOUS = [bot.verified, trace.timed, bot.published]
+
 
 @api.any("/health")
 def any_health(request):
@@ -32,78 +33,68 @@ def any_install(_):
     return api.respond(302, location=location)
 
 
-@api.any("/oauth")
-def any_oauth(request):
+@api.any("/oauth", OAuth)
+def any_oauth(event):
     """
     Complete OAuth workflow, publish event, and redirect to OAuth success URI
     """
-    event = OAuth(request)
     location = bot.install(event)
     return api.respond(302, location=location)
 
 
-@api.post("/callbacks")
-def post_callbacks(request):
+@api.post("/callbacks", Callback, SYNCHRONOUS)
+def post_callbacks(event):
     """
     Verify origin, publish to EventBridge, then sign & pass through to API Gateway
     """
-    event = Callback(request)
-    bot.verify(event)
-    bot.publish(event)
     return bot.resolve(event)
 
 
-@api.post("/events")
-def post_events(request):
+@api.post("/events", EventCallback, [bot.verified, bot.deduplicated, trace.timed])
+def post_events(event):
     """
-    Verify origin, publish to EventBridge, then respond 200 OK
+    Verify origin, publish to EventBridge (unless already published), then
+    respond 200 OK
     """
-    event = EventCallback(request)
-    bot.verify(event)
-
     # First-time URL verification for events
-    body = None
     detail = event.get_detail()
     if detail.get("type") == "url_verification":
         challenge = detail.get("challenge")
-        body = {"challenge": challenge}
-    else:
-        bot.publish(event)
+        return api.respond(200, {"challenge": challenge})
 
-    return api.respond(200, body)
+    bot.publish(event)
+    return api.respond(200)
 
 
-@api.post("/menus")
-def post_menus(request):
+@api.post("/menus", BlockSuggestion, [*SYNCHRONOUS, bot.cached])
+def post_menus(event):
     """
     Verify origin, publish to EventBridge, then sign & pass through to API Gateway
+    (or answer from cache)
     """
-    event = BlockSuggestion(request)
-    bot.verify(event)
-    bot.publish(event)
     return bot.resolve(event)
 
 
-@api.post("/slash/{cmd}")
-def post_slash(request):
+@api.post("/slash/{cmd}", Slash, SYNCHRONOUS)
+def post_slash(event):
     """
     Verify origin, publish to EventBridge, then sign & pass through to API Gateway
     """
-    event = Slash(request)
-    bot.verify(event)
-    bot.publish(event)
     return bot.resolve(event)
 
 
 @logger.bind
-def handler(event, *_):
+def handler(event, context=None):
     """
     Lambda@Edge handler for CloudFront
     """
     try:
+        deadline.bind(context)
         return api.handle(event)
     except Forbidden as err:
         return api.reject(403)
     except Exception as err:
         logger.error("%s", err)
         return api.reject(500)
+    finally:
+        metrics.flush()
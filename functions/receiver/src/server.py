@@ -0,0 +1,306 @@
+"""
+HTTP Server Entrypoint
+
+Serve the receiver from a long-running process (eg. in a container behind a
+load balancer) instead of Lambda. HTTP requests are translated into the API
+Gateway (v2) event shape & passed to the same ``index.handler``, so signing,
+publishing, connection pools & caches are shared by every request a worker
+handles.
+
+Synchronous routes (``/callbacks``, ``/menus`` & ``/slash/{cmd}``) still
+pass through to the responders behind API Gateway, so set
+``RESPONDER_DOMAIN_NAME`` to the API Gateway domain serving ``/-/...``.
+
+:Example:
+
+    python server.py --port 8000 --workers 4    # built-in pre-forking server
+    gunicorn --threads 16 server:application      # any WSGI server
+    uvicorn server:app                          # any ASGI server
+"""
+import argparse
+import asyncio
+import base64
+import os
+import signal
+import socket
+import threading
+import uuid
+from contextvars import copy_context
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic
+from urllib.parse import parse_qsl, urlsplit
+
+import index
+from app.logger import logger
+from app.metrics import metrics
+
+SERVER_DOMAIN_NAME = os.getenv("SERVER_DOMAIN_NAME")
+SERVER_TIMEOUT = float(os.getenv("SERVER_TIMEOUT") or "3")
+
+HOP_BY_HOP = {
+    "connection",
+    "content-length",
+    "keep-alive",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+class Context:
+    """
+    Lambda-like context of a request
+    """
+
+    def __init__(self, timeout=None):
+        self.aws_request_id = str(uuid.uuid4())
+        self.deadline = monotonic() + (timeout or SERVER_TIMEOUT)
+
+    def get_remaining_time_in_millis(self):
+        return max(int((self.deadline - monotonic()) * 1000), 0)
+
+
+def get_event(method, path, query, headers, body):
+    """
+    Translate HTTP request into API Gateway (v2) event
+
+    :param str method: HTTP method
+    :param str path: HTTP path
+    :param str query: HTTP query string
+    :param list headers: HTTP header ``(name, value)`` pairs
+    :param bytes body: HTTP request body
+    """
+    joined = {}
+    for key, value in headers:
+        key = key.lower()
+        joined[key] = f"{joined[key]},{value}" if key in joined else value
+    domain = SERVER_DOMAIN_NAME or joined.get("host", "").split(":")[0]
+    event = {
+        "version": "2.0",
+        "rawPath": path,
+        "rawQueryString": query,
+        "queryStringParameters": dict(parse_qsl(query)) or None,
+        "headers": joined,
+        "body": base64.b64encode(body).decode(),
+        "isBase64Encoded": True,
+        "requestContext": {
+            "domainName": domain,
+            "http": {"method": method, "path": path},
+        },
+    }
+    return event
+
+
+def call(event):
+    """
+    Call Lambda handler & translate result into HTTP response
+
+    :returns tuple: ``(status, headers, body)``
+    """
+    result = index.handler(event, Context())
+    status = int(result.get("statusCode") or 200)
+    headers = [
+        (key, str(value))
+        for key, value in (result.get("headers") or {}).items()
+        if key.lower() not in HOP_BY_HOP
+    ]
+    body = result.get("body") or ""
+    if result.get("isBase64Encoded"):
+        body = base64.b64decode(body)
+    elif isinstance(body, str):
+        body = body.encode()
+    return status, headers, body
+
+
+def shutdown():
+    """
+    Flush & close resources shared between requests
+    """
+    metrics.flush()
+    index.bot.pool.clear()
+    if index.bot.executor is not None:
+        index.bot.executor.shutdown()
+    if index.bot.handlers.executor is not None:
+        index.bot.handlers.executor.shutdown()
+    logger.flush()
+
+
+def application(environ, start_response):
+    """
+    WSGI application
+    """
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    body = environ["wsgi.input"].read(length) if length else b""
+    headers = [
+        (key[5:].replace("_", "-"), value)
+        for key, value in environ.items()
+        if key.startswith("HTTP_")
+    ]
+    if environ.get("CONTENT_TYPE"):
+        headers.append(("content-type", environ["CONTENT_TYPE"]))
+    event = get_event(
+        environ["REQUEST_METHOD"],
+        environ.get("PATH_INFO") or "/",
+        environ.get("QUERY_STRING") or "",
+        headers,
+        body,
+    )
+    status, headers, body = call(event)
+    headers.append(("content-length", str(len(body))))
+    start_response(f"{status} {HTTPStatus(status).phrase}", headers)
+    return [body]
+
+
+async def app(scope, receive, send):
+    """
+    ASGI application
+    """
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    # Read request & call handler on a worker thread
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope["headers"]]
+    event = get_event(
+        scope["method"],
+        scope["path"],
+        scope["query_string"].decode("latin-1"),
+        headers,
+        b"".join(chunks),
+    )
+    loop = asyncio.get_running_loop()
+    status, headers, body = await loop.run_in_executor(
+        None, copy_context().run, call, event
+    )
+
+    # Send response
+    headers.append(("content-length", str(len(body))))
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Built-in server request handler (HTTP/1.1 keep-alive)
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        event = get_event(self.command, url.path, url.query, self.headers.items(), body)
+        status, headers, body = call(event)
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_DELETE = do_GET = do_PATCH = do_POST = do_PUT = handle_request
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class Server(ThreadingHTTPServer):
+    """
+    Threaded server that finishes in-flight requests when shut down
+    """
+
+    daemon_threads = False
+    block_on_close = True
+
+
+def serve(sock):
+    """
+    Serve requests on listening socket until SIGTERM/SIGINT
+    """
+    server = Server(sock.getsockname(), RequestHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+
+    def stop(*_):
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    host, port = sock.getsockname()[:2]
+    if not index.bot.responder_domain:
+        logger.warning("RESPONDER_DOMAIN_NAME is not set: responders resolve to Host")
+    logger.info("LISTEN %s:%d pid=%d", host, port, os.getpid())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slackbot receiver HTTP server")
+    parser.add_argument("--host", default=os.getenv("HOST") or "0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT") or "8000"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    sock = socket.create_server((args.host, args.port), backlog=1024)
+    if args.workers <= 1:
+        return serve(sock)
+
+    # Pre-fork workers sharing the listening socket (before any threads start)
+    pids = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                serve(sock)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+
+    def stop(*_):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in pids:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
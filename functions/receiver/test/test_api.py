@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from app.api import Api
+from app.errors import Forbidden
+from app.events import Slash
+
+
+def get_event(method, path, route_key=None):
+    event = {"rawPath": path, "requestContext": {"http": {"method": method}}}
+    if route_key:
+        event["routeKey"] = route_key
+    return event
+
+
+class TestApi:
+    def setup_method(self):
+        self.calls = []
+        self.subject = Api()
+
+        def middleware(name):
+            def wrap(call_next):
+                def inner(event):
+                    self.calls.append(name)
+                    return call_next(event)
+
+                return inner
+
+            return wrap
+
+        @self.subject.any("/health")
+        def any_health(request):
+            return self.subject.respond(200)
+
+        @self.subject.post(
+            "/slash/{cmd}", Slash, [middleware("first"), middleware("second")]
+        )
+        def post_slash(event):
+            self.calls.append(type(event).__name__)
+            return self.subject.respond(200, event.get_path_parameters())
+
+    def test_route_key(self):
+        event = get_event("POST", "/slash/fizz", "POST /slash/{cmd}")
+        returned = self.subject.handle(event)
+        assert json.loads(returned["body"]) == {"cmd": "fizz"}
+        assert self.calls == ["first", "second", "Slash"]
+
+    def test_path_parameters(self):
+        event = get_event("POST", "/slash/fizz", "POST /slash/{cmd}")
+        event["pathParameters"] = {"cmd": "buzz"}
+        returned = self.subject.handle(event)
+        assert json.loads(returned["body"]) == {"cmd": "buzz"}
+
+    @pytest.mark.parametrize(
+        ("method", "path", "status"),
+        [
+            ("GET", "/health", "200"),
+            ("POST", "/health", "200"),
+            ("POST", "/slash/fizz", "200"),
+        ],
+    )
+    def test_match(self, method, path, status):
+        returned = self.subject.handle(get_event(method, path))
+        assert returned["statusCode"] == status
+
+    @pytest.mark.parametrize(
+        ("method", "path"),
+        [("GET", "/slash/fizz"), ("POST", "/slash/fizz/buzz"), ("GET", "/fizz")],
+    )
+    def test_no_match(self, method, path):
+        with pytest.raises(Forbidden):
+            self.subject.handle(get_event(method, path))
+
+    def test_prebuilt(self):
+        returned = self.subject.respond(200)
+        returned["statusCode"] = "500"
+        assert self.subject.respond(200)["statusCode"] == "200"
+        assert self.subject.reject(403) == {
+            "statusCode": "403",
+            "body": json.dumps({"ok": False}),
+            "headers": {"content-type": "application/json; charset=utf-8"},
+        }
+
+    @pytest.mark.parametrize("build", [Api.reject, Api.respond])
+    def test_prebuilt_headers(self, build):
+        build(403)["headers"]["x-leak"] = "1"
+        assert "x-leak" not in build(403)["headers"]
@@ -0,0 +1,151 @@
+import json
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+with mock.patch("boto3.client") as mock_client:
+    mock_client.return_value.get_secret_value.return_value = {"SecretString": "{}"}
+    from app import aws, clients
+
+
+def get_entry(detail_type, size=0):
+    return {
+        "EventBusName": "slackbot",
+        "Source": "block_actions",
+        "DetailType": detail_type,
+        "Detail": json.dumps({"data": "x" * size}),
+    }
+
+
+class TestEventBus:
+    def setup_method(self):
+        with mock.patch("boto3.Session"):
+            self.subject = aws.EventBus("slackbot", backoff_base=0, backoff_cap=0)
+        self.subject.client = mock.MagicMock()
+        self.subject.client.put_events.side_effect = self.put_events
+        self.failures = {}
+
+    def put_events(self, Entries):
+        results = []
+        for entry in Entries:
+            key = entry["DetailType"]
+            if self.failures.get(key):
+                self.failures[key] -= 1
+                results.append({"ErrorCode": "ThrottlingException"})
+            else:
+                results.append({"EventId": key})
+        failed = len([x for x in results if "ErrorCode" in x])
+        return {"FailedEntryCount": failed, "Entries": results}
+
+    def test_entry_size(self):
+        entry = {"Source": "a", "DetailType": "bc", "Detail": "déf", "Time": 1}
+        assert aws.get_entry_size(entry) == 1 + 2 + 4 + 14
+
+    def test_batch_max_entries(self):
+        entries = [get_entry(str(i)) for i in range(25)]
+        returned = self.subject.publish(*entries)
+        assert self.subject.client.put_events.call_count == 3
+        assert returned["FailedEntryCount"] == 0
+        assert [x["EventId"] for x in returned["Entries"]] == [
+            str(i) for i in range(25)
+        ]
+
+    def test_batch_max_bytes(self):
+        entries = [get_entry(str(i), 100 * 1024) for i in range(4)]
+        self.subject.publish(*entries)
+        sizes = [
+            sum(aws.get_entry_size(x) for x in call.kwargs["Entries"])
+            for call in self.subject.client.put_events.call_args_list
+        ]
+        assert len(sizes) == 2
+        assert all(x <= aws.MAX_BYTES for x in sizes)
+
+    def test_entry_too_large(self):
+        entries = [get_entry("big", aws.MAX_BYTES), get_entry("small")]
+        returned = self.subject.publish(*entries)
+        assert returned["FailedEntryCount"] == 1
+        assert returned["Entries"][0]["ErrorCode"] == "ValidationException"
+        assert returned["Entries"][1]["EventId"] == "small"
+
+    def test_retry_failed_entries(self):
+        self.failures = {"1": 2}
+        entries = [get_entry(str(i)) for i in range(3)]
+        returned = self.subject.publish(*entries)
+        calls = self.subject.client.put_events.call_args_list
+        assert [len(x.kwargs["Entries"]) for x in calls] == [3, 1, 1]
+        assert returned["FailedEntryCount"] == 0
+        assert returned["Entries"][1] == {"EventId": "1", "Attempts": 3}
+
+    def test_retry_exhausted(self):
+        self.failures = {"0": 100}
+        returned = self.subject.publish(get_entry("0"))
+        assert self.subject.client.put_events.call_count == self.subject.max_attempts
+        assert returned["FailedEntryCount"] == 1
+
+    def test_retry_client_error(self):
+        error = ClientError({"Error": {"Code": "ThrottlingException"}}, "PutEvents")
+        self.subject.client.put_events.side_effect = [
+            error,
+            {"FailedEntryCount": 0, "Entries": [{"EventId": "0"}]},
+        ]
+        returned = self.subject.publish(get_entry("0"))
+        assert returned["Entries"] == [{"EventId": "0", "Attempts": 2}]
+
+    def test_retry_lite_client_error(self):
+        error = clients.ClientError("ThrottlingException", None, 400, "PutEvents")
+        self.subject.client.put_events.side_effect = [
+            error,
+            {"FailedEntryCount": 0, "Entries": [{"EventId": "0"}]},
+        ]
+        returned = self.subject.publish(get_entry("0"))
+        assert returned["Entries"] == [{"EventId": "0", "Attempts": 2}]
+
+    @mock.patch("app.deadline.get")
+    def test_retry_deadline(self, mock_get):
+        mock_get.return_value = 0
+        self.subject.backoff_base = 1
+        self.failures = {"0": 100}
+        returned = self.subject.publish(get_entry("0"))
+        assert self.subject.client.put_events.call_count == 1
+        assert returned["FailedEntryCount"] == 1
+
+
+class TestQueue:
+    def setup_method(self):
+        with mock.patch("boto3.Session"):
+            self.subject = aws.Queue("https://sqs.example.com/queue")
+        self.subject.client = mock.MagicMock()
+
+    def test_publish(self):
+        self.subject.client.send_message_batch.return_value = {
+            "Successful": [{"Id": "1", "MessageId": "M1"}],
+            "Failed": [{"Id": "0", "SenderFault": True, "Code": "Invalid"}],
+        }
+        returned = self.subject.publish(get_entry("0"), get_entry("1"))
+        assert returned["FailedEntryCount"] == 1
+        assert returned["Entries"][0]["ErrorCode"] == "SenderFault"
+        assert returned["Entries"][1]["MessageId"] == "M1"
+        self.subject.client.send_message_batch.assert_called_once_with(
+            QueueUrl="https://sqs.example.com/queue",
+            Entries=[
+                {"Id": "0", "MessageBody": json.dumps(get_entry("0"))},
+                {"Id": "1", "MessageBody": json.dumps(get_entry("1"))},
+            ],
+        )
+
+
+class TestStream:
+    def setup_method(self):
+        with mock.patch("boto3.Session"):
+            self.subject = aws.Stream("stream")
+        self.subject.client = mock.MagicMock()
+
+    def test_publish(self):
+        self.subject.client.put_records.return_value = {
+            "Records": [{"SequenceNumber": str(i)} for i in range(12)]
+        }
+        returned = self.subject.publish(*[get_entry(str(i)) for i in range(12)])
+        assert returned["FailedEntryCount"] == 0
+        self.subject.client.put_records.assert_called_once()
+        records = self.subject.client.put_records.call_args.kwargs["Records"]
+        assert json.loads(records[0]["Data"]) == get_entry("0")
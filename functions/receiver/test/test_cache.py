@@ -0,0 +1,70 @@
+from unittest import mock
+
+import pytest
+
+from app.cache import ResponseCache
+
+
+def get_response(status=200, body='{"options": []}', **headers):
+    return {"statusCode": status, "headers": headers, "body": body}
+
+
+class TestResponseCache:
+    def setup_method(self):
+        self.subject = ResponseCache({"*": 60, "scopes": 3600, "live": 0})
+
+    @pytest.mark.parametrize(
+        ("action_id", "expected"),
+        [("scopes", 3600), ("other", 60), ("live", None)],
+    )
+    def test_get_ttl(self, action_id, expected):
+        assert self.subject.get_ttl(action_id) == expected
+
+    def test_get_ttl_disabled(self):
+        assert ResponseCache({}).get_ttl("scopes") is None
+
+    def test_get_put(self):
+        assert self.subject.get("a") is None
+        assert self.subject.put("a", get_response(), 60) is True
+        returned = self.subject.get("a")
+        assert returned == get_response()
+        returned["headers"]["x"] = "y"
+        assert self.subject.get("a") == get_response()
+        assert self.subject.stats == {"hits": 2, "misses": 1, "size": 1}
+
+    def test_ttl(self):
+        with mock.patch("app.cache.monotonic", return_value=0):
+            self.subject.put("a", get_response(), 60)
+        with mock.patch("app.cache.monotonic", return_value=61):
+            assert self.subject.get("a") is None
+        assert self.subject.entries == {}
+
+    def test_maxsize(self):
+        subject = ResponseCache({"*": 60}, maxsize=2)
+        subject.put("a", get_response(), 60)
+        subject.put("b", get_response(), 60)
+        subject.get("a")
+        subject.put("c", get_response(), 60)
+        assert list(subject.entries) == ["a", "c"]
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            get_response(500),
+            get_response(body="x" * 100),
+            get_response(**{"Cache-Control": "no-store"}),
+            get_response(**{"cache-control": "private, max-age=60"}),
+            get_response(**{"cache-control": "max-age=0"}),
+        ],
+    )
+    def test_put_uncacheable(self, response):
+        subject = ResponseCache({"*": 60}, max_bytes=50)
+        assert subject.put("a", response, 60) is False
+        assert subject.get("a") is None
+
+    def test_put_max_age(self):
+        response = get_response(**{"Cache-Control": "public, max-age=5"})
+        with mock.patch("app.cache.monotonic", return_value=0):
+            assert self.subject.put("a", response, 60) is True
+        with mock.patch("app.cache.monotonic", return_value=6):
+            assert self.subject.get("a") is None
@@ -0,0 +1,94 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from app import clients, sigv4
+from app.pool import Response
+
+
+class TestEventsClient:
+    def setup_method(self):
+        self.pool = mock.MagicMock()
+        credentials = sigv4.Credentials("AKIDEXAMPLE", "SECRET")
+        self.subject = clients.EventsClient("us-east-1", credentials, self.pool)
+
+    def test_put_events(self):
+        result = {"FailedEntryCount": 0, "Entries": [{"EventId": "1"}]}
+        self.pool.request.return_value = Response(200, {}, json.dumps(result).encode())
+        returned = self.subject.put_events(Entries=[{"Source": "fizz"}])
+        assert returned == result
+        method, url, body, headers = self.pool.request.call_args.args
+        assert url == "https://events.us-east-1.amazonaws.com/"
+        assert json.loads(body) == {"Entries": [{"Source": "fizz"}]}
+        assert headers["x-amz-target"] == "AWSEvents.PutEvents"
+        assert "/us-east-1/events/aws4_request" in headers["authorization"]
+
+    def test_error(self):
+        error = {"__type": "ThrottlingException", "message": "Slow down"}
+        self.pool.request.return_value = Response(400, {}, json.dumps(error).encode())
+        with pytest.raises(clients.ClientError) as err:
+            self.subject.put_events(Entries=[])
+        assert err.value.response["Error"] == {
+            "Code": "ThrottlingException",
+            "Message": "Slow down",
+        }
+
+    def test_error_not_json(self):
+        self.pool.request.return_value = Response(502, {}, b"<html>Bad Gateway</html>")
+        with pytest.raises(clients.ClientError) as err:
+            self.subject.put_events(Entries=[])
+        assert err.value.response["Error"] == {
+            "Code": "UnknownError",
+            "Message": "<html>Bad Gateway</html>",
+        }
+        assert err.value.response["ResponseMetadata"]["HTTPStatusCode"] == 502
+
+
+class TestGetClientErrors:
+    def test_lite(self):
+        with mock.patch.dict("sys.modules", {"botocore.exceptions": None}):
+            assert clients.get_client_errors() == (clients.ClientError,)
+
+    def test_botocore(self):
+        from botocore.exceptions import ClientError
+
+        assert clients.get_client_errors() == (clients.ClientError, ClientError)
+
+
+class TestGetEndpointURL:
+    def test_default(self):
+        returned = clients.get_endpoint_url("events", "us-east-1")
+        assert returned == "https://events.us-east-1.amazonaws.com/"
+
+    @mock.patch.dict("os.environ", {"AWS_ENDPOINT_URL": "http://localhost:4566"})
+    def test_override(self):
+        returned = clients.get_endpoint_url("events", "us-east-1")
+        assert returned == "http://localhost:4566"
+
+
+class TestGetClient:
+    def test_lite(self):
+        assert isinstance(clients.get_client("events"), clients.EventsClient)
+        assert isinstance(clients.get_sigv4signer(), sigv4.SigV4Signer)
+
+    @mock.patch("app.clients.AWS_CLIENT", "boto3")
+    @mock.patch("boto3.Session")
+    def test_boto3(self, mock_session):
+        returned = clients.get_client("events")
+        assert returned == mock_session.return_value.client.return_value
+        mock_session.return_value.client.assert_called_once_with("events")
+
+    @mock.patch("boto3.Session")
+    def test_no_env_credentials(self, mock_session):
+        with mock.patch.dict("os.environ"):
+            del os.environ["AWS_ACCESS_KEY_ID"]
+            returned = clients.get_client("secretsmanager")
+        assert returned == mock_session.return_value.client.return_value
+        mock_session.return_value.client.assert_called_once_with("secretsmanager")
+
+    @mock.patch("boto3.Session")
+    def test_unsupported(self, mock_session):
+        clients.get_client("sqs")
+        mock_session.return_value.client.assert_called_once_with("sqs")
@@ -0,0 +1,78 @@
+from unittest import mock
+
+import pytest
+
+from app.dedupe import Deduplicator, FileStore, LRUCache, SQLiteStore
+
+
+class TestLRUCache:
+    def test_add(self):
+        subject = LRUCache(maxsize=2, ttl=60)
+        assert subject.add("a") is True
+        assert subject.add("a") is False
+        subject.discard("a")
+        assert subject.add("a") is True
+
+    def test_maxsize(self):
+        subject = LRUCache(maxsize=2, ttl=60)
+        subject.add("a")
+        subject.add("b")
+        subject.add("a")
+        subject.add("c")
+        assert list(subject.keys) == ["a", "c"]
+
+    def test_ttl(self):
+        subject = LRUCache(maxsize=2, ttl=60)
+        with mock.patch("app.dedupe.monotonic", return_value=0):
+            subject.add("a")
+        with mock.patch("app.dedupe.monotonic", return_value=61):
+            assert subject.add("a") is True
+
+
+@pytest.mark.parametrize("kind", ["file", "sqlite"])
+class TestStores:
+    def get_store(self, kind, tmp_path, ttl=60):
+        if kind == "file":
+            return FileStore(str(tmp_path / "dedupe"), ttl)
+        return SQLiteStore(str(tmp_path / "dedupe.db"), ttl)
+
+    def test_add(self, kind, tmp_path):
+        subject = self.get_store(kind, tmp_path)
+        other = self.get_store(kind, tmp_path)
+        assert subject.add("a") is True
+        assert other.add("a") is False
+        other.discard("a")
+        assert subject.add("a") is True
+
+    def test_ttl(self, kind, tmp_path):
+        subject = self.get_store(kind, tmp_path, ttl=60)
+        with mock.patch("app.dedupe.time", return_value=1000):
+            subject.add("a")
+        with mock.patch("app.dedupe.time", return_value=1061):
+            assert subject.add("a") is True
+            assert subject.add("a") is False
+
+
+class TestDeduplicator:
+    def test_claim(self, tmp_path):
+        config = f"sqlite:{tmp_path / 'dedupe.db'}"
+        subject = Deduplicator.from_config(config)
+        assert subject.claim("Ev123") is True
+        assert subject.claim("Ev123") is False
+        assert Deduplicator.from_config(config).claim("Ev123") is False
+        subject.release("Ev123")
+        assert Deduplicator.from_config(config).claim("Ev123") is True
+
+    def test_no_store(self):
+        subject = Deduplicator.from_config(None)
+        assert subject.store is None
+        assert subject.claim("Ev123") is True
+        assert subject.claim("Ev123") is False
+
+    def test_store_error(self):
+        store = mock.MagicMock()
+        store.add.side_effect = [OSError("database is locked"), True]
+        subject = Deduplicator(store=store)
+        with pytest.raises(OSError):
+            subject.claim("Ev123")
+        assert subject.claim("Ev123") is True
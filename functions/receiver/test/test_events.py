@@ -0,0 +1,63 @@
+import base64
+import json
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+
+from app import events
+from test.test_index import read_event
+
+
+def get_request(body):
+    data = base64.b64encode(body.encode()).decode()
+    return {"body": data, "isBase64Encoded": True}
+
+
+class TestEvents:
+    @pytest.mark.parametrize(
+        ("cls", "name"),
+        [
+            (events.Callback, "block_actions"),
+            (events.BlockSuggestion, "block_suggestion"),
+            (events.Callback, "view_submission"),
+        ],
+    )
+    def test_callback_parsed_once(self, cls, name):
+        body = urlencode({"payload": json.dumps(read_event(name))})
+        event = cls(get_request(body))
+        with mock.patch("json.loads", wraps=json.loads) as loads:
+            event.get_body()
+            event.get_detail()
+            list(event.get_entries("slackbot"))
+            event.detail_json
+        loads.assert_called_once()
+
+    def test_event_callback_decoded_once(self):
+        body = json.dumps(read_event("event_callback"))
+        event = events.EventCallback(get_request(body))
+        with mock.patch("base64.b64decode", wraps=base64.b64decode) as b64decode:
+            event.get_body()
+            event.get_detail()
+            list(event.get_entries("slackbot"))
+        b64decode.assert_called_once()
+
+    def test_slash_detail_is_form(self):
+        data = read_event("slash_command")
+        event = events.Slash(get_request(urlencode(data)))
+        assert event.get_detail() is event.form
+        assert event.get_detail() == data
+
+    def test_block_actions_entries(self):
+        data = read_event("block_actions")
+        data["actions"].append({"action_id": "other_action_id"})
+        body = urlencode({"payload": json.dumps(data)})
+        event = events.Callback(get_request(body))
+        returned = [x["DetailType"] for x in event.get_entries("slackbot")]
+        expected = ["action_id", "other_action_id"]
+        assert returned == expected
+
+    def test_plain_body(self):
+        event = events.EventCallback({"body": "{}", "isBase64Encoded": False})
+        assert event.body_bytes == b"{}"
+        assert event.get_detail() == {}
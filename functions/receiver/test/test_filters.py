@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.filters import MISSING, Entry, EventFilter, compile_pattern
+
+
+def get_entry(source="event_callback", detail_type="message", **detail):
+    return {"Source": source, "DetailType": detail_type, "Detail": json.dumps(detail)}
+
+
+class TestCompilePattern:
+    @pytest.mark.parametrize(
+        ("pattern", "expected"),
+        [
+            ({"source": ["event_callback"]}, True),
+            ({"source": ["slash_command"]}, False),
+            ({"detail-type": [{"prefix": "mess"}]}, True),
+            ({"detail-type": [{"suffix": "AGE"}]}, False),
+            ({"detail-type": [{"suffix": {"equals-ignore-case": "AGE"}}]}, True),
+            ({"detail-type": [{"equals-ignore-case": "MESSAGE"}]}, True),
+            ({"detail-type": [{"wildcard": "m*e"}]}, True),
+            ({"detail-type": [{"wildcard": "m*x"}]}, False),
+            ({"detail-type": [{"anything-but": ["message", "app_mention"]}]}, False),
+            ({"detail-type": [{"anything-but": {"prefix": "app_"}}]}, True),
+            ({"detail": {"event": {"type": ["message"]}}}, True),
+            ({"detail": {"event": {"subtype": [{"exists": False}]}}}, True),
+            ({"detail": {"event": {"subtype": [{"exists": True}]}}}, False),
+            ({"detail": {"event": {"subtype": [{"anything-but": "bot"}]}}}, False),
+            ({"detail": {"event": {"count": [{"numeric": [">", 0, "<=", 5]}]}}}, True),
+            ({"detail": {"event": {"count": [{"numeric": [">", 3]}]}}}, False),
+            ({"detail": {"event": {"count": [True]}}}, False),
+            ({"detail": {"event": {"ip": [{"cidr": "10.0.0.0/24"}]}}}, True),
+            ({"detail": {"event": {"tags": ["b"]}}}, True),
+            ({"detail": {"event": {"tags": ["c"]}}}, False),
+            ({"$or": [{"source": ["x"]}, {"detail-type": ["message"]}]}, True),
+            ({"$or": [{"source": ["x"]}, {"detail-type": ["y"]}]}, False),
+        ],
+    )
+    def test_match(self, pattern, expected):
+        entry = get_entry(
+            event={"type": "message", "count": 1, "ip": "10.0.0.7", "tags": ["a", "b"]}
+        )
+        assert compile_pattern(pattern)(Entry(entry)) is expected
+
+    def test_detail_parsed_lazily(self):
+        entry = Entry({"Source": "event_callback", "Detail": "not json"})
+        assert compile_pattern({"source": ["event_callback"]})(entry) is True
+        assert entry.detail is MISSING
+
+    def test_unsupported(self):
+        with pytest.raises(ValueError):
+            compile_pattern({"source": [{"regex": ".*"}]})
+
+
+class TestEventFilter:
+    def test_empty(self):
+        subject = EventFilter.from_config(None)
+        assert not subject
+        assert subject.match(get_entry()) is True
+
+    def test_apply(self):
+        subject = EventFilter.from_config(
+            json.dumps(
+                {
+                    "allow": [{"source": ["event_callback"]}],
+                    "deny": [{"detail": {"event": {"subtype": ["bot_message"]}}}],
+                }
+            )
+        )
+        message = get_entry(event={"type": "message"})
+        bot_message = get_entry(event={"type": "message", "subtype": "bot_message"})
+        slash = get_entry("slash_command", "/fizz")
+        kept, dropped = subject.apply([message, bot_message, slash])
+        assert kept == [message]
+        assert dropped == [bot_message, slash]
@@ -0,0 +1,106 @@
+from threading import Event
+from unittest import mock
+
+from app.handlers import HandlerRegistry
+
+
+def get_entry(source="event_callback", detail_type="message"):
+    return {"Source": source, "DetailType": detail_type, "Detail": "{}"}
+
+
+def publish(*entries):
+    return {"FailedEntryCount": 0, "Entries": [{"EventId": "1"} for _ in entries]}
+
+
+class TestHandlerRegistry:
+    def setup_method(self):
+        self.subject = HandlerRegistry(max_workers=2)
+        self.publish = mock.MagicMock(side_effect=publish)
+
+    def test_empty(self):
+        assert not self.subject
+        returned = self.subject.dispatch([get_entry()], self.publish, 1)
+        assert returned == publish(get_entry())
+
+    def test_get_handler(self):
+        @self.subject.on({"detail-type": ["app_mention"]})
+        def app_mention(entry):
+            ...
+
+        assert self.subject
+        assert self.subject.get_handler(get_entry(detail_type="app_mention")) is (
+            app_mention
+        )
+        assert self.subject.get_handler(get_entry()) is None
+
+    def test_dispatch(self):
+        handled = []
+        self.subject.register({"detail-type": ["app_mention"]}, handled.append)
+        mention = get_entry(detail_type="app_mention")
+        message = get_entry()
+        returned = self.subject.dispatch([mention, message], self.publish, 1)
+        assert handled == [mention]
+        self.publish.assert_called_once_with(message)
+        assert returned == {
+            "FailedEntryCount": 0,
+            "Entries": [{"Handler": "append"}, {"EventId": "1"}],
+        }
+
+    def test_dispatch_order(self):
+        def app_mention(entry):
+            raise ValueError("BOOM")
+
+        self.subject.register({"detail-type": ["app_mention"]}, app_mention)
+        self.subject.register({"detail-type": ["reaction_added"]}, lambda _: None)
+        self.publish.side_effect = lambda *entries: {
+            "FailedEntryCount": 0,
+            "Entries": [{"EventId": x["DetailType"]} for x in entries],
+        }
+        entries = [
+            get_entry(detail_type="app_mention"),
+            get_entry(detail_type="reaction_added"),
+            get_entry(),
+        ]
+        with mock.patch("app.handlers.logger"):
+            returned = self.subject.dispatch(entries, self.publish, 1)
+        assert returned["Entries"] == [
+            {"EventId": "app_mention"},
+            {"Handler": "<lambda>"},
+            {"EventId": "message"},
+        ]
+
+    def test_dispatch_error(self):
+        def app_mention(entry):
+            raise ValueError("BOOM")
+
+        self.subject.register({"detail-type": ["app_mention"]}, app_mention)
+        mention = get_entry(detail_type="app_mention")
+        with mock.patch("app.handlers.logger") as mock_logger:
+            returned = self.subject.dispatch([mention], self.publish, 1)
+        self.publish.assert_called_with(mention)
+        mock_logger.error.assert_called_once()
+        assert returned == {"FailedEntryCount": 0, "Entries": [{"EventId": "1"}]}
+
+    def test_dispatch_timeout(self):
+        done = Event()
+        self.subject.register({"detail-type": ["app_mention"]}, lambda _: done.wait())
+        mention = get_entry(detail_type="app_mention")
+        with mock.patch("app.handlers.logger") as mock_logger:
+            returned = self.subject.dispatch([mention], self.publish, 0.01)
+        done.set()
+        self.publish.assert_called_once_with()
+        mock_logger.error.assert_called_once()
+        assert returned["FailedEntryCount"] == 1
+        (result,) = returned["Entries"]
+        assert result["Handler"] == "<lambda>"
+        assert result["ErrorCode"] == "HandlerTimeout"
+
+    def test_dispatch_timeout_bounded(self):
+        done = Event()
+        self.subject.timeout = 0.01
+        self.subject.register({"detail-type": ["app_mention"]}, lambda _: done.wait())
+        mention = get_entry(detail_type="app_mention")
+        with mock.patch("app.handlers.wait") as mock_wait:
+            self.subject.dispatch([mention], self.publish, 60)
+        done.set()
+        assert mock_wait.call_args.args[1] == 0.01
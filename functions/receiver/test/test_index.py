@@ -1,17 +1,20 @@
 import base64
 import json
 import os
-from time import time
+from time import monotonic, time
 from unittest import mock
 from urllib.parse import urlencode
 
 import pytest
 
-with mock.patch("boto3.client") as mock_client:
-    mock_client.return_value.get_secret_value.return_value = {"SecretString": "{}"}
-    from app import slackbot
-    from app.logger import logger
-    from index import handler, bot
+from app import env, metrics, slackbot
+from app.cache import ResponseCache
+from app.dedupe import Deduplicator
+from app.filters import EventFilter
+from app.handlers import HandlerRegistry
+from app.pool import Response
+from app.logger import logger
+from index import handler, bot
 
 
 def get_event(route_key, querystring=None, body=None, ts=None):
@@ -46,14 +49,32 @@ def read_event(name):
         return json.load(stream)
 
 
+def put_events(Entries):
+    return {
+        "FailedEntryCount": 0,
+        "Entries": [{"EventId": str(i)} for i, _ in enumerate(Entries)],
+    }
+
+
 class TestHandler:
     def setup_method(self):
         logger.logger.disabled = True
 
         slackbot.urlopen = mock.MagicMock()
+        env.secrets.values = None
+        env.secrets.client = mock.MagicMock()
+        env.secrets.client.get_secret_value.return_value = {"SecretString": "{}"}
         bot.oauth.generate_state = mock.MagicMock()
         bot.oauth.verify_state = mock.MagicMock()
         bot.event_bus.client = mock.MagicMock()
+        bot.event_bus.client.put_events.side_effect = put_events
+        bot.pool = mock.MagicMock()
+        bot.pool.request.return_value = Response(200, {}, b"")
+        bot.pool.stats = {}
+        bot.dedupe = Deduplicator()
+        bot.cache = ResponseCache({})
+        bot.event_filter = EventFilter()
+        bot.handlers = HandlerRegistry()
 
         bot.oauth.generate_state.return_value = "TS.STATE"
         bot.oauth.verify_state.return_value = True
@@ -94,6 +115,19 @@ class TestHandler:
         }
         assert returned == expected
 
+    def test_rotated_signature(self):
+        event = get_event("POST /events", None, "{}")
+        bot.signer.secret = None
+        env.secrets.values = {"SLACK_SIGNING_SECRET": "OLD!"}
+        env.secrets.fetched = monotonic() - 120
+        env.secrets.client.reset_mock()
+        env.secrets.client.get_secret_value.return_value = {
+            "SecretString": json.dumps({"SLACK_SIGNING_SECRET": "SECRET!"})
+        }
+        returned = handler(event)
+        assert returned["statusCode"] == "200"
+        env.secrets.client.get_secret_value.assert_called_once_with(SecretId="slackbot")
+
     def test_future_ts(self):
         event = get_event("POST /callbacks", None, "{}")
         event["headers"]["x-slack-request-timestamp"] = str(int(time() + 600))
@@ -192,6 +226,32 @@ class TestHandler:
             ]
         )
 
+    def test_post_callbacks_resolve(self):
+        data = read_event("block_actions")
+        body = urlencode({"payload": json.dumps(data)})
+        handler(get_event("POST /callbacks", None, body))
+        method, url, data, headers = bot.pool.request.call_args.args
+        assert (method, url) == ("POST", "https://slack.example.com/-/callbacks")
+        assert headers["content-type"] == "application/x-www-form-urlencoded"
+
+    def test_metrics(self):
+        data = read_event("block_suggestion")
+        body = urlencode({"payload": json.dumps(data)})
+        event = get_event("POST /menus", None, body)
+        with mock.patch.object(metrics.metrics, "namespace", "Slackbot"):
+            with mock.patch.object(metrics.metrics, "stream") as stream:
+                handler(event)
+        (line,) = stream.write.call_args.args[0].splitlines()
+        document = json.loads(line)
+        assert document["Route"] == "POST /menus"
+        assert document["Source"] == "block_suggestion"
+        assert document["Requests"] == 1
+        assert document["Events"] == 1
+        assert document["EntriesPublished"] == 1
+        assert document["PublishFailures"] == 0
+        assert document["ResponderResponses"] == 1
+        assert document["ResponderBodySize"] == [0]
+
     @pytest.mark.parametrize("name", ["view_closed", "view_submission"])
     def test_post_callbacks_view(self, name):
         data = read_event(name)
@@ -244,6 +304,73 @@ class TestHandler:
             ]
         )
 
+    def test_post_events_filtered(self):
+        bot.event_filter = EventFilter(deny=[{"detail-type": ["app_home_opened"]}])
+        data = read_event("event_callback")
+        body = json.dumps(data)
+        event = get_event("POST /events", None, body)
+        with mock.patch.object(metrics.metrics, "namespace", "Slackbot"):
+            with mock.patch.object(metrics.metrics, "stream") as stream:
+                returned = handler(event)
+        assert returned["statusCode"] == "200"
+        bot.event_bus.client.put_events.assert_not_called()
+        (line,) = stream.write.call_args.args[0].splitlines()
+        document = json.loads(line)
+        assert document["EventsDropped"] == 1
+        assert document["DetailType"] == "app_home_opened"
+
+    def test_post_events_handled(self):
+        handled = []
+        bot.handlers.register({"detail-type": ["app_home_opened"]}, handled.append)
+        data = read_event("event_callback")
+        body = json.dumps(data)
+        returned = handler(get_event("POST /events", None, body))
+        assert returned["statusCode"] == "200"
+        assert handled == [
+            {
+                "EventBusName": "slackbot",
+                "Source": "event_callback",
+                "DetailType": "app_home_opened",
+                "Detail": json.dumps(data),
+            }
+        ]
+        bot.event_bus.client.put_events.assert_not_called()
+
+    def test_post_events_filtered_handled(self):
+        handled = []
+        bot.event_filter = EventFilter(deny=[{"detail-type": ["app_home_opened"]}])
+        bot.handlers.register({"detail-type": ["app_home_opened"]}, handled.append)
+        body = json.dumps(read_event("event_callback"))
+        returned = handler(get_event("POST /events", None, body))
+        assert returned["statusCode"] == "200"
+        assert len(handled) == 1
+        bot.event_bus.client.put_events.assert_not_called()
+
+    def test_post_events_retry(self):
+        data = read_event("event_callback")
+        body = json.dumps(data)
+        handler(get_event("POST /events", None, body))
+        event = get_event("POST /events", None, body)
+        event["headers"]["x-slack-retry-num"] = "1"
+        event["headers"]["x-slack-retry-reason"] = "http_timeout"
+        returned = handler(event)
+        assert returned["statusCode"] == "200"
+        bot.event_bus.client.put_events.assert_called_once()
+
+    def test_post_events_retry_failed(self):
+        data = read_event("event_callback")
+        body = json.dumps(data)
+        bot.event_bus.client.put_events.side_effect = [
+            {"FailedEntryCount": 1, "Entries": [{"ErrorCode": "ValidationException"}]},
+            put_events,
+        ]
+        returned = handler(get_event("POST /events", None, body))
+        assert returned["statusCode"] == "500"
+        bot.event_bus.client.put_events.side_effect = put_events
+        returned = handler(get_event("POST /events", None, body))
+        assert returned["statusCode"] == "200"
+        assert bot.event_bus.client.put_events.call_count == 2
+
     def test_post_menus(self):
         data = read_event("block_suggestion")
         body = urlencode({"payload": json.dumps(data)})
@@ -260,6 +387,22 @@ class TestHandler:
             ]
         )
 
+    def test_post_menus_cached(self):
+        bot.cache = ResponseCache({"action_id": 60})
+        bot.pool.request.return_value = Response(200, {}, b'{"options": []}')
+        data = read_event("block_suggestion")
+        body = urlencode({"payload": json.dumps(data)})
+        first = handler(get_event("POST /menus", None, body))
+        second = handler(get_event("POST /menus", None, body))
+        data["value"] = "chat:write"
+        body = urlencode({"payload": json.dumps(data)})
+        handler(get_event("POST /menus", None, body))
+        assert first == second
+        assert second["body"] == '{"options": []}'
+        assert bot.pool.request.call_count == 2
+        assert bot.event_bus.client.put_events.call_count == 3
+        assert bot.cache.stats == {"hits": 1, "misses": 2, "size": 2}
+
     def test_post_slash(self):
         data = read_event("slash_command")
         body = urlencode(data)
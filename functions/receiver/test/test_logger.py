@@ -0,0 +1,121 @@
+import io
+import logging
+from unittest import mock
+
+import pytest
+
+from app.logger import LambdaLoggerAdapter, LazyJSON, QueueStreamHandler
+
+
+class Unserializable:
+    def __str__(self):
+        raise AssertionError("serialized")
+
+
+class TestLazyJSON:
+    def test_str(self):
+        assert str(LazyJSON({"fizz": "buzz"})) == '{"fizz": "buzz"}'
+
+    def test_truncate(self):
+        subject = LazyJSON({"fizz": ["buzz" * 4], "jazz": 1}, max_length=4)
+        assert str(subject) == '{"fizz": ["buzz\\u2026(+12)"], "jazz": 1}'
+
+
+class TestLambdaLoggerAdapter:
+    def setup_method(self):
+        self.logger = mock.MagicMock()
+        self.logger.isEnabledFor.return_value = True
+        self.subject = LambdaLoggerAdapter(self.logger, sample_rates={}, max_length=4)
+
+    def get_messages(self, level=None):
+        return [
+            (msg % tuple(args), lvl)
+            for (lvl, msg, *args), _ in self.logger.log.call_args_list
+            if level is None or lvl == level
+        ]
+
+    def test_bind(self):
+        handler = self.subject.bind(lambda event, context: {"statusCode": 200})
+        handler({"body": "fizzbuzz"})
+        assert self.get_messages() == [
+            ('EVENT {"body": "fizz\\u2026(+4)"}', logging.INFO),
+            ('RETURN {"statusCode": 200}', logging.INFO),
+        ]
+
+    def test_sample(self):
+        self.subject.sample_rates = {"EVENT": 0, "RETURN": 0}
+        handler = self.subject.bind(lambda event, context: {"statusCode": 200})
+        handler({"body": "fizzbuzz"})
+        assert self.get_messages() == []
+
+    def test_lazy(self):
+        self.logger.isEnabledFor.return_value = False
+        handler = self.subject.bind(lambda event, context: None)
+        handler({"body": Unserializable()})
+
+    def test_error_result(self):
+        self.subject.sample_rates = {"EVENT": 0, "RETURN": 0}
+        handler = self.subject.bind(lambda event, context: {"statusCode": 500})
+        handler({"body": "fizzbuzz"})
+        assert self.get_messages() == [
+            ('EVENT {"body": "fizzbuzz"}', logging.ERROR),
+            ('RETURN {"statusCode": 500}', logging.ERROR),
+        ]
+
+    def test_error_raised(self):
+        def handler(event, context):
+            raise ValueError
+
+        self.subject.sample_rates = {"EVENT": 0}
+        with pytest.raises(ValueError):
+            self.subject.bind(handler)({"body": "fizzbuzz"})
+        assert self.get_messages() == [('EVENT {"body": "fizzbuzz"}', logging.ERROR)]
+
+
+class TestQueueStreamHandler:
+    def setup_method(self):
+        self.stream = mock.MagicMock(wraps=io.StringIO())
+        self.subject = QueueStreamHandler(self.stream)
+        self.subject.setFormatter(logging.Formatter("%(message)s"))
+
+    def test_flush(self):
+        for i in range(3):
+            self.subject.emit(logging.makeLogRecord({"msg": "fizz %d", "args": (i,)}))
+        self.subject.flush()
+        assert self.stream.getvalue() == "fizz 0\nfizz 1\nfizz 2\n"
+        assert self.subject.pending == 0
+
+    def test_resolve_on_emit(self):
+        event = {"fizz": "buzz"}
+        with self.subject.lock:
+            record = logging.makeLogRecord({"msg": "EVENT %s", "args": (event,)})
+            self.subject.emit(record)
+            event["routeKey"] = "POST /events"
+        self.subject.flush()
+        assert self.stream.getvalue() == "EVENT {'fizz': 'buzz'}\n"
+
+    def test_flush_timeout(self):
+        with self.subject.lock:
+            self.subject.emit(logging.makeLogRecord({"msg": "fizz"}))
+            self.subject.flush(0.01)
+            assert self.subject.pending == 1
+        self.subject.flush()
+        assert self.subject.pending == 0
+
+    def test_coalesce(self):
+        with self.subject.lock:
+            for i in range(3):
+                record = logging.makeLogRecord({"msg": "fizz"})
+                self.subject.emit(record)
+        self.subject.flush()
+        assert self.stream.getvalue() == "fizz\nfizz\nfizz\n"
+        assert self.stream.write.call_count <= 2
+
+    def test_bind_flushes(self):
+        logger = logging.getLogger("test-queued")
+        logger.handlers = [self.subject]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        subject = LambdaLoggerAdapter(logger, sample_rates={}, max_length=0)
+        subject.bind(lambda event, context: None)({})
+        assert self.stream.getvalue() == "EVENT {}\nRETURN null\n"
@@ -0,0 +1,70 @@
+import io
+import json
+
+from app.metrics import Metrics
+
+
+class TestMetrics:
+    def setup_method(self):
+        self.stream = io.StringIO()
+        self.subject = Metrics("Slackbot", self.stream)
+
+    def get_documents(self):
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_disabled(self):
+        subject = Metrics("", self.stream)
+        subject.count("Requests", Route="POST /events")
+        subject.flush()
+        assert self.stream.getvalue() == ""
+
+    def test_flush(self):
+        self.subject.count("Requests", Route="POST /menus")
+        self.subject.count("Requests", Route="POST /menus")
+        self.subject.count("PublishFailures", 0, Route="POST /menus", Sink="bus")
+        self.subject.observe("ResponderBodySize", 12, "Bytes", Route="POST /menus")
+        self.subject.observe("ResponderBodySize", 34, "Bytes", Route="POST /menus")
+        self.subject.flush(1234567890000)
+        assert self.get_documents() == [
+            {
+                "_aws": {
+                    "Timestamp": 1234567890000,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": "Slackbot",
+                            "Dimensions": [["Route"]],
+                            "Metrics": [
+                                {"Name": "Requests", "Unit": "Count"},
+                                {"Name": "ResponderBodySize", "Unit": "Bytes"},
+                            ],
+                        },
+                        {
+                            "Namespace": "Slackbot",
+                            "Dimensions": [["Route", "Sink"]],
+                            "Metrics": [{"Name": "PublishFailures", "Unit": "Count"}],
+                        },
+                    ],
+                },
+                "Route": "POST /menus",
+                "Sink": "bus",
+                "Requests": 2,
+                "PublishFailures": 0,
+                "ResponderBodySize": [12, 34],
+            }
+        ]
+
+    def test_flush_reset(self):
+        self.subject.count("Requests")
+        self.subject.flush()
+        self.subject.flush()
+        assert len(self.get_documents()) == 1
+
+    def test_conflicting_dimensions(self):
+        self.subject.count("Events", Source="block_actions", DetailType="fizz")
+        self.subject.count("Events", Source="block_actions", DetailType="buzz")
+        self.subject.flush()
+        documents = self.get_documents()
+        assert [(x["DetailType"], x["Events"]) for x in documents] == [
+            ("fizz", 1),
+            ("buzz", 1),
+        ]
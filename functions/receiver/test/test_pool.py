@@ -0,0 +1,81 @@
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from app.pool import ConnectionPool
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["content-length"]))
+        self.received.append(body)
+        if body == b"drop":
+            # Close keep-alive connection without answering
+            self.close_connection = True
+            return
+        self.send_response(200)
+        if self.headers.get("accept-encoding") == "gzip":
+            body = gzip.compress(body)
+            self.send_header("content-encoding", "gzip")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        ...
+
+
+@pytest.fixture
+def server():
+    Handler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestConnectionPool:
+    def setup_method(self):
+        self.subject = ConnectionPool(connect_timeout=1, read_timeout=1)
+
+    def teardown_method(self):
+        self.subject.clear()
+
+    def test_reuse(self, server):
+        for i in range(3):
+            res = self.subject.request("POST", f"{server}/fizz?buzz", f"{i}".encode())
+            assert res.status == 200
+            assert res.body == f"{i}".encode()
+        assert self.subject.stats["connections"] == 1
+        assert self.subject.stats["reused"] == 2
+
+    def test_stale(self, server):
+        self.subject.request("POST", server, b"1")
+        for conns in self.subject.idle.values():
+            for conn in conns:
+                conn.sock.close()
+        res = self.subject.request("POST", server, b"2")
+        assert res.body == b"2"
+        assert self.subject.stats["connections"] == 2
+        assert self.subject.stats["stale"] == 1
+
+    def test_gzip(self, server):
+        headers = {"accept-encoding": "gzip"}
+        res = self.subject.request("POST", server, b"fizz", headers)
+        assert res.body == b"fizz"
+        assert res.headers["content-length"] == "4"
+        assert "content-encoding" not in {x.lower() for x in res.headers}
+
+    def test_no_retry_after_send(self, server):
+        self.subject.request("POST", server, b"1")
+        with pytest.raises(ConnectionError):
+            self.subject.request("POST", server, b"drop")
+        assert Handler.received == [b"1", b"drop"]
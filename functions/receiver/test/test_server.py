@@ -0,0 +1,154 @@
+import asyncio
+import io
+import json
+import threading
+from time import time
+from unittest import mock
+from urllib.request import Request, urlopen
+
+import pytest
+
+import server
+from app import env
+from app.dedupe import Deduplicator
+from app.logger import logger
+from app.pool import Response
+from index import bot
+
+
+class TestServer:
+    def setup_method(self):
+        logger.logger.disabled = True
+        env.secrets.values = None
+        env.secrets.client = mock.MagicMock()
+        env.secrets.client.get_secret_value.return_value = {"SecretString": "{}"}
+        bot.signer.secret = "SECRET!"
+        bot.dedupe = Deduplicator()
+        bot.event_bus.client = mock.MagicMock()
+        bot.event_bus.client.put_events.return_value = {
+            "FailedEntryCount": 0,
+            "Entries": [{"EventId": "1"}],
+        }
+
+    def get_headers(self, body):
+        ts = str(int(time()))
+        return {
+            "Host": "slack.example.com",
+            "X-Slack-Request-Timestamp": ts,
+            "X-Slack-Signature": bot.signer.sign(body, ts),
+        }
+
+    def test_get_event(self):
+        returned = server.get_event(
+            "POST",
+            "/slash/fizz",
+            "a=1",
+            [("Host", "slack.example.com:8000"), ("X-A", "1"), ("x-a", "2")],
+            b"fizz",
+        )
+        assert returned["rawPath"] == "/slash/fizz"
+        assert returned["queryStringParameters"] == {"a": "1"}
+        assert returned["headers"] == {"host": "slack.example.com:8000", "x-a": "1,2"}
+        assert returned["body"] == "Zml6eg=="
+        assert returned["requestContext"] == {
+            "domainName": "slack.example.com",
+            "http": {"method": "POST", "path": "/slash/fizz"},
+        }
+
+    def test_wsgi_callbacks(self):
+        body = "payload=" + json.dumps({"type": "block_actions", "actions": []})
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/callbacks",
+            "CONTENT_LENGTH": str(len(body)),
+            "CONTENT_TYPE": "application/x-www-form-urlencoded",
+            "wsgi.input": io.BytesIO(body.encode()),
+            **{
+                f"HTTP_{k.upper().replace('-', '_')}": v
+                for k, v in self.get_headers(body).items()
+            },
+        }
+        environ["HTTP_HOST"] = "lb.internal:8000"
+        start_response = mock.MagicMock()
+        with mock.patch.object(bot, "responder_domain", "api.example.com"):
+            with mock.patch.object(bot, "pool") as pool:
+                pool.request.return_value = Response(
+                    200, {"content-type": "application/json"}, b'{"ok": true}'
+                )
+                pool.stats = {}
+                returned = server.application(environ, start_response)
+        assert returned == [b'{"ok": true}']
+        assert start_response.call_args.args[0] == "200 OK"
+        method, url, _, headers = pool.request.call_args.args
+        assert (method, url) == ("POST", "https://api.example.com/-/callbacks")
+        assert headers["host"] == "api.example.com"
+
+    def test_wsgi(self):
+        body = json.dumps({"type": "event_callback", "event": {"type": "fizz"}})
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/events",
+            "CONTENT_LENGTH": str(len(body)),
+            "CONTENT_TYPE": "application/json",
+            "wsgi.input": io.BytesIO(body.encode()),
+            **{
+                f"HTTP_{k.upper().replace('-', '_')}": v
+                for k, v in self.get_headers(body).items()
+            },
+        }
+        start_response = mock.MagicMock()
+        returned = server.application(environ, start_response)
+        assert returned == [b""]
+        start_response.assert_called_once_with(
+            "200 OK",
+            [
+                ("content-type", "application/json; charset=utf-8"),
+                ("content-length", "0"),
+            ],
+        )
+        bot.event_bus.client.put_events.assert_called_once()
+
+    def test_asgi(self):
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/health",
+            "query_string": b"",
+            "headers": [(b"host", b"slack.example.com")],
+        }
+        receive = mock.AsyncMock(return_value={"body": b"", "more_body": False})
+        send = mock.AsyncMock()
+        asyncio.run(server.app(scope, receive, send))
+        start, body = [x.args[0] for x in send.call_args_list]
+        assert start["status"] == 200
+        assert body == {"type": "http.response.body", "body": b'{"ok": true}'}
+
+    def test_asgi_lifespan(self):
+        receive = mock.AsyncMock(
+            side_effect=[{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        )
+        send = mock.AsyncMock()
+        with mock.patch("server.shutdown") as mock_shutdown:
+            asyncio.run(server.app({"type": "lifespan"}, receive, send))
+        mock_shutdown.assert_called_once_with()
+        assert [x.args[0]["type"] for x in send.call_args_list] == [
+            "lifespan.startup.complete",
+            "lifespan.shutdown.complete",
+        ]
+
+    def test_http(self):
+        httpd = server.Server(("127.0.0.1", 0), server.RequestHandler)
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.start()
+        try:
+            host, port = httpd.server_address
+            res = urlopen(f"http://{host}:{port}/health")
+            assert res.status == 200
+            assert json.load(res) == {"ok": True}
+            with pytest.raises(Exception) as err:
+                urlopen(Request(f"http://{host}:{port}/events", b"{}", method="POST"))
+            assert err.value.code == 403
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
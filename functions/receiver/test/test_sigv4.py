@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+import boto3
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+
+from app import sigv4
+
+
+class TestSign:
+    def setup_method(self):
+        self.credentials = sigv4.Credentials("AKIDEXAMPLE", "SECRET", "TOKEN")
+
+    def get_expected(self, method, url, headers, data):
+        request = AWSRequest(method=method, url=url, headers=headers, data=data)
+        request.prepare()
+        credentials = mock.MagicMock(
+            access_key="AKIDEXAMPLE", secret_key="SECRET", token="TOKEN"
+        )
+        SigV4Auth(credentials, "execute-api", "us-east-1").add_auth(request)
+        return {k.lower(): v for k, v in request.headers.items()}
+
+    def test_sign_matches_botocore(self):
+        url = "https://slack.example.com/-/callbacks"
+        headers = {"Host": "slack.example.com"}
+        data = '{"fizz": "buzz"}'
+        expected = self.get_expected("POST", url, headers, data)
+        now = datetime.strptime(expected["x-amz-date"], "%Y%m%dT%H%M%SZ")
+        returned = sigv4.sign(
+            "POST",
+            url,
+            headers,
+            data.encode(),
+            "execute-api",
+            "us-east-1",
+            self.credentials,
+            now.replace(tzinfo=timezone.utc),
+        )
+        assert returned == expected
+
+    def test_sign_query(self):
+        returned = sigv4.sign(
+            "GET",
+            "https://example.com/a b?z=1&a=2",
+            {},
+            None,
+            "execute-api",
+            "us-east-1",
+            sigv4.Credentials("AKIDEXAMPLE", "SECRET"),
+            datetime(2020, 1, 1, tzinfo=timezone.utc),
+        )
+        assert "x-amz-security-token" not in returned
+        assert returned["authorization"].startswith(
+            "AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/20200101/us-east-1/execute-api/"
+            "aws4_request, SignedHeaders=host;x-amz-date, Signature="
+        )
+
+
+class TestSigV4Signer:
+    def test_get_headers(self):
+        subject = sigv4.SigV4Signer(region_name="us-test-1")
+        returned = subject.get_headers(
+            method="POST",
+            url="https://slack.example.com/-/menus",
+            headers={"host": "slack.example.com"},
+            data="{}",
+            params="",
+        )
+        assert returned["host"] == "slack.example.com"
+        assert "/us-test-1/execute-api/aws4_request" in returned["authorization"]
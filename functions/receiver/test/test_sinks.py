@@ -0,0 +1,71 @@
+import json
+from unittest import mock
+
+from app.sinks import FileSink, Router
+
+
+def get_entry(source, detail_type):
+    return {"Source": source, "DetailType": detail_type, "Detail": "{}"}
+
+
+class TestFileSink:
+    def test_publish(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        subject = FileSink(path)
+        subject.publish(get_entry("a", "b"))
+        subject.publish(get_entry("c", "d"), get_entry("e", "f"))
+        with open(path) as stream:
+            returned = [json.loads(x) for x in stream]
+        assert returned == [get_entry(*x) for x in ["ab", "cd", "ef"]]
+
+
+class TestRouter:
+    def setup_method(self):
+        self.default = mock.MagicMock()
+        self.default.name = "default"
+        self.default.publish.side_effect = lambda *x: {
+            "FailedEntryCount": 0,
+            "Entries": [{"EventId": "1"} for _ in x],
+        }
+
+    def test_from_config(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        config = [
+            {
+                "type": "file",
+                "target": path,
+                "source": ["event_callback"],
+                "detail-type": ["message"],
+            }
+        ]
+        subject = Router.from_config(json.dumps(config), self.default)
+        entries = [
+            get_entry("event_callback", "app_mention"),
+            get_entry("event_callback", "message"),
+            get_entry("block_actions", "message"),
+        ]
+        returned = subject.publish(*entries)
+        assert [x["Sink"] for x in returned["Entries"]] == ["default", path, "default"]
+        self.default.publish.assert_called_once_with(entries[0], entries[2])
+        with open(path) as stream:
+            assert [json.loads(x) for x in stream] == [entries[1]]
+
+    def test_default(self):
+        subject = Router.from_config(None, self.default)
+        entry = get_entry("event_callback", "message")
+        subject.publish(entry)
+        self.default.publish.assert_called_once_with(entry)
+
+    def test_eventbridge(self):
+        config = [{"type": "eventbridge", "target": "other-bus", "source": ["a"]}]
+        subject = Router.from_config(config, self.default)
+        (sink,) = [x for *_, x in subject.routes]
+        sink.client = mock.MagicMock()
+        sink.client.put_events.return_value = {"Entries": [{"EventId": "1"}]}
+        entry = dict(get_entry("a", "b"), EventBusName="default-bus")
+        returned = subject.publish(entry)
+        sink.client.put_events.assert_called_once_with(
+            Entries=[dict(entry, EventBusName="other-bus")]
+        )
+        assert returned["Entries"][0]["Sink"] == "other-bus"
+        self.default.publish.assert_not_called()
@@ -1,6 +1,13 @@
+import hmac
+from threading import Event
+from hashlib import sha256
+from time import sleep, time
 from unittest import mock
 
-from app.slackbot import Slackbot
+import pytest
+
+from app.errors import Forbidden, InvalidSignature
+from app.slackbot import Signer, Slackbot
 
 
 class TestSlackbot:
@@ -26,3 +33,91 @@ class TestSlackbot:
         returned = self.subject.oauth.verify_state(state)
         expected = False
         assert returned == expected
+
+    def test_published(self):
+        self.subject.publish = mock.MagicMock()
+        resolve = mock.MagicMock(return_value={"statusCode": 200})
+        event = mock.MagicMock()
+        returned = self.subject.published(resolve)(event)
+        assert returned == {"statusCode": 200}
+        self.subject.publish.assert_called_once_with(event)
+        resolve.assert_called_once_with(event)
+
+    @pytest.mark.parametrize("error", [ValueError("BOOM"), None])
+    def test_published_concurrent(self, error):
+        def publish(event):
+            if error:
+                raise error
+            sleep(1)
+
+        self.subject.concurrent = True
+        self.subject.publish_timeout = 0.01
+        self.subject.publish = mock.MagicMock(side_effect=publish)
+        resolve = mock.MagicMock(return_value={"statusCode": 200})
+        event = mock.MagicMock()
+        with mock.patch("app.slackbot.logger") as mock_logger:
+            returned = self.subject.published(resolve)(event)
+        assert returned == {"statusCode": 200}
+        self.subject.publish.assert_called_once_with(event)
+        mock_logger.error.assert_called_once()
+
+    def test_published_concurrent_pending(self):
+        done = Event()
+        self.subject.concurrent = True
+        self.subject.publish_timeout = 0.01
+        events = []
+
+        def publish(event):
+            events.append(event)
+            if len(events) == 1:
+                done.wait()
+
+        self.subject.publish = mock.MagicMock(side_effect=publish)
+        resolve = mock.MagicMock(return_value={"statusCode": 200})
+        with mock.patch("app.slackbot.logger") as mock_logger:
+            self.subject.published(resolve)(mock.MagicMock())
+            self.subject.publish_timeout = 1
+            self.subject.published(resolve)(mock.MagicMock())
+        done.set()
+        assert self.subject.publish.call_count == 2
+        mock_logger.error.assert_called_once()
+
+
+class TestSigner:
+    def setup_method(self):
+        self.subject = Signer(secret="NEW!,OLD!", version="v0")
+        self.ts = str(int(time()))
+
+    def get_signature(self, secret, body):
+        data = f"v0:{self.ts}:{body}".encode()
+        return f"v0={hmac.new(secret.encode(), data, sha256).hexdigest()}"
+
+    def test_sign(self):
+        returned = self.subject.sign("fizz=buzz", self.ts)
+        assert returned == self.get_signature("NEW!", "fizz=buzz")
+        assert self.subject.sign(b"fizz=buzz", self.ts) == returned
+
+    @pytest.mark.parametrize("secret", ["NEW!", "OLD!"])
+    def test_verify(self, secret):
+        signature = self.get_signature(secret, "fizz=buzz")
+        assert self.subject.verify(signature, self.ts, b"fizz=buzz") is True
+
+    def test_verify_list(self):
+        self.subject.secret = ["OLD!"]
+        signature = self.get_signature("OLD!", "fizz=buzz")
+        assert self.subject.verify(signature, self.ts, b"fizz=buzz") is True
+
+    @pytest.mark.parametrize("signature", ["v0=BAD", "v0=\u00e9"])
+    def test_verify_invalid(self, signature):
+        with pytest.raises(InvalidSignature):
+            self.subject.verify(signature, self.ts, b"fizz=buzz")
+
+    def test_verify_no_secret(self):
+        self.subject.secret = ""
+        with pytest.raises(InvalidSignature):
+            self.subject.verify("v0=BAD", self.ts, b"fizz=buzz")
+
+    def test_verify_too_old(self):
+        signature = self.get_signature("NEW!", "fizz=buzz")
+        with pytest.raises(Forbidden):
+            self.subject.verify(signature, str(int(time()) - 600), b"fizz=buzz")
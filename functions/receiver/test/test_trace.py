@@ -0,0 +1,94 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from unittest import mock
+
+import pytest
+
+from app import trace
+from app.api import Api
+
+
+class TestTracer:
+    def setup_method(self):
+        self.subject = trace.Tracer(export="stdout", service_name="test")
+
+    def get_spans(self, capsys):
+        (line,) = capsys.readouterr().out.splitlines()
+        (resource,) = json.loads(line)["resourceSpans"]
+        assert resource["resource"]["attributes"] == [
+            {"key": "service.name", "value": {"stringValue": "test"}}
+        ]
+        (scope,) = resource["scopeSpans"]
+        return {x["name"]: x for x in scope["spans"]}
+
+    def test_off(self):
+        subject = trace.Tracer(export="")
+        with subject.span("fizz") as span:
+            assert span is trace.NOOP
+            assert not span
+
+    def test_nested(self, capsys):
+        with self.subject.span("root", trace.SPAN_KIND_SERVER, route="/fizz"):
+            with self.subject.span("child") as span:
+                span.set(bytes=12, ok=True, ratio=0.5)
+        spans = self.get_spans(capsys)
+        root, child = spans["root"], spans["child"]
+        assert "parentSpanId" not in root
+        assert child["parentSpanId"] == root["spanId"]
+        assert child["traceId"] == root["traceId"]
+        assert root["kind"] == trace.SPAN_KIND_SERVER
+        assert root["attributes"] == [
+            {"key": "route", "value": {"stringValue": "/fizz"}}
+        ]
+        assert child["attributes"] == [
+            {"key": "bytes", "value": {"intValue": "12"}},
+            {"key": "ok", "value": {"boolValue": True}},
+            {"key": "ratio", "value": {"doubleValue": 0.5}},
+        ]
+        assert int(root["startTimeUnixNano"]) <= int(child["startTimeUnixNano"])
+        assert int(child["endTimeUnixNano"]) <= int(root["endTimeUnixNano"])
+
+    def test_thread(self, capsys):
+        def work():
+            with self.subject.span("thread"):
+                pass
+
+        with self.subject.span("root"):
+            with ThreadPoolExecutor(1) as executor:
+                executor.submit(copy_context().run, work).result()
+        spans = self.get_spans(capsys)
+        assert spans["thread"]["parentSpanId"] == spans["root"]["spanId"]
+
+    def test_error(self, capsys):
+        with pytest.raises(ValueError):
+            with self.subject.span("root"):
+                raise ValueError("fizz")
+        spans = self.get_spans(capsys)
+        assert spans["root"]["status"] == {"code": 2, "message": "ValueError: fizz"}
+
+    def test_file(self, tmp_path):
+        path = tmp_path / "trace.json"
+        subject = trace.Tracer(export=str(path))
+        with subject.span("root"):
+            pass
+        with subject.span("root"):
+            pass
+        assert len(path.read_text().splitlines()) == 2
+
+    def test_api(self, capsys):
+        api = Api()
+
+        @api.post("/fizz")
+        def post_fizz(request):
+            with trace.span("stage"):
+                return api.respond(200)
+
+        with mock.patch("app.trace.tracer", self.subject):
+            api.handle({"routeKey": "POST /fizz"})
+        spans = self.get_spans(capsys)
+        assert spans["stage"]["parentSpanId"] == spans["POST /fizz"]["spanId"]
+        assert {
+            "key": "http.response.status_code",
+            "value": {"intValue": "200"},
+        } in spans["POST /fizz"]["attributes"]
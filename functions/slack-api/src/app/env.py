@@ -1,19 +1,133 @@
+"""
+Environment & Secrets
+"""
 import json
 import os
+import threading
+from time import monotonic
 
 import boto3
 
 from .logger import logger
 
 SECRET_ID = os.environ["SECRET_ID"]
+SECRET_TTL = float(os.getenv("SECRET_TTL") or "300")
+SECRET_RETRY_INTERVAL = float(os.getenv("SECRET_RETRY_INTERVAL") or "1")
 
-SECRETS = boto3.client("secretsmanager")
 
+class Secrets:
+    """
+    Lazily fetched, TTL-cached SecretsManager JSON
 
-def export(secret_id=None, client=None):
-    client = client or SECRETS
-    params = {"SecretId": secret_id or SECRET_ID}
-    logger.info("secretsmanager:GetSecretSring %s", json.dumps(params))
-    result = client.get_secret_value(**params)
-    secret = json.loads(result["SecretString"])
-    os.environ.update(**secret)
+    The secret is fetched on first use rather than at import. Once it is
+    older than ``ttl`` seconds the cached value is still served while a fresh
+    copy is fetched on a background thread. Keys missing from the secret (or
+    every key, if the secret cannot be fetched) fall back to environment
+    variables. Failed fetches are retried at most every ``retry_interval``
+    seconds.
+    """
+
+    def __init__(self, secret_id=None, client=None, ttl=None, retry_interval=None):
+        self.secret_id = secret_id or SECRET_ID
+        self.client = client
+        self.ttl = ttl or SECRET_TTL
+        self.retry_interval = retry_interval or SECRET_RETRY_INTERVAL
+        self.values = None
+        self.fetched = None
+        self.failed = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get secret value, falling back to environment variable
+        """
+        value = self.get_values().get(key)
+        if value is None:
+            value = os.getenv(key, default)
+        return value
+
+    def get_values(self):
+        if self.values is None or self.fetched is None:
+            # Never fetched (or every fetch failed): fetch before answering
+            if not self.backing_off():
+                self.refresh()
+        elif monotonic() - self.fetched > self.ttl and not self.refreshing:
+            if not self.backing_off():
+                self.refreshing = True
+                threading.Thread(target=self.refresh, daemon=True).start()
+        return self.values or {}
+
+    def backing_off(self):
+        """
+        Check whether the last fetch failed less than ``retry_interval`` ago
+        """
+        return self.failed is not None and (
+            monotonic() - self.failed < self.retry_interval
+        )
+
+    def refresh(self, min_age=None):
+        """
+        Fetch secret now
+
+        :param float min_age: Skip fetch if secret is younger than this
+        :returns bool: ``True`` if the secret was fetched
+        """
+        with self.lock:
+            if min_age and self.fetched and monotonic() - self.fetched < min_age:
+                return False
+            if self.backing_off():
+                return False
+            try:
+                self.values = self.fetch()
+                self.fetched = monotonic()
+                self.failed = None
+                return True
+            except Exception as err:
+                logger.error("secretsmanager:GetSecretValue %s", err)
+                self.values = self.values or {}
+                self.failed = monotonic()
+                return False
+            finally:
+                self.refreshing = False
+
+    def fetch(self):
+        if self.client is None:
+            self.client = boto3.client("secretsmanager")
+        params = {"SecretId": self.secret_id}
+        logger.info("secretsmanager:GetSecretValue %s", json.dumps(params))
+        result = self.client.get_secret_value(**params)
+        return json.loads(result["SecretString"])
+
+
+class Secret:
+    """
+    Dataclass field read from ``secrets`` on access unless set explicitly
+
+    :Example:
+
+    >>> @dataclass
+    ... class Signer:
+    ...     secret: str = Secret("SLACK_SIGNING_SECRET")
+    """
+
+    def __init__(self, key, default=None):
+        self.key = key
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.name, None)
+        if value is None:
+            value = secrets.get(self.key, self.default)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.name, None if value is self else value)
+
+
+secrets = Secrets()
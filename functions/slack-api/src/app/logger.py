@@ -1,9 +1,46 @@
 import json
 import logging
+import os
+import queue
+import random
+import threading
+from contextvars import ContextVar
 
 LOG_FORMAT = "%(levelname)s %(awsRequestId)s %(message)s"
 LOG_LEVEL = logging.INFO
 LOG_NAME = "slackbot"
+LOG_QUEUE = os.getenv("LOG_QUEUE", "false").lower() == "true"
+LOG_QUEUE_BATCH = int(os.getenv("LOG_QUEUE_BATCH") or "100")
+LOG_QUEUE_FLUSH_TIMEOUT = float(os.getenv("LOG_QUEUE_FLUSH_TIMEOUT") or "1")
+LOG_MAX_FIELD_LENGTH = int(os.getenv("LOG_MAX_FIELD_LENGTH") or "0")
+LOG_SAMPLE_RATES = json.loads(os.getenv("LOG_SAMPLE_RATES") or "{}")
+
+REQUEST_ID = ContextVar("awsRequestId", default="-")
+
+
+class LazyJSON:
+    """
+    JSON-serialize object only if the log record is actually formatted
+
+    Strings longer than ``max_length`` are truncated, at any depth.
+    """
+
+    def __init__(self, obj, max_length=None):
+        self.obj = obj
+        self.max_length = max_length
+
+    def __str__(self):
+        obj = self.truncate(self.obj) if self.max_length else self.obj
+        return json.dumps(obj, default=str)
+
+    def truncate(self, obj):
+        if isinstance(obj, str) and len(obj) > self.max_length:
+            return f"{obj[:self.max_length]}…(+{len(obj) - self.max_length})"
+        elif isinstance(obj, dict):
+            return {k: self.truncate(v) for k, v in obj.items()}
+        elif isinstance(obj, (list, tuple)):
+            return [self.truncate(x) for x in obj]
+        return obj
 
 
 class SuppressFilter(logging.Filter):
@@ -21,16 +58,111 @@ class SuppressFilter(logging.Filter):
         return False if self.logger in logger else True
 
 
+class QueueStreamHandler(logging.StreamHandler):
+    """
+    Stream handler that formats & writes records on a background thread
+
+    Records are queued by ``emit()`` without blocking the caller; their
+    message is resolved first, so objects logged as arguments may be changed
+    afterwards. The writer thread drains up to ``max_batch`` queued records
+    at a time and writes them to the stream with a single call. ``flush()``
+    blocks until every record queued before it was called has been written,
+    so it must be called before the Lambda handler returns and the execution
+    environment is frozen.
+    """
+
+    def __init__(self, stream=None, max_batch=None):
+        super().__init__(stream)
+        self.max_batch = max_batch or LOG_QUEUE_BATCH
+        self.queue = queue.SimpleQueue()
+        self.queued = 0
+        self.done = 0
+        self.written = threading.Condition()
+        self.thread = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        """
+        Drop queue & writer thread inherited from a parent process
+        """
+        self.queue = queue.SimpleQueue()
+        self.queued = 0
+        self.done = 0
+        self.written = threading.Condition()
+        self.thread = None
+
+    @property
+    def pending(self):
+        return self.queued - self.done
+
+    def emit(self, record):
+        # Resolve message now, like logging.handlers.QueueHandler.prepare()
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+        except Exception:
+            self.handleError(record)
+            return
+        with self.written:
+            self.queued += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.queue.put(record)
+
+    def flush(self, timeout=None):
+        """
+        Wait up to ``timeout`` seconds for records queued so far to be written
+        """
+        with self.written:
+            queued = self.queued
+            self.written.wait_for(lambda: self.done >= queued, timeout)
+        super().flush()
+
+    def run(self):
+        while True:
+            records = [self.queue.get()]
+            try:
+                while len(records) < self.max_batch:
+                    records.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                self.write(records)
+            finally:
+                with self.written:
+                    self.done += len(records)
+                    self.written.notify_all()
+
+    def write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        with self.lock:
+            try:
+                self.stream.write("".join(lines))
+                self.stream.flush()
+            except Exception:
+                self.handleError(records[-1])
+
+
 class LambdaLoggerAdapter(logging.LoggerAdapter):
     """
     Lambda logger adapter.
     """
 
     @staticmethod
-    def getLogger(name, level=None, format_string=None, stream=None):
+    def getLogger(name, level=None, format_string=None, stream=None, queued=None):
         # Get logger, handler, formatter
         logger = logging.getLogger(name)
-        handler = logging.StreamHandler(stream)
+        queued = LOG_QUEUE if queued is None else queued
+        handler = (
+            QueueStreamHandler(stream) if queued else logging.StreamHandler(stream)
+        )
         formatter = logging.Formatter(format_string or LOG_FORMAT)
         handler.setFormatter(formatter)
 
@@ -48,8 +180,10 @@ class LambdaLoggerAdapter(logging.LoggerAdapter):
 
         return logger
 
-    def __init__(self, logger, extra=None):
+    def __init__(self, logger, extra=None, sample_rates=None, max_length=None):
         super().__init__(logger, extra or dict(awsRequestId="-"))
+        self.sample_rates = LOG_SAMPLE_RATES if sample_rates is None else sample_rates
+        self.max_length = LOG_MAX_FIELD_LENGTH if max_length is None else max_length
 
     def bind(self, handler):
         """
@@ -72,17 +206,55 @@ class LambdaLoggerAdapter(logging.LoggerAdapter):
 
         def wrapper(event=None, context=None):
             try:
-                params = {"default": str}
                 self.addContext(context)
-                self.info("EVENT %s", json.dumps(event, **params))
-                result = handler(event, context)
-                self.info("RETURN %s", json.dumps(result, **params))
+                logged = self.sample("EVENT")
+                if logged:
+                    self.info("EVENT %s", self.json(event))
+
+                # Always log errors in full
+                try:
+                    result = handler(event, context)
+                except Exception:
+                    if not logged or self.max_length:
+                        self.error("EVENT %s", self.json(event, full=True))
+                    raise
+                if self.is_error(result):
+                    if not logged or self.max_length:
+                        self.error("EVENT %s", self.json(event, full=True))
+                    self.error("RETURN %s", self.json(result, full=True))
+                elif self.sample("RETURN"):
+                    self.info("RETURN %s", self.json(result))
                 return result
             finally:
                 self.dropContext()
+                self.flush(LOG_QUEUE_FLUSH_TIMEOUT)
 
         return wrapper
 
+    def sample(self, category):
+        """
+        Decide whether to log a record of the given category
+
+        Rates are configured per category with ``LOG_SAMPLE_RATES``, eg.
+        ``{"EVENT": 0.1, "RETURN": 0.1}``. Categories without a rate are
+        always logged.
+        """
+        rate = self.sample_rates.get(category, 1)
+        return rate >= 1 or random.random() < rate
+
+    def json(self, obj, full=False):
+        """
+        Get lazily serialized (and truncated) JSON of object for logging
+        """
+        return LazyJSON(obj, None if full else self.max_length)
+
+    @staticmethod
+    def is_error(result):
+        try:
+            return int(result["statusCode"]) >= 500
+        except (KeyError, TypeError, ValueError):
+            return False
+
     def addContext(self, context=None):
         """
         Add runtime context to logger.
@@ -91,18 +263,35 @@ class LambdaLoggerAdapter(logging.LoggerAdapter):
             awsRequestId = f"RequestId: {context.aws_request_id}"
         except AttributeError:
             awsRequestId = "-"
-        self.extra.update(awsRequestId=awsRequestId)
+        REQUEST_ID.set(awsRequestId)
         return self
 
+    def process(self, msg, kwargs):
+        """
+        Add request ID of the current context (request thread) to record.
+        """
+        kwargs["extra"] = {**self.extra, "awsRequestId": REQUEST_ID.get()}
+        return msg, kwargs
+
+    def flush(self, timeout=None):
+        """
+        Flush handlers, waiting up to ``timeout`` seconds on queued records.
+        """
+        for handler in self.logger.handlers:
+            if isinstance(handler, QueueStreamHandler):
+                handler.flush(timeout)
+            else:
+                handler.flush()
+
     def dropContext(self):
         """
         Drop runtime context from logger.
         """
-        self.extra.update(awsRequestId="-")
+        REQUEST_ID.set("-")
         return self
 
 
-def getLogger(name, level=None, format_string=None, stream=None):
+def getLogger(name, level=None, format_string=None, stream=None, queued=None):
     """
     Helper to get Lambda logger.
 
@@ -110,7 +299,7 @@ def getLogger(name, level=None, format_string=None, stream=None):
 
     >>> getLogger('logger-name', 'DEBUG', '%(message)s')
     """
-    logger = LambdaLoggerAdapter.getLogger(name, level, format_string, stream)
+    logger = LambdaLoggerAdapter.getLogger(name, level, format_string, stream, queued)
     return LambdaLoggerAdapter(logger)
 
 
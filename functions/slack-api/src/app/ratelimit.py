@@ -0,0 +1,173 @@
+"""
+Slack Web API Rate Limits
+
+See https://api.slack.com/docs/rate-limits
+"""
+import json
+import math
+import threading
+from time import monotonic
+
+# Requests per minute by tier
+TIERS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+# Tier by Web API method
+METHODS = {
+    "chat.delete": 3,
+    "chat.getPermalink": 4,
+    "chat.postEphemeral": 4,
+    "chat.postMessage": 4,
+    "chat.scheduleMessage": 3,
+    "chat.update": 3,
+    "conversations.create": 2,
+    "conversations.history": 3,
+    "conversations.info": 3,
+    "conversations.invite": 3,
+    "conversations.join": 3,
+    "conversations.list": 2,
+    "conversations.members": 4,
+    "conversations.open": 3,
+    "conversations.replies": 3,
+    "files.upload": 2,
+    "reactions.add": 3,
+    "team.info": 3,
+    "users.conversations": 3,
+    "users.info": 4,
+    "users.list": 2,
+    "users.lookupByEmail": 3,
+    "views.open": 4,
+    "views.publish": 4,
+    "views.push": 4,
+    "views.update": 4,
+}
+
+# Special-case limits, keyed by method & request field, in requests/second
+SPECIAL = {
+    "chat.postMessage": ("channel", 1),
+}
+
+DEFAULT_TIER = 3
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking
+
+    :param float rate: Tokens added per second
+    :param float capacity: Maximum tokens (burst size)
+    """
+
+    def __init__(self, rate, capacity, clock=monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def reserve(self):
+        """
+        Reserve one token and return seconds to wait before using it
+        """
+        now = self.clock()
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(-self.tokens / self.rate, 0.0)
+
+    def cancel(self):
+        """
+        Return an unused reservation
+        """
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class RateLimiter:
+    """
+    Per-workspace token buckets for Slack Web API methods
+
+    Buckets are keyed by API token & method (and by channel, etc. for special
+    cases), so limits are tracked per workspace within a warm container.
+    ``Retry-After`` values from HTTP 429 responses block the method until the
+    given time has passed.
+    """
+
+    def __init__(self, methods=None, special=None, clock=monotonic):
+        self.methods = METHODS if methods is None else methods
+        self.special = SPECIAL if special is None else special
+        self.clock = clock
+        self.buckets = {}
+        self.blocked = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, token, method, params=None):
+        """
+        Reserve a request slot and return seconds to wait before sending
+
+        :param str token: Slack API token
+        :param str method: Slack Web API method, eg. ``chat.postMessage``
+        :param dict params: Request parameters, used for special-case limits
+        :returns tuple: Delay in seconds & list of reserved buckets
+        """
+        with self.lock:
+            buckets = [self.get_bucket((token, method), self.get_rate(method))]
+            field, rate = self.special.get(method) or (None, None)
+            value = (params or {}).get(field)
+            if field and value:
+                buckets.append(self.get_bucket((token, method, value), (rate, 1)))
+            delays = [x.reserve() for x in buckets]
+            blocked = self.blocked.get((token, method), 0) - self.clock()
+            return max(delays + [blocked, 0.0]), buckets
+
+    def cancel(self, buckets):
+        """
+        Return reservations that will not be used
+        """
+        with self.lock:
+            for bucket in buckets:
+                bucket.cancel()
+
+    def retry_after(self, token, method, seconds):
+        """
+        Block method for token until ``Retry-After`` seconds have passed
+        """
+        with self.lock:
+            until = self.clock() + seconds
+            key = (token, method)
+            self.blocked[key] = max(self.blocked.get(key, 0), until)
+
+    def get_rate(self, method):
+        tier = self.methods.get(method, DEFAULT_TIER)
+        per_minute = TIERS[tier]
+        return per_minute / 60, max(1, per_minute // 6)
+
+    def get_bucket(self, key, rate):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(*rate, clock=self.clock)
+        return bucket
+
+
+class Deferred(Exception):
+    """
+    Request could not be sent within the remaining invocation time
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Deferred for {retry_after:.3f}s")
+        self.retry_after = retry_after
+
+    @property
+    def result(self):
+        """
+        Structured handler result for a deferred request
+        """
+        retry_after = round(self.retry_after, 3)
+        body = {"ok": False, "error": "deferred", "retry_after": retry_after}
+        return {
+            "statusCode": 429,
+            "headers": {"retry-after": str(math.ceil(self.retry_after))},
+            "body": json.dumps(body),
+            "deferred": True,
+            "retryAfter": retry_after,
+        }
@@ -1,22 +1,76 @@
-from app import env
-
-env.export()  # Export SecretsManager JSON to environment
-
+import contextvars
+import json
 import os
-from urllib.request import Request, urlopen
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from urllib.error import HTTPError
+from urllib.parse import parse_qsl, urlsplit
 
+from app import deadline, env
 from app.logger import logger
+from app.pool import ConnectionPool
+from app.ratelimit import Deferred, RateLimiter
+
+SLACK_API_MAX_CONCURRENCY = int(os.environ.get("SLACK_API_MAX_CONCURRENCY") or "10")
 
-SLACK_API_TOKEN = os.environ.get("SLACK_API_TOKEN")
+limiter = RateLimiter()
+pool = ConnectionPool()
 
 
 @logger.bind
-def handler(event, _):
+def handler(event, context=None):
+    deadline.bind(context)
+    if "requests" in event:
+        return handle_batch(event)
+    return handle_request(event)
+
+
+def handle_batch(event):
+    """
+    Send a batch of requests concurrently
+
+    :Example:
+
+    >>> handle_batch({"concurrency": 5, "requests": [{"url": "…"}, …]})
+    >>> # => {"responses": [{"statusCode": 200, "headers": {…}, "body": "…"}, …]}
+    """
+    requests = event["requests"]
+    concurrency = event.get("concurrency") or SLACK_API_MAX_CONCURRENCY
+    concurrency = max(1, min(concurrency, SLACK_API_MAX_CONCURRENCY, len(requests)))
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, handle_item, request)
+            for request in requests
+        ]
+        responses = [future.result() for future in futures]
+    return {"responses": responses}
+
+
+def handle_item(event):
+    """
+    Send one request of a batch, capturing errors as its response
+    """
+    try:
+        return handle_request(event)
+    except HTTPError as err:
+        logger.error("%s", err)
+        return {
+            "statusCode": err.code,
+            "headers": dict(err.headers or {}),
+            "body": err.msg,
+            "error": str(err),
+        }
+    except Exception as err:
+        logger.error("%s", err)
+        return {"statusCode": 500, "headers": {}, "body": "", "error": str(err)}
+
+
+def handle_request(event):
     # Extract request info
     data = event.get("data") or ""
-    headers = event.get("headers") or {}
+    headers = dict(event.get("headers") or {})
     method = event.get("method") or "POST"
-    token = event.get("token") or SLACK_API_TOKEN
+    token = event.get("token") or env.secrets.get("SLACK_API_TOKEN")
     url = event["url"]
 
     # Update headers
@@ -25,20 +79,68 @@ def handler(event, _):
     if "content-type" not in headers:
         headers["content-type"] = "application/json; charset=utf-8"
 
-    # Send request
-    res = send_request(method, url, data, headers)
+    # Send request once rate limits allow
+    try:
+        res = schedule_request(method, url, data, headers)
+    except Deferred as err:
+        return err.result
 
     # Return response
     ret = {
-        "statusCode": res.code,
-        "headers": dict(res.headers),
-        "body": res.read().decode(),
+        "statusCode": res.status,
+        "headers": res.headers,
+        "body": res.body.decode(),
     }
     return ret
 
 
+def schedule_request(method, url, data, headers):
+    """
+    Send request, waiting for Slack rate limits within the invocation time
+
+    :raises Deferred: if the request cannot be sent before the deadline
+    """
+    key = headers["authorization"]
+    api_method = urlsplit(url).path.rsplit("/", 1)[-1]
+    params = get_params(data)
+    while True:
+        # Wait for rate limit or defer
+        delay, buckets = limiter.reserve(key, api_method, params)
+        if delay >= deadline.remaining():
+            limiter.cancel(buckets)
+            logger.warning("DEFERRED %s %.3fs", api_method, delay)
+            raise Deferred(delay)
+        if delay:
+            logger.info("RATE LIMITED %s %.3fs", api_method, delay)
+            sleep(delay)
+
+        # Send request & honor Retry-After
+        try:
+            return send_request(method, url, data, headers)
+        except HTTPError as err:
+            if err.code != 429:
+                raise
+            res_headers = {k.lower(): v for k, v in (err.headers or {}).items()}
+            retry_after = float(res_headers.get("retry-after") or 1)
+            logger.warning("RETRY AFTER %s %.3fs", api_method, retry_after)
+            limiter.retry_after(key, api_method, retry_after)
+
+
 def send_request(method, url, data, headers):
     logger.info("%s %s", method, url)
-    req = Request(url, data.encode(), headers, method=method)
-    res = urlopen(req)
+    headers = {"accept-encoding": "gzip", **headers}
+    res = pool.request(method, url, data.encode(), headers)
+    if res.status >= 400:
+        raise HTTPError(url, res.status, res.body.decode(), res.headers, None)
     return res
+
+
+def get_params(data):
+    """
+    Get request parameters from JSON or URL-encoded body
+    """
+    try:
+        params = json.loads(data)
+    except ValueError:
+        params = dict(parse_qsl(data))
+    return params if isinstance(params, dict) else {}
@@ -0,0 +1,72 @@
+import json
+import os
+from dataclasses import dataclass
+from unittest import mock
+
+from app import env
+
+
+class TestSecrets:
+    def setup_method(self):
+        self.client = mock.MagicMock()
+        self.client.get_secret_value.return_value = {
+            "SecretString": json.dumps({"FIZZ": "buzz"})
+        }
+        self.subject = env.Secrets("secret", self.client, ttl=60)
+
+    def test_lazy(self):
+        self.client.get_secret_value.assert_not_called()
+        assert self.subject.get("FIZZ") == "buzz"
+        assert self.subject.get("FIZZ") == "buzz"
+        self.client.get_secret_value.assert_called_once_with(SecretId="secret")
+
+    def test_fallback(self):
+        with mock.patch.dict(os.environ, {"JAZZ": "fuzz"}):
+            assert self.subject.get("JAZZ") == "fuzz"
+        assert self.subject.get("NONE", "default") == "default"
+
+    def test_fetch_error(self):
+        self.client.get_secret_value.side_effect = ValueError
+        with mock.patch.dict(os.environ, {"FIZZ": "env"}):
+            assert self.subject.get("FIZZ") == "env"
+
+    def test_fetch_error_retry(self):
+        self.client.get_secret_value.side_effect = [
+            ValueError,
+            {"SecretString": json.dumps({"FIZZ": "buzz"})},
+        ]
+        assert self.subject.get("FIZZ") is None
+        assert self.subject.refresh(min_age=60) is False
+        assert self.subject.get("FIZZ") is None
+        assert self.client.get_secret_value.call_count == 1
+        self.subject.failed -= 2
+        assert self.subject.refresh(min_age=60) is True
+        assert self.subject.get("FIZZ") == "buzz"
+
+    @mock.patch("threading.Thread")
+    def test_background_refresh(self, mock_thread):
+        self.subject.get("FIZZ")
+        self.subject.fetched -= 120
+        assert self.subject.get("FIZZ") == "buzz"
+        mock_thread.assert_called_once_with(target=self.subject.refresh, daemon=True)
+        mock_thread.return_value.start.assert_called_once_with()
+
+    def test_refresh_min_age(self):
+        self.subject.get("FIZZ")
+        assert self.subject.refresh(min_age=60) is False
+        self.subject.fetched -= 120
+        assert self.subject.refresh(min_age=60) is True
+        assert self.client.get_secret_value.call_count == 2
+
+
+class TestSecret:
+    @dataclass
+    class Config:
+        fizz: str = env.Secret("FIZZ", "default")
+
+    def test_secret(self):
+        with mock.patch.object(env, "secrets") as mock_secrets:
+            mock_secrets.get.return_value = "buzz"
+            assert self.Config().fizz == "buzz"
+            assert self.Config(fizz="jazz").fizz == "jazz"
+            mock_secrets.get.assert_called_once_with("FIZZ", "default")
@@ -1,11 +1,16 @@
 import json
 from unittest import mock
+from urllib.error import HTTPError
 
 import pytest
 
-with mock.patch("boto3.client") as mock_client:
-    mock_client.return_value.get_secret_value.return_value = {"SecretString": "{}"}
-    import index
+import index
+from app import env
+from app.pool import Response
+from app.ratelimit import RateLimiter
+
+env.secrets.client = mock.MagicMock()
+env.secrets.client.get_secret_value.return_value = {"SecretString": "{}"}
 
 HEADERS = {
     "authorization": "Bearer xoxb-test",
@@ -22,8 +27,12 @@ EVENTS = [
 
 class TestHandler:
     def setup_method(self):
+        self.send_request = index.send_request
         index.send_request = mock.MagicMock()
 
+    def teardown_method(self):
+        index.send_request = self.send_request
+
     @pytest.mark.parametrize("event", EVENTS)
     def test_handler(self, event):
         index.handler(event)
@@ -33,3 +42,95 @@ class TestHandler:
             event["data"],
             HEADERS,
         )
+
+
+class TestSendRequest:
+    def setup_method(self):
+        self.patch = mock.patch.object(index, "pool")
+        self.patch.start()
+
+    def teardown_method(self):
+        self.patch.stop()
+
+    def test_send_request(self):
+        index.pool.request.return_value = Response(200, {}, b"{}")
+        returned = index.send_request("POST", "https://slack.com/api/fizz", "", {})
+        assert returned.body == b"{}"
+        index.pool.request.assert_called_once_with(
+            "POST", "https://slack.com/api/fizz", b"", {"accept-encoding": "gzip"}
+        )
+
+    def test_send_request_error(self):
+        index.pool.request.return_value = Response(500, {}, b"")
+        with pytest.raises(HTTPError):
+            index.send_request("POST", "https://slack.com/api/fizz", "", {})
+
+
+class TestScheduleRequest:
+    def setup_method(self):
+        self.patches = [
+            mock.patch.object(index, "limiter", RateLimiter()),
+            mock.patch.object(index, "pool"),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_retry_after(self):
+        index.pool.request.side_effect = [
+            Response(429, {"Retry-After": "0.01"}, b""),
+            Response(200, {}, b"{}"),
+        ]
+        returned = index.handler(EVENTS[0])
+        assert returned["statusCode"] == 200
+        assert index.pool.request.call_count == 2
+
+    def test_deferred(self):
+        index.pool.request.return_value = Response(429, {"Retry-After": "60"}, b"")
+        returned = index.handler(EVENTS[0])
+        assert returned["statusCode"] == 429
+        assert returned["deferred"] is True
+        assert index.pool.request.call_count == 1
+
+
+class TestBatch:
+    def setup_method(self):
+        self.patches = [
+            mock.patch.object(index, "limiter", RateLimiter()),
+            mock.patch.object(index, "pool"),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def request(self, method, url, data, headers):
+        if url.endswith("fail"):
+            return Response(500, {}, b"oops")
+        return Response(200, {}, url.encode())
+
+    def test_batch(self):
+        index.pool.request.side_effect = self.request
+        urls = [f"https://slack.com/api/users.info?{i}" for i in range(5)]
+        urls[2] = "https://slack.com/api/users.info?fail"
+        event = {"concurrency": 3, "requests": [{"url": x} for x in urls]}
+        returned = index.handler(event)["responses"]
+        assert [x["statusCode"] for x in returned] == [200, 200, 500, 200, 200]
+        assert [x["body"] for x in returned if x["statusCode"] == 200] == [
+            x for x in urls if not x.endswith("fail")
+        ]
+        assert "error" in returned[2]
+
+    @mock.patch("index.SLACK_API_MAX_CONCURRENCY", 2)
+    @mock.patch("index.ThreadPoolExecutor", wraps=index.ThreadPoolExecutor)
+    def test_batch_concurrency(self, mock_executor):
+        index.pool.request.side_effect = self.request
+        url = "https://slack.com/api/users.info"
+        event = {"concurrency": 1000, "requests": [{"url": url}] * 5}
+        index.handler(event)
+        mock_executor.assert_called_once_with(2)
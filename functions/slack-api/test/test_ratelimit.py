@@ -0,0 +1,70 @@
+import json
+
+from app.ratelimit import Deferred, RateLimiter, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    def test_reserve(self):
+        clock = Clock()
+        subject = TokenBucket(1, 2, clock=clock)
+        assert [subject.reserve() for _ in range(4)] == [0, 0, 1, 2]
+        clock.now = 3
+        assert subject.reserve() == 0
+
+    def test_cancel(self):
+        subject = TokenBucket(1, 1, clock=Clock())
+        subject.reserve()
+        subject.cancel()
+        assert subject.reserve() == 0
+
+
+class TestRateLimiter:
+    def setup_method(self):
+        self.clock = Clock()
+        self.subject = RateLimiter(clock=self.clock)
+
+    def test_tier(self):
+        delays = [self.subject.reserve("A", "users.list")[0] for _ in range(5)]
+        assert delays == [0, 0, 0, 3, 6]
+
+    def test_workspaces(self):
+        for _ in range(3):
+            self.subject.reserve("A", "users.list")
+        assert self.subject.reserve("A", "users.list")[0] == 3
+        assert self.subject.reserve("B", "users.list")[0] == 0
+
+    def test_special(self):
+        params = {"channel": "C1"}
+        assert self.subject.reserve("A", "chat.postMessage", params)[0] == 0
+        assert self.subject.reserve("A", "chat.postMessage", params)[0] == 1
+        assert self.subject.reserve("A", "chat.postMessage", {"channel": "C2"})[0] == 0
+
+    def test_retry_after(self):
+        self.subject.retry_after("A", "users.info", 30)
+        assert self.subject.reserve("A", "users.info")[0] == 30
+        self.clock.now = 40
+        assert self.subject.reserve("A", "users.info")[0] == 0
+
+    def test_cancel(self):
+        for _ in range(3):
+            self.subject.reserve("A", "users.list")
+        _, buckets = self.subject.reserve("A", "users.list")
+        self.subject.cancel(buckets)
+        assert self.subject.reserve("A", "users.list")[0] == 3
+
+
+class TestDeferred:
+    def test_result(self):
+        returned = Deferred(1.5).result
+        assert returned["statusCode"] == 429
+        assert returned["deferred"] is True
+        assert returned["headers"] == {"retry-after": "2"}
+        assert json.loads(returned["body"])["error"] == "deferred"
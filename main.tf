@@ -283,10 +283,10 @@ resource "aws_lambda_function" "receiver" {
   timeout          = 3
 
   environment {
-    variables = {
+    variables = merge(var.receiver_function_environment, {
       EVENT_BUS_NAME = aws_cloudwatch_event_bus.bus.name
       SECRET_ID      = aws_secretsmanager_secret.secret.id
-    }
+    })
   }
 }
 
@@ -403,9 +403,9 @@ resource "aws_lambda_function" "slack_api" {
   timeout          = 3
 
   environment {
-    variables = {
+    variables = merge(var.slack_api_function_environment, {
       SECRET_ID = aws_secretsmanager_secret.secret.id
-    }
+    })
   }
 }
 
@@ -126,6 +126,12 @@ variable "receiver_function_description" {
   default     = "Slack HTTP receiver"
 }
 
+variable "receiver_function_environment" {
+  type        = map(string)
+  description = "Slack HTTP receiver optional tuning environment variables"
+  default     = {}
+}
+
 variable "receiver_function_memory_size" {
   type        = number
   description = "Slack HTTP receiver memory size in MB"
@@ -168,6 +174,12 @@ variable "slack_api_function_description" {
   default     = "Slack API"
 }
 
+variable "slack_api_function_environment" {
+  type        = map(string)
+  description = "Slack API optional tuning environment variables"
+  default     = {}
+}
+
 variable "slack_api_function_memory_size" {
   type        = number
   description = "Slack HTTP receiver memory size in MB"